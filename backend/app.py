@@ -7,6 +7,16 @@ from flasgger import Swagger
 from backend.config import Config
 from backend.extensions import db, jwt
 from backend.routes import register_routes
+from backend.compression import init_compression
+from backend.server_timing import init_server_timing
+from backend.revocation import get_revocation_list, init_revocation
+from backend.single_flight import get_single_flight, init_single_flight
+from backend.validation import init_validation
+from backend.readiness import init_readiness, readiness
+from backend.group_commit import init_group_commit
+from backend.cli import karyamate_cli
+from backend.migrations import run_migrations
+from backend.sharding import init_sharding
 from backend import models
 
 
@@ -55,11 +65,22 @@ def create_app():
     # -------------------------------------------------
     db.init_app(app)
     jwt.init_app(app)
+    init_revocation(app)
+    init_server_timing(app)  # first: its timer wraps the other request hooks
+    init_readiness(app)
+    init_sharding(app)
     CORS(app, resources={r"/api/*": {"origins": app.config["CORS_ORIGINS"]}})
+    init_compression(app)
+    init_group_commit(app)
+    init_single_flight(app)
+    init_validation(app)  # request body validators from docs/api/openapi.yaml
 
     # Register blueprints (auth, tasks, …)
     register_routes(app)
 
+    # CLI: flask karyamate <command>
+    app.cli.add_command(karyamate_cli)
+
     # -------------------------------------------------
     # Routes WITH Swagger docstrings
     # -------------------------------------------------
@@ -78,6 +99,58 @@ def create_app():
         """
         return jsonify({"status": "ok"})
 
+    @app.route("/ready", methods=["GET"])
+    def ready():
+        """
+        Readiness Check
+        ---
+        tags:
+          - System
+        description: >
+          Whether this worker should receive traffic: database reachable and
+          fast enough, connection pool not saturated, recent request queue
+          time (X-Request-Start from a trusted proxy, READY_TRUST_REQUEST_START)
+          low, no pending migrations. Thresholds are
+          the READY_* settings; the result is cached for READY_CACHE_SECONDS.
+        responses:
+          200:
+            description: Ready (body has every check's measurements)
+            examples:
+              application/json: { "status": "ready", "failing": [] }
+          503:
+            description: Not ready; `failing` names the checks that failed
+        """
+        result, cached = readiness()
+        body = {"status": "ready" if result["ready"] else "not ready", "cached": cached, **result}
+        body.pop("ready")
+        resp = jsonify(body)
+        resp.headers["Cache-Control"] = "no-store"
+        return resp, 200 if result["ready"] else 503
+
+    @app.route("/metrics", methods=["GET"])
+    def metrics():
+        """
+        In-process counters
+        ---
+        tags:
+          - System
+        description: >
+          Counters kept in memory by the worker process that serves this
+          request (each gunicorn worker has its own). single_flight counts,
+          per endpoint, requests that ran the view (executed), got a copy of a
+          concurrent identical request's response (coalesced) or gave up
+          waiting for it (fallbacks).
+        responses:
+          200:
+            description: Counters by subsystem (null when it is disabled)
+        """
+        flights = get_single_flight()
+        revocations = get_revocation_list()
+        return jsonify({
+            "single_flight": flights.stats() if flights else None,
+            "token_revocation": revocations.snapshot() if revocations else None,
+        })
+
     @app.route("/", methods=["GET"])
     def home():
         """
@@ -115,5 +188,5 @@ if __name__ == "__main__":
     app = create_app()
     with app.app_context():
         from backend import models  # ensures models are registered
-        db.create_all()             # SQLite tables for local dev
+        run_migrations(log=print)   # SQLite tables (and shard tables) for local dev, kept up to date
     app.run(host="127.0.0.1", port=5000, debug=True)
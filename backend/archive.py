@@ -0,0 +1,84 @@
+# backend/archive.py
+
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import delete, insert, literal, select
+
+from backend.extensions import db
+from backend.jobs import register_job
+from backend.models import ArchivedTask, Task
+from backend.sharding import each_shard
+
+TASK_COLUMNS = [c.name for c in Task.__table__.columns]
+
+
+def archive_completed_tasks(older_than_days=None, batch_size=None, max_batches=None, log=None):
+    """
+    Move completed tasks whose last update is older than `older_than_days`
+    from `tasks` to `tasks_archive`, `batch_size` rows per transaction.
+
+    Each batch is a short INSERT ... SELECT + DELETE so the hot table is never
+    locked for long. Returns the number of tasks moved.
+    """
+    cfg = current_app.config
+    if older_than_days is None:
+        older_than_days = cfg["ARCHIVE_AFTER_DAYS"]
+    if batch_size is None:
+        batch_size = cfg["ARCHIVE_BATCH_SIZE"]
+
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    moved = 0
+    batches = 0
+
+    # Repeated in every statement: a task reopened or edited after the ids
+    # were read must stay where it is
+    archivable = (Task.completed.is_(True), Task.updated_at < cutoff)
+    while max_batches is None or batches < max_batches:
+        q = select(Task.id).where(*archivable).order_by(Task.id).limit(batch_size)
+        if db.session.get_bind(Task).dialect.name == "postgresql":
+            # Lock the batch until commit; rows being edited right now wait for the next run
+            q = q.with_for_update(skip_locked=True)
+        ids = db.session.scalars(q).all()
+        if not ids:
+            break
+
+        archived_at = datetime.utcnow()
+        db.session.execute(
+            insert(ArchivedTask.__table__).from_select(
+                TASK_COLUMNS + ["archived_at"],
+                select(*Task.__table__.columns, literal(archived_at)).where(Task.id.in_(ids), *archivable),
+            )
+        )
+        count = db.session.execute(delete(Task.__table__).where(Task.id.in_(ids), *archivable)).rowcount
+        db.session.commit()
+
+        moved += count
+        batches += 1
+        if log:
+            log(f"archived batch {batches}: {count} task(s), {moved} total")
+
+    return moved
+
+
+@register_job("archive_completed_tasks", concurrency=1)
+def archive_job(payload):
+    for _ in each_shard():
+        archive_completed_tasks(
+            older_than_days=payload.get("older_than_days"),
+            batch_size=payload.get("batch_size"),
+        )
+
+
+def find_archived_task(task_id, user_id, session=None):
+    session = session or db.session
+    return session.query(ArchivedTask).filter_by(id=task_id, user_id=user_id).first()
+
+
+def restore_archived_task(archived: ArchivedTask, session=None) -> Task:
+    """Move one task back to the hot table (e.g. because it is being edited)."""
+    session = session or db.session
+    t = Task(**{name: getattr(archived, name) for name in TASK_COLUMNS})
+    session.delete(archived)
+    session.add(t)
+    return t
@@ -0,0 +1,130 @@
+# backend/cli.py
+
+import json
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+from backend.archive import archive_completed_tasks
+from backend.migrations import migration_status, run_migrations
+from backend.sharding import each_shard, get_router, init_databases, move_user, shard_summary
+from backend.jobs import JOB_HANDLERS, enqueue, job_stats, run_worker_pool
+
+# Usage: flask --app "backend.app:create_app()" karyamate <command>
+karyamate_cli = AppGroup("karyamate", help="KaryaMate maintenance commands.")
+
+
+@karyamate_cli.command("init-db")
+def init_db_command():
+    """Create missing tables (in every shard too, when sharding is on)."""
+    init_databases()
+    click.echo("Tables created.")
+
+
+@karyamate_cli.command("migrate")
+@click.option("--status", is_flag=True, help="List pending migrations and exit.")
+@click.option("--batch-size", type=int, default=None,
+              help="Rows updated per backfill transaction (default: MIGRATION_BATCH_SIZE).")
+@click.option("--pause", type=float, default=None,
+              help="Milliseconds to sleep between backfill batches (default: MIGRATION_BATCH_PAUSE_MS).")
+def migrate_command(status, batch_size, pause):
+    """Apply pending schema migrations to every database, online."""
+    if status:
+        for database, pending in migration_status().items():
+            if not pending:
+                click.echo(f"{database}: up to date")
+            for version, name in pending:
+                click.echo(f"{database}: pending {version:04d} {name}")
+        return
+    ran = run_migrations(log=click.echo, batch_size=batch_size, pause_ms=pause)
+    click.echo(f"Done: {ran} migration(s) applied.")
+
+
+@karyamate_cli.command("archive")
+@click.option("--older-than-days", type=int, default=None,
+              help="Only archive tasks completed at least this many days ago "
+                   "(default: ARCHIVE_AFTER_DAYS).")
+@click.option("--batch-size", type=int, default=None,
+              help="Tasks moved per transaction (default: ARCHIVE_BATCH_SIZE).")
+@click.option("--max-batches", type=int, default=None,
+              help="Stop after this many batches (default: until done).")
+def archive_command(older_than_days, batch_size, max_batches):
+    """Move old completed tasks from `tasks` to `tasks_archive`."""
+    moved = 0
+    for shard in each_shard():
+        if shard:
+            click.echo(f"{shard}:")
+        moved += archive_completed_tasks(
+            older_than_days=older_than_days,
+            batch_size=batch_size,
+            max_batches=max_batches,
+            log=click.echo,
+        )
+    click.echo(f"Done: {moved} task(s) archived.")
+
+
+@karyamate_cli.command("worker")
+@click.option("--processes", type=int, default=None,
+              help="Worker processes, i.e. max jobs running at once "
+                   "(default: JOBS_WORKER_PROCESSES).")
+@click.option("--poll-interval", type=float, default=None,
+              help="Seconds to sleep when the queue is empty (default: JOBS_POLL_INTERVAL).")
+@click.option("--burst", is_flag=True, help="Exit once the queue is empty.")
+def worker_command(processes, poll_interval, burst):
+    """Run background jobs from the `jobs` table."""
+    cfg = current_app.config
+    processes = processes or cfg["JOBS_WORKER_PROCESSES"]
+    poll_interval = poll_interval or cfg["JOBS_POLL_INTERVAL"]
+    click.echo(f"Starting {processes} worker process(es); jobs: {', '.join(sorted(JOB_HANDLERS))}")
+    run_worker_pool(processes, poll_interval, burst=burst)
+
+
+@karyamate_cli.command("enqueue")
+@click.argument("name", type=click.Choice(sorted(JOB_HANDLERS)))
+@click.option("--payload", default="{}", help="JSON object passed to the job.")
+@click.option("--delay", type=float, default=0, help="Seconds before the job may run.")
+def enqueue_command(name, payload, delay):
+    """Queue a background job (e.g. from cron)."""
+    try:
+        payload = json.loads(payload)
+    except json.JSONDecodeError as e:
+        raise click.BadParameter(f"not valid JSON: {e}", param_hint="--payload")
+    if not isinstance(payload, dict):
+        raise click.BadParameter("must be a JSON object", param_hint="--payload")
+    job = enqueue(name, payload, delay=delay)
+    click.echo(f"Queued job #{job.id} ({name}).")
+
+
+@karyamate_cli.command("jobs")
+def jobs_command():
+    """Show job counts by status and run-time stats."""
+    stats = job_stats()
+    if not stats:
+        click.echo("No jobs.")
+        return
+    for name, entry in sorted(stats.items()):
+        counts = ", ".join(f"{k}={v}" for k, v in sorted(entry["counts"].items()))
+        timing = ""
+        if entry["avg_ms"] is not None:
+            timing = f"  avg {entry['avg_ms']:.1f} ms, max {entry['max_ms']:.1f} ms"
+        click.echo(f"{name}: {counts}{timing}")
+
+
+@karyamate_cli.command("shards")
+def shards_command():
+    """Show configured shards and how many users are pinned to each."""
+    if get_router() is None:
+        click.echo("Sharding is off (SHARD_DATABASE_URLS is empty).")
+        return
+    for shard, users in shard_summary().items():
+        click.echo(f"{shard}: {users} user(s) in directory")
+
+
+@karyamate_cli.command("move-user")
+@click.argument("user_id", type=int)
+@click.argument("target")
+@click.option("--batch-size", type=int, default=500, help="Rows copied per transaction.")
+def move_user_command(user_id, target, batch_size):
+    """Move USER_ID's tasks to shard TARGET without taking them offline."""
+    move_user(user_id, target, batch_size=batch_size, log=click.echo)
@@ -0,0 +1,217 @@
+# backend/compression.py
+
+import zlib
+
+from flask import request
+
+# Optional encoders: used only when the packages are installed.
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+
+COMPRESSIBLE_MIMETYPES = {
+    "application/json",
+    "application/msgpack",
+    "application/x-ndjson",
+    "text/csv",
+    "text/event-stream",
+    "text/html",
+    "text/plain",
+}
+
+
+# -------------------------------------------------
+# Encoders
+# -------------------------------------------------
+class _ZlibEncoder:
+    """gzip / deflate via zlib (wbits 31 = gzip container, 15 = zlib stream)."""
+
+    def __init__(self, level: int, wbits: int):
+        self._c = zlib.compressobj(level, zlib.DEFLATED, wbits)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._c.compress(data)
+
+    def flush(self) -> bytes:
+        return self._c.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._c.flush(zlib.Z_FINISH)
+
+
+class _BrotliEncoder:
+    def __init__(self, level: int):
+        self._c = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._c.process(data)
+
+    def flush(self) -> bytes:
+        return self._c.flush()
+
+    def finish(self) -> bytes:
+        return self._c.finish()
+
+
+class _ZstdEncoder:
+    def __init__(self, level: int):
+        self._c = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._c.compress(data)
+
+    def flush(self) -> bytes:
+        return self._c.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._c.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH)
+
+
+def available_encodings():
+    """Encodings this process can produce, ignoring configuration."""
+    names = {"gzip", "deflate"}
+    if brotli is not None:
+        names.add("br")
+    if zstandard is not None:
+        names.add("zstd")
+    return names
+
+
+def make_encoder(encoding: str, config):
+    if encoding == "gzip":
+        return _ZlibEncoder(config["COMPRESS_LEVEL"], 31)
+    if encoding == "deflate":
+        return _ZlibEncoder(config["COMPRESS_LEVEL"], 15)
+    if encoding == "br":
+        return _BrotliEncoder(config["COMPRESS_BR_LEVEL"])
+    if encoding == "zstd":
+        return _ZstdEncoder(config["COMPRESS_ZSTD_LEVEL"])
+    raise ValueError(f"unsupported encoding: {encoding}")
+
+
+# -------------------------------------------------
+# Negotiation
+# -------------------------------------------------
+def parse_accept_encoding(header: str) -> dict:
+    """Parse an Accept-Encoding header into {coding: q}."""
+    accepted = {}
+    for part in (header or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        coding, _, params = part.partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding.strip().lower()] = q
+    return accepted
+
+
+def negotiate_encoding(header: str, preferred) -> str | None:
+    """
+    Pick the first server-preferred encoding the client accepts (q > 0).
+    Returns None when the response should go out uncompressed.
+    """
+    accepted = parse_accept_encoding(header)
+    if not accepted:
+        return None
+    wildcard = accepted.get("*", 0.0)
+    best, best_q = None, 0.0
+    for coding in preferred:
+        q = accepted.get(coding, wildcard)
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def _preferred_encodings(config):
+    available = available_encodings()
+    configured = [
+        c.strip().lower()
+        for c in config["COMPRESS_ALGORITHMS"].split(",")
+        if c.strip()
+    ]
+    return [c for c in configured if c in available]
+
+
+def _compress_stream(chunks, encoder):
+    """Compress a streamed body chunk by chunk, flushing after each one."""
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode("utf-8")
+            if not chunk:
+                continue
+            out = encoder.compress(chunk) + encoder.flush()
+            if out:
+                yield out
+        tail = encoder.finish()
+        if tail:
+            yield tail
+    finally:
+        close = getattr(chunks, "close", None)
+        if close is not None:
+            close()
+
+
+# -------------------------------------------------
+# Flask integration
+# -------------------------------------------------
+def init_compression(app):
+    """Register an after_request hook that compresses eligible responses."""
+    if not app.config.get("COMPRESS_ENABLED", True):
+        return
+
+    preferred = _preferred_encodings(app.config)
+
+    @app.after_request
+    def compress_response(response):
+        if response.mimetype not in COMPRESSIBLE_MIMETYPES:
+            return response
+
+        response.vary.add("Accept-Encoding")
+
+        if (
+            request.method == "HEAD"
+            or response.status_code < 200
+            or response.status_code in (204, 304)
+            or "Content-Encoding" in response.headers
+            or response.direct_passthrough
+        ):
+            return response
+
+        encoding = negotiate_encoding(request.headers.get("Accept-Encoding"), preferred)
+        if not encoding:
+            return response
+
+        # A compressed body is a different representation; keep validators honest.
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+
+        if response.is_streamed:
+            encoder = make_encoder(encoding, app.config)
+            response.response = _compress_stream(response.response, encoder)
+            response.headers.pop("Content-Length", None)
+            response.headers["Content-Encoding"] = encoding
+            return response
+
+        data = response.get_data()
+        if len(data) < app.config["COMPRESS_MIN_SIZE"]:
+            return response
+
+        encoder = make_encoder(encoding, app.config)
+        response.set_data(encoder.compress(data) + encoder.finish())
+        response.headers["Content-Encoding"] = encoding
+        return response
@@ -1,5 +1,13 @@
 import os
 
+
+def normalize_db_url(url: str) -> str:
+    """SQLAlchemy wants postgresql://, Render/Heroku hand out postgres://."""
+    if url.startswith("postgres://"):
+        return url.replace("postgres://", "postgresql://", 1)
+    return url
+
+
 class Config:
     # Secret & JWT
     SECRET_KEY = os.getenv("SECRET_KEY", "dev_secret_change_me")
@@ -9,11 +17,106 @@ class Config:
     DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///db.sqlite3")
 
     # SQLAlchemy URI normalization for Postgres (Render/Heroku style)
-    if DATABASE_URL.startswith("postgres://"):
-        DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql://", 1)
+    DATABASE_URL = normalize_db_url(DATABASE_URL)
 
     SQLALCHEMY_DATABASE_URI = DATABASE_URL
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # Sharding: comma-separated DB URLs, one per shard (empty = everything in DATABASE_URL).
+    # Users and the shard directory stay in DATABASE_URL; task data lives in shard binds.
+    #   SHARD_DATABASE_URLS=sqlite:///shard0.sqlite3,sqlite:///shard1.sqlite3
+    SHARD_DATABASE_URLS = [
+        normalize_db_url(u.strip())
+        for u in os.getenv("SHARD_DATABASE_URLS", "").split(",")
+        if u.strip()
+    ]
+    SQLALCHEMY_BINDS = {f"shard{i}": url for i, url in enumerate(SHARD_DATABASE_URLS)}
+    SHARD_VNODES = int(os.getenv("SHARD_VNODES", "64"))                  # ring points per shard
+    SHARD_DIRECTORY_CACHE_TTL = float(os.getenv("SHARD_DIRECTORY_CACHE_TTL", "5"))  # seconds
+    SHARD_ID_BLOCK_SIZE = int(os.getenv("SHARD_ID_BLOCK_SIZE", "1000"))
+    # First task id handed out once sharding is on; set above MAX(tasks.id) of existing data
+    SHARD_ID_START = int(os.getenv("SHARD_ID_START", "1"))
+
     # CORS
     CORS_ORIGINS = os.getenv("CORS_ORIGINS", "*")
+
+    # Archival: completed tasks untouched for this many days move to tasks_archive
+    ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", "30"))
+    ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "500"))
+
+    # Response compression (negotiated via Accept-Encoding)
+    COMPRESS_ENABLED = os.getenv("COMPRESS_ENABLED", "true").lower() in {"1", "true", "yes", "on"}
+    # Server preference order; br/zstd are skipped if brotli/zstandard aren't installed
+    COMPRESS_ALGORITHMS = os.getenv("COMPRESS_ALGORITHMS", "br,zstd,gzip,deflate")
+    # Bodies smaller than this (bytes) are sent as-is
+    COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", "500"))
+    COMPRESS_LEVEL = int(os.getenv("COMPRESS_LEVEL", "6"))            # gzip/deflate: 1-9
+    COMPRESS_BR_LEVEL = int(os.getenv("COMPRESS_BR_LEVEL", "4"))      # brotli: 0-11
+    COMPRESS_ZSTD_LEVEL = int(os.getenv("COMPRESS_ZSTD_LEVEL", "3"))  # zstd: 1-22
+
+    # Background jobs (flask karyamate worker)
+    JOBS_WORKER_PROCESSES = int(os.getenv("JOBS_WORKER_PROCESSES", "2"))
+    JOBS_POLL_INTERVAL = float(os.getenv("JOBS_POLL_INTERVAL", "1.0"))    # seconds
+    JOBS_MAX_ATTEMPTS = int(os.getenv("JOBS_MAX_ATTEMPTS", "5"))
+    JOBS_BACKOFF_BASE = float(os.getenv("JOBS_BACKOFF_BASE", "5"))        # seconds, doubles per retry
+    JOBS_BACKOFF_MAX = float(os.getenv("JOBS_BACKOFF_MAX", "600"))
+    JOBS_TIMEOUT = int(os.getenv("JOBS_TIMEOUT", "300"))                  # seconds per job run
+
+    # Server-Sent Events (GET /api/tasks/events). Every open stream holds a
+    # worker thread: run gunicorn with threaded workers (-k gthread --threads N,
+    # see Procfile), never the default sync worker.
+    SSE_POLL_INTERVAL = float(os.getenv("SSE_POLL_INTERVAL", "2.0"))      # seconds between DB polls
+    SSE_HEARTBEAT_INTERVAL = float(os.getenv("SSE_HEARTBEAT_INTERVAL", "15"))
+    # Close streams after this long; EventSource reconnects with Last-Event-ID,
+    # so threads are handed back regularly and deploys drain quickly.
+    SSE_MAX_DURATION = float(os.getenv("SSE_MAX_DURATION", "60"))
+    # Only deliver events this old, so a slower concurrent commit with a lower id isn't skipped
+    SSE_SETTLE_MS = int(os.getenv("SSE_SETTLE_MS", "500"))
+    SSE_EVENT_RETENTION_HOURS = int(os.getenv("SSE_EVENT_RETENTION_HOURS", "24"))
+
+    # Idempotency-Key support on task writes
+    IDEMPOTENCY_TTL_HOURS = int(os.getenv("IDEMPOTENCY_TTL_HOURS", "24"))
+
+    # Group commit: coalesce concurrent task writes in a worker into one
+    # transaction (backend/group_commit.py). Needs threaded workers.
+    GROUP_COMMIT_ENABLED = os.getenv("GROUP_COMMIT_ENABLED", "false").lower() in {"1", "true", "yes", "on"}
+    GROUP_COMMIT_WINDOW_MS = float(os.getenv("GROUP_COMMIT_WINDOW_MS", "5"))   # max wait to fill a batch
+    GROUP_COMMIT_MAX_BATCH = int(os.getenv("GROUP_COMMIT_MAX_BATCH", "64"))    # commit early at this many writes
+    GROUP_COMMIT_DURABILITY = os.getenv("GROUP_COMMIT_DURABILITY", "full")     # full | relaxed
+
+    # Server-Timing header (db/app durations) on every response
+    SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING_ENABLED", "true").lower() in {"1", "true", "yes", "on"}
+
+    # Schema migrations (flask karyamate migrate)
+    MIGRATION_BATCH_SIZE = int(os.getenv("MIGRATION_BATCH_SIZE", "1000"))            # rows per backfill transaction
+    MIGRATION_BATCH_PAUSE_MS = float(os.getenv("MIGRATION_BATCH_PAUSE_MS", "100"))   # sleep between batches
+    # Postgres: give up on a table lock after this long instead of queueing traffic behind it
+    MIGRATION_LOCK_TIMEOUT_MS = int(os.getenv("MIGRATION_LOCK_TIMEOUT_MS", "5000"))
+    MIGRATION_LOCK_RETRIES = int(os.getenv("MIGRATION_LOCK_RETRIES", "5"))
+
+    # Token revocation (POST /api/auth/logout), checked in memory on every request
+    REVOCATION_ENABLED = os.getenv("REVOCATION_ENABLED", "true").lower() in {"1", "true", "yes", "on"}
+    REVOCATION_REFRESH_SECONDS = float(os.getenv("REVOCATION_REFRESH_SECONDS", "2"))     # other workers see a logout within this
+    REVOCATION_REBUILD_SECONDS = float(os.getenv("REVOCATION_REBUILD_SECONDS", "3600"))  # full reload, drops expired tokens
+    REVOCATION_BLOOM_CAPACITY = int(os.getenv("REVOCATION_BLOOM_CAPACITY", "100000"))
+    REVOCATION_BLOOM_ERROR_RATE = float(os.getenv("REVOCATION_BLOOM_ERROR_RATE", "0.001"))
+
+    # Single-flight: identical concurrent GETs in a worker share one execution.
+    # Needs threaded workers (gunicorn -k gthread); a no-op with sync workers.
+    SINGLE_FLIGHT_ENABLED = os.getenv("SINGLE_FLIGHT_ENABLED", "true").lower() in {"1", "true", "yes", "on"}
+    SINGLE_FLIGHT_WAIT_SECONDS = float(os.getenv("SINGLE_FLIGHT_WAIT_SECONDS", "10"))  # then run it yourself
+
+    # Request bodies are validated against this spec's components/schemas
+    OPENAPI_SPEC_PATH = os.getenv("OPENAPI_SPEC_PATH", "")  # default: docs/api/openapi.yaml
+
+    # Readiness probe (GET /ready): 503 when any threshold is crossed
+    READY_DB_LATENCY_MS = float(os.getenv("READY_DB_LATENCY_MS", "250"))        # SELECT 1 round trip
+    READY_POOL_SATURATION = float(os.getenv("READY_POOL_SATURATION", "0.9"))    # checked out / (size + max_overflow)
+    READY_QUEUE_MS = float(os.getenv("READY_QUEUE_MS", "1000"))                 # p95 X-Request-Start queue time
+    READY_QUEUE_WINDOW_SECONDS = float(os.getenv("READY_QUEUE_WINDOW_SECONDS", "60"))
+    # Clients can send X-Request-Start too: it is only read when this is on, and
+    # only from the proxy addresses below (IPs or CIDRs, comma-separated)
+    READY_TRUST_REQUEST_START = os.getenv("READY_TRUST_REQUEST_START", "false").lower() in {"1", "true", "yes", "on"}
+    READY_TRUSTED_PROXIES = os.getenv("READY_TRUSTED_PROXIES", "127.0.0.1,::1")
+    READY_REQUIRE_MIGRATIONS = os.getenv("READY_REQUIRE_MIGRATIONS", "true").lower() in {"1", "true", "yes", "on"}
+    READY_CACHE_SECONDS = float(os.getenv("READY_CACHE_SECONDS", "2"))
@@ -0,0 +1,110 @@
+# backend/events.py
+
+import json
+import time
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import delete, func, select
+
+from backend.extensions import db
+from backend.jobs import register_job
+from backend.models import TaskEvent
+from backend.sharding import each_shard
+
+EVENTS_PER_POLL = 100
+
+
+def record_task_event(user_id, kind: str, data: dict, session=None):
+    """Add a change event to the current transaction (committed with the write)."""
+    (session or db.session).add(
+        TaskEvent(user_id=int(user_id), task_id=data["id"], kind=kind, data=data)
+    )
+
+
+def latest_event_id(user_id) -> int:
+    return db.session.scalar(
+        select(func.max(TaskEvent.id)).where(TaskEvent.user_id == int(user_id))
+    ) or 0
+
+
+def events_since(user_id, last_id: int, settle_ms: int = 0, limit: int = EVENTS_PER_POLL):
+    """Events for `user_id` newer than `last_id`, oldest first."""
+    q = (
+        select(TaskEvent)
+        .where(TaskEvent.user_id == int(user_id), TaskEvent.id > last_id)
+        .order_by(TaskEvent.id)
+        .limit(limit)
+    )
+    if settle_ms:
+        q = q.where(TaskEvent.created_at <= datetime.utcnow() - timedelta(milliseconds=settle_ms))
+    return db.session.scalars(q).all()
+
+
+def format_sse(event: TaskEvent) -> str:
+    payload = json.dumps(event.data, separators=(",", ":"))
+    return f"id: {event.id}\nevent: {event.kind}\ndata: {payload}\n\n"
+
+
+def event_stream(user_id, last_id: int):
+    """
+    Generator yielding SSE frames for one client.
+
+    Polls `task_events` with a watermark, so it works across gunicorn
+    workers with nothing but the shared database. The stream occupies its
+    worker thread until SSE_MAX_DURATION, so it needs threaded workers
+    (gunicorn -k gthread --threads N): a sync worker would serve nothing else.
+    """
+    cfg = current_app.config
+    poll = cfg["SSE_POLL_INTERVAL"]
+    heartbeat = cfg["SSE_HEARTBEAT_INTERVAL"]
+    settle_ms = cfg["SSE_SETTLE_MS"]
+    deadline = time.monotonic() + cfg["SSE_MAX_DURATION"]
+
+    yield f"retry: {int(poll * 1000) + 1000}\n\n"
+    last_sent = time.monotonic()
+
+    while time.monotonic() < deadline:
+        events = events_since(user_id, last_id, settle_ms=settle_ms)
+        # Render before the rollback: it expires the loaded rows, and reading
+        # them afterwards would reload each one in a new transaction
+        frames = "".join(format_sse(e) for e in events)
+        if events:
+            last_id = events[-1].id
+        count = len(events)
+        # End the read transaction so the connection goes back to the pool while we sleep
+        db.session.rollback()
+
+        if frames:
+            yield frames
+            last_sent = time.monotonic()
+            if count == EVENTS_PER_POLL:
+                continue  # more waiting; don't sleep
+        elif time.monotonic() - last_sent >= heartbeat:
+            yield ": heartbeat\n\n"
+            last_sent = time.monotonic()
+
+        time.sleep(poll)
+
+
+def prune_task_events(retention_hours=None, batch_size: int = 1000) -> int:
+    if retention_hours is None:
+        retention_hours = current_app.config["SSE_EVENT_RETENTION_HOURS"]
+    cutoff = datetime.utcnow() - timedelta(hours=retention_hours)
+    removed = 0
+    while True:
+        ids = db.session.scalars(
+            select(TaskEvent.id).where(TaskEvent.created_at < cutoff).limit(batch_size)
+        ).all()
+        if not ids:
+            break
+        db.session.execute(delete(TaskEvent).where(TaskEvent.id.in_(ids)))
+        db.session.commit()
+        removed += len(ids)
+    return removed
+
+
+@register_job("prune_task_events", concurrency=1)
+def prune_task_events_job(payload):
+    for _ in each_shard():
+        prune_task_events(retention_hours=payload.get("retention_hours"))
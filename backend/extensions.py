@@ -1,5 +1,32 @@
+import sqlalchemy as sa
+from flask import current_app
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
 from flask_jwt_extended import JWTManager
 
-db = SQLAlchemy()
+
+class ShardedSession(Session):
+    """
+    Session that sends tables marked info={"sharded": True} to the current
+    user's shard (see backend/sharding.py). Everything else, and every table
+    when sharding is off, uses the normal bind lookup.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None:
+            router = current_app.extensions.get("shard_router")
+            if router is not None:
+                table = None
+                if mapper is not None:
+                    table = sa.inspect(mapper).local_table
+                elif isinstance(clause, sa.Table):
+                    table = clause
+                elif isinstance(clause, sa.UpdateBase) and isinstance(clause.table, sa.Table):
+                    table = clause.table
+                if table is not None and table.info.get("sharded"):
+                    return router.current_engine()
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+db = SQLAlchemy(session_options={"class_": ShardedSession})
 jwt = JWTManager()
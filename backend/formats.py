@@ -0,0 +1,100 @@
+# backend/formats.py
+
+import calendar
+
+from flask import Response, jsonify, request
+
+from backend.utils import PRIORITY_CODES, PRIORITY_LEVELS
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None
+
+MSGPACK_MIMETYPE = "application/msgpack"
+LAYOUTS = {"rows", "columnar"}
+
+# Field order for the columnar layout
+TASK_FIELDS = (
+    "id",
+    "title",
+    "description",
+    "completed",
+    "priority",
+    "due_date",
+    "user_id",
+    "created_at",
+    "updated_at",
+    "version",
+)
+
+
+def to_epoch(dt):
+    """Naive UTC datetime -> integer seconds since the epoch (None stays None)."""
+    if dt is None:
+        return None
+    return calendar.timegm(dt.timetuple())
+
+
+def tasks_to_columnar(tasks):
+    """
+    One array per field instead of one object per task.
+    Timestamps are epoch seconds and priority is an index into `priority_levels`.
+    """
+    columns = {name: [] for name in TASK_FIELDS}
+    for t in tasks:
+        columns["id"].append(t.id)
+        columns["title"].append(t.title)
+        columns["description"].append(t.description)
+        columns["completed"].append(bool(t.completed))
+        columns["priority"].append(PRIORITY_CODES.get(t.priority, PRIORITY_CODES["Medium"]))
+        columns["due_date"].append(to_epoch(t.due_date))
+        columns["user_id"].append(t.user_id)
+        columns["created_at"].append(to_epoch(t.created_at))
+        columns["updated_at"].append(to_epoch(t.updated_at))
+        columns["version"].append(t.version)
+
+    return {
+        "layout": "columnar",
+        "count": len(tasks),
+        "priority_levels": list(PRIORITY_LEVELS),
+        "columns": columns,
+    }
+
+
+def requested_layout():
+    """Return the ?layout= value, or None if it is not one we support."""
+    layout = (request.args.get("layout") or "rows").lower()
+    return layout if layout in LAYOUTS else None
+
+
+def wants_msgpack() -> bool:
+    """True if the client prefers MessagePack over JSON (and we can produce it)."""
+    if msgpack is None:
+        return False
+    best = request.accept_mimetypes.best_match(["application/json", MSGPACK_MIMETYPE])
+    return best == MSGPACK_MIMETYPE
+
+
+def payload_response(payload, status: int = 200):
+    """Serialize `payload` as MessagePack or JSON depending on the Accept header."""
+    if wants_msgpack():
+        body = msgpack.packb(payload, use_bin_type=True)
+        return Response(body, status=status, mimetype=MSGPACK_MIMETYPE)
+    return jsonify(payload), status
+
+
+def tasks_response(tasks, to_dict, status: int = 200):
+    """
+    Render a list of Task rows in the requested layout and encoding.
+    `to_dict` is used for the default row layout.
+    """
+    layout = requested_layout()
+    if layout is None:
+        return jsonify({"message": "layout must be one of: rows, columnar"}), 400
+
+    if layout == "columnar":
+        payload = tasks_to_columnar(tasks)
+    else:
+        payload = [to_dict(t) for t in tasks]
+    return payload_response(payload, status)
@@ -0,0 +1,193 @@
+# backend/group_commit.py
+"""
+Opt-in group commit for task writes (GROUP_COMMIT_ENABLED).
+
+Without it every write request pays for its own COMMIT (one fsync). With it,
+write requests in the same worker process hand their write to a committer
+thread, which runs up to GROUP_COMMIT_MAX_BATCH of them in one transaction
+and commits once every GROUP_COMMIT_WINDOW_MS. Each request still waits for
+the commit that contains its write and gets its own result or exception:
+if a batch fails, its writes are re-run one transaction each.
+
+GROUP_COMMIT_DURABILITY:
+  full     - a request returns once its batch is committed with the
+             database's normal durability (default)
+  relaxed  - Postgres commits with synchronous_commit=off, SQLite runs in
+             WAL with synchronous=NORMAL; recent acknowledged writes can be
+             lost on a crash/power cut, trading that for more throughput
+
+Only helps when a worker handles requests concurrently (gunicorn --threads).
+"""
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from flask import current_app, g
+from sqlalchemy import event, text
+
+from backend.extensions import db
+from backend.models import Task
+from backend.sharding import get_router, use_shard
+
+WAIT_TIMEOUT = 30  # seconds a request waits for its batch
+DURABILITY_MODES = ("full", "relaxed")
+
+
+class _Write:
+    __slots__ = ("fn", "staged", "shard", "future")
+
+    def __init__(self, fn, staged, shard):
+        self.fn = fn
+        self.staged = staged
+        self.shard = shard
+        self.future = Future()
+
+
+class GroupCommitter:
+    def __init__(self, app):
+        self.app = app
+        self.window = app.config["GROUP_COMMIT_WINDOW_MS"] / 1000
+        self.max_batch = app.config["GROUP_COMMIT_MAX_BATCH"]
+        self.durability = app.config["GROUP_COMMIT_DURABILITY"]
+        self._queue = queue.Queue()
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self.stats = {"batches": 0, "writes": 0, "fallbacks": 0}
+
+    def submit(self, fn, staged, shard):
+        self._ensure_thread()
+        write = _Write(fn, staged, shard)
+        self._queue.put(write)
+        return write.future.result(timeout=WAIT_TIMEOUT)
+
+    def _ensure_thread(self):
+        # Threads don't survive gunicorn's fork: start one per process, lazily
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid():
+                self._queue = queue.Queue()
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name="group-commit", daemon=True)
+                self._thread.start()
+
+    # ---------- committer thread ----------
+    def _run(self):
+        with self.app.app_context():
+            session = db.session()
+            session.expire_on_commit = False  # results outlive the batch
+            while True:
+                batch = [self._queue.get()]
+                deadline = time.monotonic() + self.window
+                while len(batch) < self.max_batch:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(self._queue.get(timeout=remaining))
+                    except queue.Empty:
+                        break
+
+                by_shard = {}
+                for write in batch:
+                    by_shard.setdefault(write.shard, []).append(write)
+                for shard, writes in by_shard.items():
+                    with use_shard(shard):
+                        self._commit(session, writes)
+
+    def _relax_durability(self, session):
+        if self.durability != "relaxed":
+            return
+        conn = session.connection(bind_arguments={"mapper": Task})
+        if conn.dialect.name == "postgresql":
+            # Commit returns before the WAL is flushed: a crash can lose the
+            # last few hundred ms of acknowledged writes, but never corrupts
+            conn.execute(text("SET LOCAL synchronous_commit TO OFF"))
+
+    def _apply(self, session, write):
+        for obj in write.staged:
+            session.add(obj)
+        result = write.fn(session)
+        session.flush()
+        return result
+
+    def _commit(self, session, writes):
+        try:
+            self._relax_durability(session)
+            results = [self._apply(session, w) for w in writes]
+            session.commit()
+        except Exception:
+            session.rollback()
+            self.stats["fallbacks"] += 1
+            # Isolate the failure: one transaction per write
+            for w in writes:
+                try:
+                    result = self._apply(session, w)
+                    session.commit()
+                    w.future.set_result(result)
+                except Exception as e:
+                    session.rollback()
+                    w.future.set_exception(e)
+                finally:
+                    session.expunge_all()
+            return
+        finally:
+            session.expunge_all()
+        self.stats["batches"] += 1
+        self.stats["writes"] += len(writes)
+        for w, result in zip(writes, results):
+            w.future.set_result(result)
+
+
+def init_group_commit(app):
+    if not app.config.get("GROUP_COMMIT_ENABLED"):
+        return
+    durability = app.config["GROUP_COMMIT_DURABILITY"]
+    if durability not in DURABILITY_MODES:
+        raise ValueError(f"GROUP_COMMIT_DURABILITY must be one of {', '.join(DURABILITY_MODES)}")
+    app.extensions["group_committer"] = GroupCommitter(app)
+
+    if durability == "relaxed":
+        with app.app_context():
+            for engine in db.engines.values():
+                if engine.dialect.name == "sqlite":
+                    event.listen(engine, "connect", _sqlite_relaxed)
+
+
+def _sqlite_relaxed(dbapi_conn, record):
+    # WAL + synchronous=NORMAL: no fsync per commit. A power cut can lose
+    # recent commits; an application crash cannot.
+    cur = dbapi_conn.cursor()
+    cur.execute("PRAGMA journal_mode=WAL")
+    cur.execute("PRAGMA synchronous=NORMAL")
+    cur.close()
+
+
+def stage(obj):
+    """
+    Add `obj` to the request's pending write. With group commit on, it is
+    added to the same batched transaction as the next run_write().
+    """
+    if current_app.extensions.get("group_committer") is None:
+        db.session.add(obj)
+    else:
+        g.setdefault("staged_writes", []).append(obj)
+
+
+def run_write(fn):
+    """
+    Run `fn(session)` and commit it, returning what fn returned.
+    `fn` must not commit and must return plain data (not live ORM objects).
+    """
+    committer = current_app.extensions.get("group_committer")
+    if committer is None:
+        result = fn(db.session)
+        db.session.commit()
+        return result
+    router = get_router()
+    shard = router.current_key() if router is not None else None
+    return committer.submit(fn, g.pop("staged_writes", []), shard)
@@ -0,0 +1,158 @@
+# backend/idempotency.py
+
+import hashlib
+import zlib
+from datetime import datetime, timedelta
+from functools import wraps
+
+from flask import current_app, g, jsonify, make_response, request
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy import delete, inspect, select
+from sqlalchemy.exc import IntegrityError
+
+from backend.extensions import db
+from backend.group_commit import stage
+from backend.jobs import register_job
+from backend.models import IdempotencyKey
+from backend.sharding import each_shard
+
+HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = 255
+
+
+def _fingerprint() -> str:
+    h = hashlib.sha256()
+    h.update(request.method.encode())
+    h.update(b" ")
+    h.update(request.path.encode())
+    h.update(b"\n")
+    h.update(request.get_data(cache=True))
+    return h.hexdigest()
+
+
+def _find(user_id, key):
+    row = IdempotencyKey.query.filter_by(user_id=user_id, key=key).first()
+    if row is not None and row.expires_at <= datetime.utcnow():
+        db.session.delete(row)
+        db.session.commit()
+        return None
+    return row
+
+
+def _replay(row, fingerprint):
+    if row.fingerprint != fingerprint:
+        return jsonify({"message": f"{HEADER} was already used for a different request"}), 422
+    if row.status_code is None:
+        return jsonify({"message": f"a request with this {HEADER} is still in progress"}), 409
+    resp = make_response(zlib.decompress(row.body) if row.body else b"", row.status_code)
+    if row.content_type:
+        resp.headers["Content-Type"] = row.content_type
+    resp.headers["Idempotent-Replayed"] = "true"
+    return resp
+
+
+def _attach(row):
+    """
+    Bring the key row back into db.session to store the response. With group
+    commit it was either inserted by the committer (detached) or never used.
+    """
+    g.pop("staged_writes", None)
+    state = inspect(row)
+    if state.detached:
+        return db.session.merge(row)
+    if state.transient:
+        db.session.add(row)
+    return row
+
+
+def idempotent(view):
+    """
+    Make a write endpoint safe to retry when the client sends Idempotency-Key.
+
+    The key row is staged before the view runs, so the view's own commit
+    (or group-commit batch) claims the key and performs the write atomically. A concurrent
+    duplicate loses on the unique constraint and its write is rolled back.
+    The response is then stored so later repeats are replayed without
+    touching the task tables. Must be used inside @jwt_required().
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        key = request.headers.get(HEADER)
+        if not key:
+            return view(*args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return jsonify({"message": f"{HEADER} must be at most {MAX_KEY_LENGTH} characters"}), 400
+
+        user_id = int(get_jwt_identity())
+        fingerprint = _fingerprint()
+
+        existing = _find(user_id, key)
+        if existing is not None:
+            return _replay(existing, fingerprint)
+
+        ttl = timedelta(hours=current_app.config["IDEMPOTENCY_TTL_HOURS"])
+        row = IdempotencyKey(
+            user_id=user_id,
+            key=key,
+            fingerprint=fingerprint,
+            expires_at=datetime.utcnow() + ttl,
+        )
+        stage(row)
+
+        try:
+            resp = make_response(view(*args, **kwargs))
+        except IntegrityError:
+            # Lost the race to a concurrent request with the same key
+            db.session.rollback()
+            existing = _find(user_id, key)
+            if existing is None:
+                raise
+            return _replay(existing, fingerprint)
+
+        if resp.status_code >= 500:
+            # Let the client retry: forget the key
+            db.session.rollback()
+            db.session.execute(
+                delete(IdempotencyKey).where(
+                    IdempotencyKey.user_id == user_id, IdempotencyKey.key == key
+                )
+            )
+            db.session.commit()
+            return resp
+
+        row = _attach(row)
+        row.status_code = resp.status_code
+        row.content_type = resp.headers.get("Content-Type")
+        row.body = zlib.compress(resp.get_data()) if resp.get_data() else None
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Only possible for responses that did not commit (e.g. 4xx)
+            db.session.rollback()
+            existing = _find(user_id, key)
+            return _replay(existing, fingerprint) if existing else resp
+        return resp
+
+    return wrapper
+
+
+def prune_idempotency_keys(batch_size: int = 1000) -> int:
+    removed = 0
+    while True:
+        ids = db.session.scalars(
+            select(IdempotencyKey.id)
+            .where(IdempotencyKey.expires_at <= datetime.utcnow())
+            .limit(batch_size)
+        ).all()
+        if not ids:
+            break
+        db.session.execute(delete(IdempotencyKey).where(IdempotencyKey.id.in_(ids)))
+        db.session.commit()
+        removed += len(ids)
+    return removed
+
+
+@register_job("prune_idempotency_keys", concurrency=1)
+def prune_idempotency_keys_job(payload):
+    for _ in each_shard():
+        prune_idempotency_keys()
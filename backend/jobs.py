@@ -0,0 +1,324 @@
+# backend/jobs.py
+"""
+Durable background jobs stored in the `jobs` table.
+
+Request handlers call `enqueue(...)`; a separate `flask karyamate worker`
+process pool claims and runs them. No external broker is involved:
+Postgres workers claim with SELECT ... FOR UPDATE SKIP LOCKED, SQLite
+workers with a conditional UPDATE that only one of them can win.
+"""
+
+import logging
+import multiprocessing
+import os
+import random
+import signal
+import socket
+import threading
+import time
+import traceback
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import case, func, select, text, update
+
+from backend.extensions import db
+from backend.models import Job
+
+log = logging.getLogger("karyamate.jobs")
+
+# name -> {"func": callable(payload), "concurrency": int | None, "timeout": int | None}
+JOB_HANDLERS = {}
+
+
+class JobTimeout(Exception):
+    pass
+
+
+def register_job(name: str, concurrency: int = None, timeout: int = None):
+    """
+    Decorator registering `func(payload: dict)` as the handler for jobs named `name`.
+    `concurrency` caps how many of these may run at once across all workers.
+    """
+    def decorator(func):
+        JOB_HANDLERS[name] = {"func": func, "concurrency": concurrency, "timeout": timeout}
+        return func
+    return decorator
+
+
+def enqueue(name: str, payload: dict = None, delay: float = 0, max_attempts: int = None,
+            commit: bool = True) -> Job:
+    """Queue a job. With commit=False it joins the caller's transaction."""
+    if name not in JOB_HANDLERS:
+        raise ValueError(f"unknown job: {name}")
+    job = Job(
+        name=name,
+        payload=payload or {},
+        run_at=datetime.utcnow() + timedelta(seconds=delay),
+        max_attempts=max_attempts or current_app.config["JOBS_MAX_ATTEMPTS"],
+    )
+    db.session.add(job)
+    if commit:
+        db.session.commit()
+    return job
+
+
+# -------------------------------------------------
+# Claiming
+# -------------------------------------------------
+CLAIM_LOCK_NAMESPACE = 727_173_002  # pg_advisory_xact_lock(namespace, hashtext(job name))
+
+
+def _limit(name: str):
+    return JOB_HANDLERS[name]["concurrency"]
+
+
+def _running_count(name: str):
+    """Scalar subquery: jobs named `name` now running (aliased, so it never correlates)."""
+    running = Job.__table__.alias("running")
+    return (
+        select(func.count())
+        .select_from(running)
+        .where(running.c.name == name, running.c.status == "running")
+        .scalar_subquery()
+    )
+
+
+def _saturated_names():
+    """Job names currently at their concurrency limit (to skip them when picking a candidate)."""
+    limited = {n: h["concurrency"] for n, h in JOB_HANDLERS.items() if h["concurrency"]}
+    if not limited:
+        return set()
+    running = db.session.execute(
+        select(Job.name, func.count())
+        .where(Job.status == "running", Job.name.in_(list(limited)))
+        .group_by(Job.name)
+    ).all()
+    return {name for name, count in running if count >= limited[name]}
+
+
+def claim_job(worker_id: str) -> Job | None:
+    """
+    Atomically move one due job from queued to running and return it.
+    Concurrency limits are checked in the same transaction as the claim:
+    under a per-name advisory lock on Postgres, inside the claiming UPDATE
+    on SQLite (which runs one write at a time).
+    """
+    now = datetime.utcnow()
+    is_postgres = db.engine.dialect.name == "postgresql"
+    for _ in range(5):
+        q = (
+            select(Job)
+            .where(Job.status == "queued", Job.run_at <= now, Job.name.in_(list(JOB_HANDLERS)))
+            .order_by(Job.run_at, Job.id)
+            .limit(1)
+        )
+        saturated = _saturated_names()
+        if saturated:
+            q = q.where(Job.name.not_in(saturated))
+
+        if is_postgres:
+            job = db.session.scalars(q.with_for_update(skip_locked=True)).first()
+            if job is None:
+                db.session.rollback()
+                return None
+            limit = _limit(job.name)
+            if limit:
+                # Held until commit, so two workers can't both see a free slot
+                db.session.execute(
+                    text("SELECT pg_advisory_xact_lock(:ns, hashtext(:name))"),
+                    {"ns": CLAIM_LOCK_NAMESPACE, "name": job.name},
+                )
+                if db.session.scalar(select(_running_count(job.name))) >= limit:
+                    db.session.rollback()  # filled up meanwhile; pick again
+                    continue
+            job.status = "running"
+            job.locked_by = worker_id
+            job.locked_at = now
+            db.session.commit()
+            return job
+
+        # SQLite (and anything without SKIP LOCKED): the status check in the
+        # UPDATE makes the claim atomic; losers just try the next candidate.
+        row = db.session.execute(q.with_only_columns(Job.id, Job.name)).first()
+        if row is None:
+            db.session.rollback()
+            return None
+        job_id, name = row
+        claim = update(Job).where(Job.id == job_id, Job.status == "queued")
+        if _limit(name):
+            claim = claim.where(_running_count(name) < _limit(name))
+        result = db.session.execute(claim.values(status="running", locked_by=worker_id, locked_at=now))
+        db.session.commit()
+        if result.rowcount == 1:
+            return db.session.get(Job, job_id)
+    return None
+
+
+def requeue_stale_jobs(default_timeout: int) -> int:
+    """
+    Jobs stuck in `running` (worker crashed) go back to the queue: those
+    locked for more than twice their handler's timeout (or `default_timeout`).
+    """
+    now = datetime.utcnow()
+    default_cutoff = now - timedelta(seconds=default_timeout * 2)
+    timeouts = {n: h["timeout"] for n, h in JOB_HANDLERS.items() if h["timeout"]}
+    cutoff = (
+        case(
+            {name: now - timedelta(seconds=t * 2) for name, t in timeouts.items()},
+            value=Job.name,
+            else_=default_cutoff,
+        )
+        if timeouts else default_cutoff
+    )
+    result = db.session.execute(
+        update(Job)
+        .where(Job.status == "running", Job.locked_at < cutoff)
+        .values(status="queued", locked_by=None, locked_at=None)
+    )
+    db.session.commit()
+    return result.rowcount
+
+
+# -------------------------------------------------
+# Running
+# -------------------------------------------------
+def backoff_seconds(attempts: int, base: float, cap: float) -> float:
+    """Exponential backoff with full jitter."""
+    return random.uniform(0, min(cap, base * 2 ** (attempts - 1)))
+
+
+def _alarm(signum, frame):
+    raise JobTimeout("job exceeded its timeout")
+
+
+def run_job(job: Job):
+    """Run one claimed job, recording timing and scheduling retries on failure."""
+    cfg = current_app.config
+    handler = JOB_HANDLERS[job.name]
+    timeout = handler["timeout"] or cfg["JOBS_TIMEOUT"]
+    # SIGALRM only exists on Unix and can only be armed from the main thread
+    use_alarm = hasattr(signal, "SIGALRM") and threading.current_thread() is threading.main_thread()
+
+    job.attempts += 1
+    job.started_at = datetime.utcnow()
+    db.session.commit()
+
+    start = time.perf_counter()
+    error = None
+    try:
+        if use_alarm:
+            signal.signal(signal.SIGALRM, _alarm)
+            signal.alarm(timeout)
+        handler["func"](dict(job.payload or {}))
+    except Exception:
+        error = traceback.format_exc()
+        db.session.rollback()
+    finally:
+        if use_alarm:
+            signal.alarm(0)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    job.finished_at = datetime.utcnow()
+    job.duration_ms = elapsed_ms
+    job.locked_by = None
+    job.locked_at = None
+    if error is None:
+        job.status = "done"
+        job.last_error = None
+        log.info("job %s #%s done in %.1f ms", job.name, job.id, elapsed_ms)
+    elif job.attempts < job.max_attempts:
+        delay = backoff_seconds(job.attempts, cfg["JOBS_BACKOFF_BASE"], cfg["JOBS_BACKOFF_MAX"])
+        job.status = "queued"
+        job.run_at = datetime.utcnow() + timedelta(seconds=delay)
+        job.last_error = error
+        log.warning("job %s #%s failed (attempt %s/%s), retry in %.1fs",
+                    job.name, job.id, job.attempts, job.max_attempts, delay)
+    else:
+        job.status = "failed"
+        job.last_error = error
+        log.error("job %s #%s failed permanently after %s attempts",
+                  job.name, job.id, job.attempts)
+    db.session.commit()
+
+
+def work(worker_id: str, poll_interval: float, burst: bool = False, should_stop=lambda: False) -> int:
+    """Claim and run jobs until stopped (or, with burst=True, until the queue is empty)."""
+    processed = 0
+    default_timeout = current_app.config["JOBS_TIMEOUT"]
+    # Look for jobs abandoned by crashed workers at start-up and then every
+    # (shortest) timeout, so they don't wait for a worker restart
+    requeue_every = min([default_timeout] + [h["timeout"] for h in JOB_HANDLERS.values() if h["timeout"]])
+    next_requeue = 0.0
+    while not should_stop():
+        if time.monotonic() >= next_requeue:
+            requeued = requeue_stale_jobs(default_timeout)
+            if requeued:
+                log.warning("requeued %s stale job(s)", requeued)
+            next_requeue = time.monotonic() + requeue_every
+        job = claim_job(worker_id)
+        if job is None:
+            if burst:
+                break
+            time.sleep(poll_interval)
+            continue
+        run_job(job)
+        processed += 1
+    return processed
+
+
+def job_stats():
+    """Per-job-name counts by status plus timing of finished runs."""
+    rows = db.session.execute(
+        select(
+            Job.name,
+            Job.status,
+            func.count(),
+            func.avg(Job.duration_ms),
+            func.max(Job.duration_ms),
+        ).group_by(Job.name, Job.status)
+    ).all()
+    stats = {}
+    for name, status, count, avg_ms, max_ms in rows:
+        entry = stats.setdefault(name, {"counts": {}, "avg_ms": None, "max_ms": None})
+        entry["counts"][status] = count
+        if status == "done":
+            entry["avg_ms"], entry["max_ms"] = avg_ms, max_ms
+    return stats
+
+
+# -------------------------------------------------
+# Worker processes
+# -------------------------------------------------
+def _worker_main(index: int, poll_interval: float, burst: bool):
+    from backend.app import create_app  # imported here: the child builds its own app
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+    stopping = []
+    signal.signal(signal.SIGTERM, lambda *_: stopping.append(True))
+    signal.signal(signal.SIGINT, lambda *_: stopping.append(True))
+
+    worker_id = f"{socket.gethostname()}:{os.getpid()}:{index}"
+    app = create_app()
+    with app.app_context():
+        count = work(worker_id, poll_interval, burst=burst, should_stop=lambda: bool(stopping))
+        log.info("worker %s exiting after %s job(s)", worker_id, count)
+
+
+def run_worker_pool(processes: int, poll_interval: float, burst: bool = False):
+    """Start `processes` worker processes and wait for them to exit."""
+    ctx = multiprocessing.get_context("spawn")
+    children = [
+        ctx.Process(target=_worker_main, args=(i, poll_interval, burst), daemon=False)
+        for i in range(processes)
+    ]
+    for p in children:
+        p.start()
+    try:
+        for p in children:
+            p.join()
+    except KeyboardInterrupt:
+        for p in children:
+            p.terminate()
+        for p in children:
+            p.join()
@@ -0,0 +1,361 @@
+# backend/migrations.py
+"""
+Versioned, online schema migrations: `flask karyamate migrate`.
+
+Each database (the default one and, when sharding is on, every shard) has
+a `schema_migrations` table listing the versions applied to it. Migrations
+run in version order against every database and are written to be safe on
+a live, busy table:
+
+- DDL that needs a table lock (ALTER TABLE) runs with a short lock_timeout
+  on Postgres and is retried, so it never queues in front of live traffic
+  behind a long transaction.
+- Indexes are built with CREATE INDEX CONCURRENTLY on Postgres (writes
+  continue while it builds; a half-built index left by a failed run is
+  dropped and rebuilt).
+- Backfills update MIGRATION_BATCH_SIZE rows per transaction, sleep
+  MIGRATION_BATCH_PAUSE_MS between batches and report progress.
+
+Every migration checks the current schema before changing it, so databases
+created by `init-db` (already on the latest models) are simply stamped.
+Run it before starting a new version of the app.
+"""
+
+import time
+from datetime import datetime
+
+import sqlalchemy as sa
+from flask import current_app
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.schema import CreateIndex
+
+from backend.extensions import db
+from backend.models import RevokedToken, Task
+from backend.sharding import create_shard_schema, get_router
+
+ADVISORY_LOCK_ID = 727_173_001  # pg_try_advisory_lock key: one migrate run at a time
+
+migration_metadata = sa.MetaData()
+schema_migrations = sa.Table(
+    "schema_migrations",
+    migration_metadata,
+    sa.Column("version", sa.Integer, primary_key=True),
+    sa.Column("name", sa.String(200), nullable=False),
+    sa.Column("applied_at", sa.DateTime, nullable=False),
+    sa.Column("duration_ms", sa.Float),
+)
+
+# (version, name, func(migrator)), kept in version order
+MIGRATIONS = []
+
+
+def migration(version: int, name: str):
+    """Decorator registering `func(migrator)` as schema version `version`."""
+    def decorator(func):
+        if MIGRATIONS and version <= MIGRATIONS[-1][0]:
+            raise ValueError(f"migration {version} is out of order")
+        MIGRATIONS.append((version, name, func))
+        return func
+    return decorator
+
+
+class MigrationError(Exception):
+    pass
+
+
+class Migrator:
+    """Schema operations against one database, as used by the migrations below."""
+
+    def __init__(self, key, engine, log, batch_size, pause, lock_timeout_ms, lock_retries):
+        self.key = key                 # None for the default database, else the shard bind key
+        self.engine = engine
+        self.log = log
+        self.batch_size = batch_size
+        self.pause = pause
+        self.lock_timeout_ms = lock_timeout_ms
+        self.lock_retries = lock_retries
+
+    @property
+    def is_postgres(self) -> bool:
+        return self.engine.dialect.name == "postgresql"
+
+    # ---------- introspection ----------
+    def has_table(self, table: str) -> bool:
+        return sa.inspect(self.engine).has_table(table)
+
+    def columns(self, table: str) -> dict:
+        return {c["name"]: c["type"] for c in sa.inspect(self.engine).get_columns(table)}
+
+    # ---------- operations ----------
+    def ddl(self, *statements, params=None):
+        """
+        Run statements in one short transaction. On Postgres they give up
+        after MIGRATION_LOCK_TIMEOUT_MS waiting for a lock and are retried.
+        """
+        for attempt in range(self.lock_retries + 1):
+            try:
+                with self.engine.begin() as conn:
+                    if self.is_postgres:
+                        conn.execute(sa.text(f"SET LOCAL lock_timeout = {int(self.lock_timeout_ms)}"))
+                    for statement in statements:
+                        conn.execute(sa.text(statement), params or {})
+                return
+            except OperationalError as e:
+                if getattr(e.orig, "pgcode", None) != "55P03" or attempt == self.lock_retries:
+                    raise
+                wait = min(2 ** attempt, 30)
+                self.log(f"  lock not available, retrying in {wait}s ({attempt + 1}/{self.lock_retries})")
+                time.sleep(wait)
+
+    def add_column(self, table: str, column: str, definition: str):
+        """
+        ALTER TABLE ... ADD COLUMN if it is missing. Keep `definition`
+        nullable or with a constant default: then Postgres (11+) only touches
+        the catalog instead of rewriting the table.
+        """
+        if not self.has_table(table) or column in self.columns(table):
+            return
+        self.log(f"  {table}: adding column {column}")
+        self.ddl(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+    def create_index(self, index: sa.Index):
+        """Create a model's index if missing; CONCURRENTLY on Postgres."""
+        table = index.table.name
+        if not self.has_table(table):
+            return
+        sql = str(CreateIndex(index, if_not_exists=True).compile(dialect=self.engine.dialect))
+        if not self.is_postgres:
+            with self.engine.begin() as conn:
+                conn.execute(sa.text(sql))
+            return
+
+        with self.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            valid = conn.execute(
+                sa.text(
+                    "SELECT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                    "WHERE c.relname = :name"
+                ),
+                {"name": index.name},
+            ).scalar()
+            if valid:
+                return
+            if valid is False:
+                self.log(f"  {table}: dropping invalid index {index.name} left by an interrupted build")
+                conn.execute(sa.text(f"DROP INDEX CONCURRENTLY IF EXISTS {index.name}"))
+            self.log(f"  {table}: building index {index.name} concurrently")
+            start = time.monotonic()
+            conn.execute(sa.text(sql.replace("CREATE INDEX", "CREATE INDEX CONCURRENTLY", 1)))
+            self.log(f"  {table}: {index.name} built in {time.monotonic() - start:.1f}s")
+
+    def backfill(self, table: str, assignment: str, pending: str, params=None):
+        """
+        UPDATE table SET <assignment> for rows matching <pending>, in batches.
+        The assignment must make the row stop matching `pending`.
+        """
+        params = dict(params or {})
+        with self.engine.connect() as conn:
+            total = conn.execute(sa.text(f"SELECT count(*) FROM {table} WHERE {pending}"), params).scalar()
+        if not total:
+            return
+        self.log(f"  {table}: backfilling {total} row(s), {self.batch_size} per batch")
+
+        # SKIP LOCKED: rows a user is editing right now are picked up by a later batch
+        lock = " FOR UPDATE SKIP LOCKED" if self.is_postgres else ""
+        statement = sa.text(
+            f"UPDATE {table} SET {assignment} WHERE id IN "
+            f"(SELECT id FROM {table} WHERE {pending} LIMIT :batch_size{lock})"
+        )
+        done = 0
+        start = time.monotonic()
+        while True:
+            with self.engine.begin() as conn:
+                changed = conn.execute(statement, {**params, "batch_size": self.batch_size}).rowcount
+            if not changed:
+                with self.engine.connect() as conn:
+                    left = conn.execute(sa.text(f"SELECT count(*) FROM {table} WHERE {pending}"), params).scalar()
+                if not left:
+                    break
+            done += changed
+            elapsed = time.monotonic() - start
+            rate = done / elapsed if elapsed else 0
+            self.log(f"  {table}: {min(done, total)}/{total} ({min(done, total) * 100 // total}%), {rate:.0f} rows/s")
+            time.sleep(self.pause)
+
+
+# -------------------------------------------------
+# Migrations (append new ones at the end; never edit applied ones)
+# -------------------------------------------------
+PRIORITY_FROM_TEXT = "CASE priority WHEN 'Low' THEN 0 WHEN 'High' THEN 2 ELSE 1 END"
+
+
+def _model_index(table, name: str) -> sa.Index:
+    return next(i for i in table.indexes if i.name == name)
+
+
+@migration(1, "create missing tables")
+def create_missing_tables(m):
+    # New tables come straight from the models (with their indexes)
+    if m.key is None:
+        db.metadata.create_all(m.engine)
+    else:
+        create_shard_schema(m.engine)
+
+
+@migration(2, "task version column (If-Match / ETags)")
+def add_task_version(m):
+    for table in ("tasks", "tasks_archive"):
+        m.add_column(table, "version", "INTEGER NOT NULL DEFAULT 1")
+
+
+@migration(3, "partial index for GET /api/tasks/due")
+def add_open_due_index(m):
+    m.create_index(_model_index(Task.__table__, "ix_tasks_open_due"))
+
+
+@migration(4, "store task priority as a small integer")
+def priority_to_smallint(m):
+    for table in ("tasks", "tasks_archive"):
+        if not m.has_table(table):
+            continue
+        if isinstance(m.columns(table).get("priority"), sa.Integer):
+            continue  # created with the integer column already
+
+        started = datetime.utcnow()
+        m.add_column(table, "priority_code", "SMALLINT")
+        m.backfill(table, f"priority_code = {PRIORITY_FROM_TEXT}", "priority_code IS NULL")
+
+        # Swap columns in one short transaction. Rows created or edited by the
+        # old app while the backfill ran are converted (again) first.
+        swap = [
+            f"UPDATE {table} SET priority_code = {PRIORITY_FROM_TEXT} "
+            "WHERE priority_code IS NULL OR updated_at >= :started",
+            f"ALTER TABLE {table} RENAME COLUMN priority TO priority_text",
+            f"ALTER TABLE {table} RENAME COLUMN priority_code TO priority",
+            f"ALTER TABLE {table} DROP COLUMN priority_text",
+        ]
+        if m.is_postgres:
+            # NOT NULL is left off: adding it would scan the table under lock
+            swap.append(f"ALTER TABLE {table} ALTER COLUMN priority SET DEFAULT 1")
+        m.log(f"  {table}: switching priority to the integer column")
+        m.ddl(*swap, params={"started": started})
+
+
+@migration(5, "composite indexes for GET /api/tasks filters and sorts")
+def add_list_indexes(m):
+    for name in (
+        "ix_tasks_user_created",
+        "ix_tasks_user_completed_created",
+        "ix_tasks_user_due",
+        "ix_tasks_user_priority_due",
+    ):
+        m.create_index(_model_index(Task.__table__, name))
+
+
+@migration(6, "revoked_tokens table (POST /api/auth/logout)")
+def add_revoked_tokens(m):
+    if m.key is None:  # default database only
+        RevokedToken.__table__.create(m.engine, checkfirst=True)
+
+
+@migration(7, "never reuse task ids on SQLite (restoring archived tasks)")
+def sqlite_task_autoincrement(m):
+    # Postgres sequences never go back; SQLite without AUTOINCREMENT reuses
+    # max(id) + 1, which can be the id of a task sitting in tasks_archive.
+    if m.engine.dialect.name != "sqlite" or not m.has_table("tasks"):
+        return
+    archive = "SELECT max(id) FROM tasks_archive" if m.has_table("tasks_archive") else "SELECT 0"
+    with m.engine.begin() as conn:
+        create_sql = conn.execute(
+            sa.text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'tasks'")
+        ).scalar()
+        if "AUTOINCREMENT" not in create_sql.upper():
+            # AUTOINCREMENT can only be set by CREATE TABLE: rebuild the table
+            m.log("  tasks: rebuilding with AUTOINCREMENT")
+            table = Task.__table__
+            names = ", ".join(c.name for c in table.columns)
+            for index in table.indexes:
+                conn.execute(sa.text(f"DROP INDEX IF EXISTS {index.name}"))
+            conn.execute(sa.text("ALTER TABLE tasks RENAME TO tasks_rebuild"))
+            table.create(conn)
+            conn.execute(sa.text(f"INSERT INTO tasks ({names}) SELECT {names} FROM tasks_rebuild"))
+            conn.execute(sa.text("DROP TABLE tasks_rebuild"))
+
+        # Start the sequence above every id in use, archived ones included
+        top = conn.execute(
+            sa.text(f"SELECT max(coalesce((SELECT max(id) FROM tasks), 0), coalesce(({archive}), 0))")
+        ).scalar()
+        if conn.execute(sa.text("UPDATE sqlite_sequence SET seq = max(seq, :top) WHERE name = 'tasks'"),
+                        {"top": top}).rowcount == 0:
+            conn.execute(sa.text("INSERT INTO sqlite_sequence (name, seq) VALUES ('tasks', :top)"), {"top": top})
+
+
+# -------------------------------------------------
+# Runner
+# -------------------------------------------------
+def _databases():
+    """(bind key, engine) for the default database and every shard."""
+    router = get_router()
+    return [(None, db.engines[None])] + [(key, db.engines[key]) for key in (router.keys if router else [])]
+
+
+def _applied(engine) -> set:
+    if not sa.inspect(engine).has_table("schema_migrations"):
+        return set()
+    with engine.connect() as conn:
+        return set(conn.execute(sa.select(schema_migrations.c.version)).scalars())
+
+
+def migration_status() -> dict:
+    """{database label: [(version, name), ...pending]} for every database."""
+    status = {}
+    for key, engine in _databases():
+        applied = _applied(engine)  # one query per database, not per migration
+        status[key or "default"] = [(v, name) for v, name, _ in MIGRATIONS if v not in applied]
+    return status
+
+
+def run_migrations(log=print, batch_size=None, pause_ms=None):
+    """Apply every pending migration to every database. Returns how many ran."""
+    cfg = current_app.config
+    batch_size = batch_size or cfg["MIGRATION_BATCH_SIZE"]
+    pause_ms = cfg["MIGRATION_BATCH_PAUSE_MS"] if pause_ms is None else pause_ms
+    ran = 0
+
+    for key, engine in _databases():
+        label = key or "default"
+        migration_metadata.create_all(engine)
+        pending = [(v, name, fn) for v, name, fn in MIGRATIONS if v not in _applied(engine)]
+        if not pending:
+            log(f"{label}: up to date")
+            continue
+
+        migrator = Migrator(
+            key, engine, log,
+            batch_size=batch_size,
+            pause=pause_ms / 1000,
+            lock_timeout_ms=cfg["MIGRATION_LOCK_TIMEOUT_MS"],
+            lock_retries=cfg["MIGRATION_LOCK_RETRIES"],
+        )
+        with engine.connect() as lock_conn:
+            if migrator.is_postgres and not lock_conn.execute(
+                sa.text("SELECT pg_try_advisory_lock(:id)"), {"id": ADVISORY_LOCK_ID}
+            ).scalar():
+                raise MigrationError(f"{label}: another migrate run holds the lock")
+            try:
+                for version, name, fn in pending:
+                    log(f"{label}: applying {version:04d} {name}")
+                    start = time.perf_counter()
+                    fn(migrator)
+                    duration_ms = (time.perf_counter() - start) * 1000
+                    with engine.begin() as conn:
+                        conn.execute(schema_migrations.insert().values(
+                            version=version, name=name,
+                            applied_at=datetime.utcnow(), duration_ms=duration_ms,
+                        ))
+                    log(f"{label}: {version:04d} done in {duration_ms / 1000:.1f}s")
+                    ran += 1
+            finally:
+                if migrator.is_postgres:
+                    lock_conn.execute(sa.text("SELECT pg_advisory_unlock(:id)"), {"id": ADVISORY_LOCK_ID})
+                    lock_conn.commit()
+    return ran
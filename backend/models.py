@@ -1,6 +1,29 @@
 from datetime import datetime
+from sqlalchemy.types import SmallInteger, TypeDecorator
 from werkzeug.security import generate_password_hash, check_password_hash
 from .extensions import db
+from .utils import PRIORITY_CODES, PRIORITY_LEVELS
+
+
+class Priority(TypeDecorator):
+    """
+    "Low"/"Medium"/"High" in Python, 0/1/2 in the database: a small integer
+    that sorts by urgency (ORDER BY priority DESC = High first) and indexes
+    compactly. Comparisons take names too: Task.priority == "High".
+    """
+    impl = SmallInteger
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None or isinstance(value, int):
+            return value
+        return PRIORITY_CODES.get(value, PRIORITY_CODES["Medium"])
+
+    def process_result_value(self, value, dialect):
+        if value is None or isinstance(value, str):
+            return value  # a database still on the old text column
+        return PRIORITY_LEVELS[value] if 0 <= value < len(PRIORITY_LEVELS) else "Medium"
+
 
 class User(db.Model):
     __tablename__ = "users"
@@ -20,12 +43,144 @@ class User(db.Model):
 
 class Task(db.Model):
     __tablename__ = "tasks"
+    __table_args__ = (
+        # Partial index behind GET /api/tasks/due: only open tasks with a due date
+        db.Index(
+            "ix_tasks_open_due",
+            "user_id",
+            "due_date",
+            postgresql_where=db.text("completed = false AND due_date IS NOT NULL"),
+            sqlite_where=db.text("completed = 0 AND due_date IS NOT NULL"),
+        ),
+        # GET /api/tasks: the default sort (newest first), ?status=, and
+        # ?priority= / ?due_* filters with their usual sorts
+        db.Index("ix_tasks_user_created", "user_id", "created_at"),
+        db.Index("ix_tasks_user_completed_created", "user_id", "completed", "created_at"),
+        db.Index("ix_tasks_user_due", "user_id", "due_date"),
+        db.Index("ix_tasks_user_priority_due", "user_id", "priority", "due_date"),
+        # Never reuse ids on SQLite: archived tasks keep theirs (see ArchivedTask).
+        # Only applies at CREATE TABLE; older databases get it from migration 7.
+        {"sqlite_autoincrement": True, "info": {"sharded": True}},
+    )
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(255), nullable=False)
     description = db.Column(db.Text)
     completed = db.Column(db.Boolean, default=False)
-    priority = db.Column(db.String(20), default="Medium")  # Low/Medium/High
+    priority = db.Column(Priority, nullable=False, default="Medium", server_default="1")
     due_date = db.Column(db.DateTime, nullable=True)
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Bumped on every update; exposed as the ETag and checked against If-Match
+    version = db.Column(db.Integer, nullable=False, default=1, server_default="1")
+
+
+class ArchivedTask(db.Model):
+    """
+    Cold storage for completed tasks, moved here by backend.archive so the
+    hot `tasks` table (and its indexes) stays small. Same columns as Task.
+    """
+    __tablename__ = "tasks_archive"
+    __table_args__ = {"info": {"sharded": True}}
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    title = db.Column(db.String(255), nullable=False)
+    description = db.Column(db.Text)
+    completed = db.Column(db.Boolean, default=True)
+    priority = db.Column(Priority, nullable=False, default="Medium", server_default="1")
+    due_date = db.Column(db.DateTime, nullable=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False, index=True)
+    created_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime)
+    version = db.Column(db.Integer, nullable=False, default=1, server_default="1")
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class Job(db.Model):
+    """A unit of background work, claimed and run by `flask karyamate worker`."""
+    __tablename__ = "jobs"
+    __table_args__ = (db.Index("ix_jobs_status_run_at", "status", "run_at"),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False, index=True)
+    payload = db.Column(db.JSON, default=dict)
+    status = db.Column(db.String(20), nullable=False, default="queued")  # queued/running/done/failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=5)
+    run_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    locked_by = db.Column(db.String(100))
+    locked_at = db.Column(db.DateTime)
+    last_error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    duration_ms = db.Column(db.Float)
+
+
+class TaskEvent(db.Model):
+    """
+    Change feed for GET /api/tasks/events. Rows are written in the same
+    transaction as the task change, so every worker sees them by polling.
+    """
+    __tablename__ = "task_events"
+    __table_args__ = (
+        db.Index("ix_task_events_user_id_id", "user_id", "id"),
+        # Event ids are SSE ids; never hand one out twice
+        {"sqlite_autoincrement": True, "info": {"sharded": True}},
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, nullable=False)
+    task_id = db.Column(db.Integer, nullable=False)
+    kind = db.Column(db.String(10), nullable=False)  # create/update/delete
+    data = db.Column(db.JSON, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+
+class IdempotencyKey(db.Model):
+    """Stored response for a write sent with an Idempotency-Key header."""
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        db.UniqueConstraint("user_id", "key", name="uq_idempotency_user_key"),
+        {"info": {"sharded": True}},
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, nullable=False)
+    key = db.Column(db.String(255), nullable=False)
+    fingerprint = db.Column(db.String(64), nullable=False)  # sha256 of method + path + body
+    status_code = db.Column(db.Integer)                     # NULL while the request is in flight
+    content_type = db.Column(db.String(100))
+    body = db.Column(db.LargeBinary)                        # zlib-compressed response body
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+
+class RevokedToken(db.Model):
+    """A logged-out access token (by jti); kept until the token would have expired anyway."""
+    __tablename__ = "revoked_tokens"
+
+    id = db.Column(db.Integer, primary_key=True)
+    jti = db.Column(db.String(64), nullable=False, unique=True)
+    user_id = db.Column(db.Integer, nullable=False)
+    revoked_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+
+# -------------------------------------------------
+# Sharding (see backend/sharding.py). These live in the default database.
+# Tables marked info={"sharded": True} above live in the user's shard.
+# -------------------------------------------------
+class ShardDirectory(db.Model):
+    """Explicit user -> shard placement; users without a row follow the hash ring."""
+    __tablename__ = "shard_directory"
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), primary_key=True)
+    shard = db.Column(db.String(50), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default="active")  # active/moving
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class IdBlock(db.Model):
+    """Hands out blocks of globally unique ids so rows keep their id when a user moves shard."""
+    __tablename__ = "id_blocks"
+    name = db.Column(db.String(50), primary_key=True)
+    next_value = db.Column(db.BigInteger, nullable=False)
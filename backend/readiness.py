@@ -0,0 +1,206 @@
+# backend/readiness.py
+"""
+Readiness probe (GET /ready) for load balancers and orchestrators.
+
+/health only says the process is up. /ready says whether this worker should
+get traffic, and answers 503 when one of these checks fails:
+
+- database: a timed `SELECT 1` on the default database and every shard;
+  unreachable, or slower than READY_DB_LATENCY_MS
+- pool: connections checked out (including overflow) over the pool's
+  capacity, per engine; at or above READY_POOL_SATURATION
+- queue: p95 of recent request queue times (time between the proxy
+  accepting a request and this worker starting it, from the X-Request-Start
+  header) over the last READY_QUEUE_WINDOW_SECONDS; above READY_QUEUE_MS.
+  Any client can send that header, so it is ignored unless
+  READY_TRUST_REQUEST_START is on, and then only read on requests whose
+  peer address is in READY_TRUSTED_PROXIES (the app must sit directly
+  behind that proxy). Reported as null otherwise.
+- migrations: pending schema migrations (READY_REQUIRE_MIGRATIONS)
+
+The pool is sampled before the probe takes a connection of its own. The
+result is cached for READY_CACHE_SECONDS and concurrent probes wait for the
+one computing it, so aggressive probing costs at most one check per
+interval per worker.
+"""
+
+import ipaddress
+import math
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from flask import current_app, request
+from sqlalchemy import text
+
+from backend.extensions import db
+from backend.migrations import migration_status
+from backend.sharding import get_router
+
+QUEUE_SAMPLES = 1000  # recent queue times kept per worker
+
+
+class ReadinessState:
+    """Per-app: recent queue times and the cached probe result."""
+
+    def __init__(self):
+        self.queue_times = deque(maxlen=QUEUE_SAMPLES)  # (monotonic time, ms)
+        self.trusted_proxies = []  # networks allowed to set X-Request-Start
+        self.lock = threading.Lock()
+        self.checked_at = None
+        self.result = None
+
+
+def parse_request_start(value: str):
+    """
+    X-Request-Start ("t=1700000000.123", "t=1700000000123" or microseconds)
+    -> epoch seconds, or None.
+    """
+    try:
+        stamp = float(value.strip().removeprefix("t="))
+    except (AttributeError, ValueError):
+        return None
+    if stamp > 1e14:    # microseconds
+        return stamp / 1e6
+    if stamp > 1e11:    # milliseconds
+        return stamp / 1e3
+    return stamp
+
+
+def parse_networks(value: str) -> list:
+    """"10.0.0.0/8, 127.0.0.1" -> [IPv4Network, ...]."""
+    return [ipaddress.ip_network(part.strip(), strict=False) for part in value.split(",") if part.strip()]
+
+
+def _from_trusted_proxy(remote_addr, networks) -> bool:
+    try:
+        addr = ipaddress.ip_address(remote_addr)
+    except (TypeError, ValueError):
+        return False
+    return any(addr in net for net in networks)
+
+
+def _record_queue_time():
+    value = request.headers.get("X-Request-Start")
+    if value is None:
+        return
+    state = current_app.extensions["readiness"]
+    if not _from_trusted_proxy(request.remote_addr, state.trusted_proxies):
+        return  # sent by the client itself: anyone could fail /ready
+    started = parse_request_start(value)
+    if started is not None:
+        queued_ms = (time.time() - started) * 1000
+        if 0 <= queued_ms < 3_600_000:  # ignore skewed clocks
+            state.queue_times.append((time.monotonic(), queued_ms))
+
+
+def _engines():
+    router = get_router()
+    return [("default", db.engines[None])] + [(key, db.engines[key]) for key in (router.keys if router else [])]
+
+
+def _pool_stats(engine) -> dict:
+    pool = engine.pool
+    if not hasattr(pool, "checkedout"):
+        return {"pool": type(pool).__name__}  # e.g. NullPool/StaticPool: nothing to exhaust
+    size = pool.size()
+    max_overflow = getattr(pool, "_max_overflow", 0)
+    checked_out = pool.checkedout()
+    stats = {
+        "pool": type(pool).__name__,
+        "size": size,
+        "checked_out": checked_out,
+        "overflow": max(0, pool.overflow()),
+        "max_overflow": max_overflow,
+        "saturation": None,
+    }
+    if max_overflow >= 0 and size + max_overflow > 0:  # -1: unlimited overflow
+        stats["saturation"] = round(checked_out / (size + max_overflow), 3)
+    return stats
+
+
+def _db_check(engine) -> dict:
+    start = time.perf_counter()
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+    except Exception as e:
+        return {"ok": False, "error": type(e).__name__, "latency_ms": round((time.perf_counter() - start) * 1000, 1)}
+    return {"ok": True, "latency_ms": round((time.perf_counter() - start) * 1000, 1)}
+
+
+def _queue_stats(queue_times, window: float) -> dict:
+    cutoff = time.monotonic() - window
+    recent = sorted(ms for at, ms in list(queue_times) if at >= cutoff)
+    if not recent:
+        return {"samples": 0, "p50_ms": None, "p95_ms": None, "max_ms": None}
+    return {
+        "samples": len(recent),
+        "p50_ms": round(recent[len(recent) // 2], 1),
+        "p95_ms": round(recent[math.ceil(len(recent) * 0.95) - 1], 1),
+        "max_ms": round(recent[-1], 1),
+    }
+
+
+def check_readiness() -> dict:
+    """Run every check now: {"ready": bool, "failing": [...], "checks": {...}}."""
+    cfg = current_app.config
+    failing = []
+    engines = _engines()
+
+    pools = {name: _pool_stats(engine) for name, engine in engines}  # before we take a connection
+    for name, stats in pools.items():
+        if stats.get("saturation") is not None and stats["saturation"] >= cfg["READY_POOL_SATURATION"]:
+            failing.append(f"pool:{name}")
+
+    databases = {}
+    for name, engine in engines:
+        if (pools[name].get("saturation") or 0) >= 1:
+            # connect() would block for the pool timeout; the pool check already fails
+            databases[name] = {"ok": None, "skipped": "pool exhausted"}
+            continue
+        databases[name] = result = _db_check(engine)
+        if not result["ok"] or result["latency_ms"] > cfg["READY_DB_LATENCY_MS"]:
+            failing.append(f"database:{name}")
+
+    queue = _queue_stats(current_app.extensions["readiness"].queue_times, cfg["READY_QUEUE_WINDOW_SECONDS"])
+    if queue["p95_ms"] is not None and queue["p95_ms"] > cfg["READY_QUEUE_MS"]:
+        failing.append("queue")
+
+    migrations = {"pending": None}  # unknown while a database is down
+    if all(d["ok"] for d in databases.values()):
+        try:
+            pending = migration_status()
+        except Exception as e:
+            migrations["error"] = type(e).__name__
+        else:
+            migrations["pending"] = {name: [v for v, _ in items] for name, items in pending.items() if items}
+    if cfg["READY_REQUIRE_MIGRATIONS"] and (migrations["pending"] or "error" in migrations):
+        failing.append("migrations")
+
+    return {
+        "ready": not failing,
+        "failing": failing,
+        "checked_at": datetime.utcnow().isoformat(timespec="milliseconds"),
+        "checks": {"database": databases, "pool": pools, "queue": queue, "migrations": migrations},
+    }
+
+
+def readiness() -> tuple[dict, bool]:
+    """The cached result (recomputed at most every READY_CACHE_SECONDS) and whether it was cached."""
+    state = current_app.extensions["readiness"]
+    ttl = current_app.config["READY_CACHE_SECONDS"]
+    with state.lock:  # concurrent probes wait for one check instead of each running it
+        if state.checked_at is not None and time.monotonic() - state.checked_at < ttl:
+            return state.result, True
+        state.result = check_readiness()
+        state.checked_at = time.monotonic()
+        return state.result, False
+
+
+def init_readiness(app):
+    state = app.extensions["readiness"] = ReadinessState()
+    if app.config["READY_TRUST_REQUEST_START"]:
+        state.trusted_proxies = parse_networks(app.config["READY_TRUSTED_PROXIES"])
+        app.before_request(_record_queue_time)
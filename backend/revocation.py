@@ -0,0 +1,237 @@
+# backend/revocation.py
+"""
+Server-side JWT revocation (POST /api/auth/logout) without a DB query per
+request.
+
+Revoked jtis are stored in `revoked_tokens`. Every worker process keeps
+them in memory as a Bloom filter in front of an exact set and checks each
+token against those (flask_jwt_extended's blocklist loader):
+
+- Bloom filter miss (almost every request): not revoked, no further work.
+- Bloom filter hit: confirmed against the exact set, so a false positive
+  never logs anyone out.
+
+The copy is refreshed at most every REVOCATION_REFRESH_SECONDS with one
+indexed query for rows added since the last refresh, and reloaded in full
+every REVOCATION_REBUILD_SECONDS to drop expired tokens. A logout takes
+effect at once in the worker that handled it and within the refresh
+interval in the others.
+"""
+
+import hashlib
+import math
+import threading
+import time
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import delete, func, or_, select
+from sqlalchemy.exc import IntegrityError
+
+from backend.extensions import db, jwt
+from backend.jobs import register_job
+from backend.models import RevokedToken
+
+SETTLE_SECONDS = 5  # re-read rows this recent: a slower commit may have a lower id
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings (double hashing of one blake2b digest)."""
+
+    def __init__(self, capacity: int, error_rate: float):
+        capacity = max(capacity, 1)
+        self.capacity = capacity
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, item: str):
+        for pos in self._positions(item):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+
+class RevocationList:
+    """This process's copy of `revoked_tokens`."""
+
+    def __init__(self, app):
+        self.app = app
+        self.capacity = app.config["REVOCATION_BLOOM_CAPACITY"]
+        self.error_rate = app.config["REVOCATION_BLOOM_ERROR_RATE"]
+        self.refresh_seconds = app.config["REVOCATION_REFRESH_SECONDS"]
+        self.rebuild_seconds = app.config["REVOCATION_REBUILD_SECONDS"]
+        self._lock = threading.Lock()  # held by writers; readers never take it
+        # (Bloom filter, {jti: expires_at}): always replaced together, so a
+        # reader that takes the pair once never mixes an old and a new half
+        self._tokens = (BloomFilter(self.capacity, self.error_rate), {})
+        self._last_id = 0
+        self._refreshed_at = 0.0  # monotonic
+        self._refreshed_wall = None
+        self._rebuilt_at = 0.0
+        self.stats = {"checks": 0, "bloom_hits": 0, "revoked": 0, "refreshes": 0, "refresh_errors": 0}
+
+    # ---------- hot path ----------
+    def is_revoked(self, jti: str) -> bool:
+        if time.monotonic() - self._refreshed_at >= self.refresh_seconds:
+            self.refresh()
+        self.stats["checks"] += 1
+        bloom, exact = self._tokens
+        if jti not in bloom:
+            return False
+        self.stats["bloom_hits"] += 1
+        expires_at = exact.get(jti)
+        if expires_at is None:
+            return False
+        self.stats["revoked"] += 1
+        return True
+
+    def add(self, jti: str, expires_at: datetime):
+        with self._lock:
+            self._add(jti, expires_at)
+
+    def _add(self, jti, expires_at):
+        """Caller holds the lock. Both halves only grow, so readers see the token or not at all."""
+        bloom, exact = self._tokens
+        if jti in exact:
+            return
+        exact[jti] = expires_at
+        if bloom.count >= bloom.capacity:
+            # past capacity the false-positive rate climbs
+            self._tokens = (self._build_bloom(exact), exact)
+        else:
+            bloom.add(jti)
+
+    def _build_bloom(self, exact: dict) -> BloomFilter:
+        bloom = BloomFilter(max(self.capacity, len(exact) * 2), self.error_rate)
+        for jti in exact:
+            bloom.add(jti)
+        return bloom
+
+    # ---------- refresh ----------
+    def refresh(self, force_rebuild: bool = False):
+        if not self._lock.acquire(blocking=False):
+            return  # another thread is refreshing; use the current copy meanwhile
+        try:
+            now = time.monotonic()
+            if not force_rebuild and now - self._refreshed_at < self.refresh_seconds:
+                return
+            started_wall = datetime.utcnow()
+            try:
+                if force_rebuild or self._refreshed_wall is None or now - self._rebuilt_at >= self.rebuild_seconds:
+                    self._reload()
+                    self._rebuilt_at = now
+                else:
+                    self._load_new()
+            except Exception:
+                # Keep serving from the last copy; try again next interval
+                self.stats["refresh_errors"] += 1
+                current_app.logger.exception("could not refresh the token revocation list")
+            else:
+                self.stats["refreshes"] += 1
+                self._refreshed_wall = started_wall
+            self._refreshed_at = now
+        finally:
+            self._lock.release()
+
+    def _reload(self):
+        """Replace the copy with every unexpired row (drops expired tokens)."""
+        with db.engine.connect() as conn:
+            rows = conn.execute(
+                select(RevokedToken.id, RevokedToken.jti, RevokedToken.expires_at)
+                .where(RevokedToken.expires_at > datetime.utcnow())
+            ).all()
+            last_id = conn.execute(select(func.max(RevokedToken.id))).scalar() or 0
+        exact = {jti: expires_at for _, jti, expires_at in rows}
+        self._tokens = (self._build_bloom(exact), exact)  # one swap: filter and set always match
+        self._last_id = last_id
+
+    def _load_new(self):
+        since = self._refreshed_wall - timedelta(seconds=SETTLE_SECONDS)
+        query = select(RevokedToken.id, RevokedToken.jti, RevokedToken.expires_at).where(
+            or_(RevokedToken.id > self._last_id, RevokedToken.revoked_at >= since)
+        )
+        with db.engine.connect() as conn:
+            rows = conn.execute(query).all()
+        for row_id, jti, expires_at in rows:
+            self._add(jti, expires_at)
+            self._last_id = max(self._last_id, row_id)
+
+    def snapshot(self) -> dict:
+        bloom, exact = self._tokens
+        return {
+            **self.stats,
+            "tokens": len(exact),
+            "bloom_bits": bloom.size,
+            "bloom_hashes": bloom.hashes,
+        }
+
+
+def get_revocation_list():
+    return current_app.extensions.get("revocation_list")
+
+
+def revoke_token(jwt_payload: dict):
+    """Record the token as revoked (commits) and apply it to this process at once."""
+    exp = jwt_payload.get("exp")
+    expires_at = (
+        datetime.utcfromtimestamp(exp) if exp is not None
+        else datetime.utcnow() + timedelta(days=365)  # non-expiring tokens
+    )
+    jti = jwt_payload["jti"]
+    if db.session.execute(select(RevokedToken.id).where(RevokedToken.jti == jti)).first() is None:
+        db.session.add(RevokedToken(jti=jti, user_id=int(jwt_payload["sub"]), expires_at=expires_at))
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # A concurrent logout with the same token got there first: already revoked
+            db.session.rollback()
+    revocations = get_revocation_list()
+    if revocations is not None:
+        revocations.add(jti, expires_at)
+
+
+def init_revocation(app):
+    if not app.config.get("REVOCATION_ENABLED", True):
+        return
+    app.extensions["revocation_list"] = RevocationList(app)
+
+
+@jwt.token_in_blocklist_loader
+def _token_in_blocklist(jwt_header, jwt_payload):
+    revocations = get_revocation_list()
+    return revocations is not None and revocations.is_revoked(jwt_payload["jti"])
+
+
+@jwt.revoked_token_loader
+def _revoked_token_response(jwt_header, jwt_payload):
+    return {"message": "token has been revoked"}, 401
+
+
+def prune_revoked_tokens(batch_size: int = 1000) -> int:
+    """Delete rows for tokens that have expired anyway; returns how many."""
+    removed = 0
+    while True:
+        ids = db.session.scalars(
+            select(RevokedToken.id).where(RevokedToken.expires_at <= datetime.utcnow()).limit(batch_size)
+        ).all()
+        if not ids:
+            break
+        db.session.execute(delete(RevokedToken).where(RevokedToken.id.in_(ids)))
+        db.session.commit()
+        removed += len(ids)
+    return removed
+
+
+@register_job("prune_revoked_tokens", concurrency=1)
+def prune_revoked_tokens_job(payload):
+    prune_revoked_tokens()
@@ -1,8 +1,11 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import create_access_token
+from flask import Blueprint, jsonify
+from flask_jwt_extended import create_access_token, get_jwt, jwt_required
 from backend.extensions import db
 from backend.models import User
+from backend.revocation import revoke_token
+from backend.sharding import place_new_user
 from backend.utils import sanitize_string
+from backend.validation import validate_json
 
 auth_bp = Blueprint("auth", __name__, url_prefix="/api/auth")
 
@@ -45,16 +48,15 @@ def register():
             email:
               type: string
       400:
-        description: Missing email or password
+        description: Body does not match Registration in docs/api/openapi.yaml
       409:
         description: Email already registered
     """
-    data = request.get_json(silent=True) or {}
-    email = sanitize_string(data.get("email"))
-    password = data.get("password")
-
-    if not email or not password:
-        return jsonify({"message": "email and password are required"}), 400
+    data, error = validate_json("Registration")
+    if error:
+        return error
+    email = sanitize_string(data["email"])
+    password = data["password"]
 
     if User.query.filter_by(email=email).first():
         return jsonify({"message": "email already registered"}), 409
@@ -62,6 +64,8 @@ def register():
     user = User(email=email)
     user.set_password(password)
     db.session.add(user)
+    db.session.flush()  # assigns user.id
+    place_new_user(user)
     db.session.commit()
 
     return jsonify({"id": user.id, "email": user.email}), 201
@@ -106,16 +110,15 @@ def login():
               type: string
               example: Bearer
       400:
-        description: Missing email or password
+        description: Body does not match Credentials in docs/api/openapi.yaml
       401:
         description: Invalid login credentials
     """
-    data = request.get_json(silent=True) or {}
-    email = sanitize_string(data.get("email"))
-    password = data.get("password")
-
-    if not email or not password:
-        return jsonify({"message": "email and password are required"}), 400
+    data, error = validate_json("Credentials")
+    if error:
+        return error
+    email = sanitize_string(data["email"])
+    password = data["password"]
 
     user = User.query.filter_by(email=email).first()
     if not user or not user.check_password(password):
@@ -124,3 +127,32 @@ def login():
     # Fix: JWT identity must be a string
     token = create_access_token(identity=str(user.id))
     return jsonify({"access_token": token, "token_type": "Bearer"}), 200
+
+
+@auth_bp.post("/logout")
+@jwt_required()
+def logout():
+    """
+    Logout (revoke the current token)
+    ---
+    tags:
+      - Auth
+    description: >
+      Revoke the JWT sent with this request. Later requests with it get 401,
+      at once on this server process and within a couple of seconds on the others.
+    security:
+      - BearerAuth: []
+    responses:
+      200:
+        description: Token revoked
+        schema:
+          type: object
+          properties:
+            message:
+              type: string
+              example: logged out
+      401:
+        description: Missing, invalid or already revoked token
+    """
+    revoke_token(get_jwt())
+    return jsonify({"message": "logged out"}), 200
@@ -1,17 +1,48 @@
 # backend/routes/tasks.py
 
-from flask import Blueprint, request, jsonify
+import hashlib
+from datetime import datetime, timedelta
+
+from flask import Blueprint, Response, make_response, request, jsonify, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import case, delete, func, select, union_all, update
 from backend.extensions import db
-from backend.models import Task
+from backend.models import ArchivedTask, Task
+from backend.archive import find_archived_task, restore_archived_task
+from backend.events import event_stream, latest_event_id, record_task_event
+from backend.group_commit import run_write
+from backend.idempotency import idempotent
+from backend.sharding import reject_writes_during_move
+from backend.single_flight import coalesce
+from backend.validation import validate_json
+from backend.formats import payload_response, tasks_response, wants_msgpack
 from backend.utils import (
     sanitize_string,
     parse_bool,
-    parse_priority,
+    parse_priority_set,
+    parse_sort,
     parse_datetime,
+    parse_window,
+    parse_etag_version,
 )
 
 tasks_bp = Blueprint("tasks", __name__, url_prefix="/api/tasks")
+# Writes pause (503) while the user's data is moved between shards
+tasks_bp.before_request(reject_writes_during_move)
+
+DUE_DEFAULT_LIMIT = 20
+DUE_MAX_LIMIT = 100
+DUE_MAX_WINDOW = timedelta(days=366)
+
+# GET /api/tasks ?sort= fields; "-" prefix = descending
+LIST_SORT_FIELDS = ("created_at", "updated_at", "due_date", "priority", "title", "id")
+LIST_DEFAULT_SORT = [("created_at", True)]
+LIST_DATE_FILTERS = {
+    "due_from": ("due_date", ">="),
+    "due_before": ("due_date", "<"),
+    "created_from": ("created_at", ">="),
+    "created_before": ("created_at", "<"),
+}
 
 
 def task_to_dict(t: Task):
@@ -25,11 +56,113 @@ def task_to_dict(t: Task):
         "user_id": t.user_id,
         "created_at": t.created_at.isoformat() if t.created_at else None,
         "updated_at": t.updated_at.isoformat() if t.updated_at else None,
+        "version": t.version,
     }
 
 
+def task_fields(data: dict) -> dict:
+    """Column values for the editable fields present in `data` (validated TaskUpdate/TaskCreate)."""
+    fields = {}
+    if "title" in data:
+        fields["title"] = sanitize_string(data["title"])
+    if "description" in data:
+        fields["description"] = sanitize_string(data["description"])
+    if "completed" in data:
+        fields["completed"] = data["completed"]
+    if "priority" in data:
+        fields["priority"] = data["priority"]
+    if "due_date" in data:
+        fields["due_date"] = data["due_date"]
+    return fields
+
+
+def with_etag(resp, version):
+    """Tag a single-task response with its version (see If-Match on PUT)."""
+    resp.set_etag(str(version))
+    return resp
+
+
+def parse_list_params(args):
+    """Filters and sort for GET /api/tasks: (params, error message)."""
+    params = {"status": (args.get("status") or "").lower()}  # all|open|completed
+
+    if args.get("priority"):
+        params["priority"] = parse_priority_set(args["priority"])
+        if params["priority"] is None:
+            return None, "priority must be a comma-separated list of Low, Medium, High"
+    for name in LIST_DATE_FILTERS:
+        if args.get(name):
+            params[name] = parse_datetime(args[name])
+            if params[name] is None:
+                return None, f"{name} must be an ISO 8601 date or datetime"
+    if args.get("has_due_date"):
+        params["has_due_date"] = parse_bool(args["has_due_date"])
+
+    params["sort"] = parse_sort(args["sort"], LIST_SORT_FIELDS) if args.get("sort") else LIST_DEFAULT_SORT
+    if params["sort"] is None:
+        return None, (
+            f"sort must be a comma-separated list of {', '.join(LIST_SORT_FIELDS)}, "
+            "each optionally prefixed with - for descending"
+        )
+    return params, None
+
+
+def task_filters(model, user_id: int, params: dict) -> list:
+    """WHERE conditions on `model` (Task or ArchivedTask) for parse_list_params() output."""
+    conditions = [model.user_id == user_id]
+    if params["status"] in ("open", "completed"):
+        conditions.append(model.completed == (params["status"] == "completed"))
+    if "priority" in params:
+        conditions.append(model.priority.in_(sorted(params["priority"])))
+    for name, (column, op) in LIST_DATE_FILTERS.items():
+        if name in params:
+            col = getattr(model, column)
+            conditions.append(col >= params[name] if op == ">=" else col < params[name])
+    if "has_due_date" in params:
+        conditions.append(
+            model.due_date.isnot(None) if params["has_due_date"] else model.due_date.is_(None)
+        )
+    return conditions
+
+
+def task_order(columns, sort_keys) -> list:
+    """ORDER BY for `sort_keys` over a column collection, with id as the tie-breaker."""
+    order = []
+    for name, descending in sort_keys:
+        col = columns[name].desc() if descending else columns[name].asc()
+        if name == "due_date":
+            col = col.nulls_last()  # tasks without a due date go last either way
+        order.append(col)
+    if all(name != "id" for name, _ in sort_keys):
+        order.append(columns["id"].desc() if sort_keys[-1][1] else columns["id"].asc())
+    return order
+
+
+def list_etag(user_id: int, with_archive: bool) -> str:
+    """
+    Validator for GET /api/tasks computed from aggregates, without loading the
+    rows: any create, update (version bump), delete or archival changes it.
+    Query string and format are mixed in, so each representation has its own.
+    """
+    parts = [request.query_string, wants_msgpack()]
+    for model in (Task, ArchivedTask) if with_archive else (Task,):
+        parts.append(
+            db.session.query(
+                func.count(model.id),
+                func.max(model.id),
+                func.sum(model.version),
+                func.max(model.updated_at),
+            )
+            .filter(model.user_id == user_id)
+            .one()
+            .tuple()
+        )
+    return hashlib.sha1(repr(parts).encode()).hexdigest()[:24]
+
+
 @tasks_bp.get("")
 @jwt_required()
+@coalesce
 def list_tasks():
     """
     List Tasks
@@ -37,7 +170,10 @@ def list_tasks():
     tags:
       - Tasks
     summary: List all tasks for the current user
-    description: Returns all tasks belonging to the authenticated user.
+    description: >
+      Returns the authenticated user's tasks, optionally filtered and sorted
+      by the database. Filters combine with AND; date bounds take ISO 8601
+      dates or datetimes (UTC).
     parameters:
       - in: query
         name: status
@@ -45,11 +181,82 @@ def list_tasks():
         enum: [all, open, completed]
         required: false
         description: Optional filter by completion status.
+      - in: query
+        name: priority
+        type: string
+        required: false
+        description: Comma-separated priorities to include, e.g. High,Medium
+      - in: query
+        name: due_from
+        type: string
+        format: date-time
+        required: false
+        description: Only tasks due at or after this time
+      - in: query
+        name: due_before
+        type: string
+        format: date-time
+        required: false
+        description: Only tasks due before this time
+      - in: query
+        name: created_from
+        type: string
+        format: date-time
+        required: false
+        description: Only tasks created at or after this time
+      - in: query
+        name: created_before
+        type: string
+        format: date-time
+        required: false
+        description: Only tasks created before this time
+      - in: query
+        name: has_due_date
+        type: boolean
+        required: false
+        description: true for tasks with a due date, false for tasks without one
+      - in: query
+        name: sort
+        type: string
+        required: false
+        description: >
+          Comma-separated sort keys from created_at, updated_at, due_date,
+          priority, title, id; prefix with - for descending, e.g.
+          due_date,-priority,created_at. Default -created_at. Priority sorts
+          Low < Medium < High; tasks without a due date sort last.
+      - in: query
+        name: include_archived
+        type: boolean
+        required: false
+        description: >
+          Also return archived (old completed) tasks. Implied by
+          status=completed.
+      - in: query
+        name: layout
+        type: string
+        enum: [rows, columnar]
+        required: false
+        description: >
+          rows (default) returns one object per task. columnar returns one
+          array per field, with timestamps as epoch seconds and priority as an
+          index into priority_levels.
+      - in: header
+        name: If-None-Match
+        type: string
+        required: false
+        description: >
+          ETag from a previous response. If the list has not changed, the
+          API answers 304 with no body.
+    produces:
+      - application/json
+      - application/msgpack
     security:
       - BearerAuth: []
     responses:
       200:
-        description: A list of tasks
+        description: >
+          A list of tasks. Send "Accept: application/msgpack" to receive
+          the same payload encoded as MessagePack.
         schema:
           type: array
           items:
@@ -70,22 +277,56 @@ def list_tasks():
                 format: date-time
               user_id:
                 type: integer
+      304:
+        description: Not modified since the ETag sent in If-None-Match
+      400:
+        description: Unknown layout, or an invalid filter or sort
     """
     user_id = int(get_jwt_identity())
-    status = (request.args.get("status") or "").lower()  # all|open|completed
+    params, error = parse_list_params(request.args)
+    if error:
+        return jsonify({"message": error}), 400
+    status = params["status"]
+    include_archived = parse_bool(request.args.get("include_archived"))
+    # Archived tasks are always completed, so only look there when it can matter
+    with_archive = status == "completed" or (include_archived and status != "open")
 
-    q = Task.query.filter_by(user_id=user_id)
-    if status == "open":
-        q = q.filter_by(completed=False)
-    elif status == "completed":
-        q = q.filter_by(completed=True)
+    etag = list_etag(user_id, with_archive)
+    if request.if_none_match.contains_weak(etag):
+        resp = make_response("", 304)
+        resp.set_etag(etag)
+        return resp
 
-    tasks = q.order_by(Task.created_at.desc()).all()
-    return jsonify([task_to_dict(t) for t in tasks]), 200
+    if with_archive:
+        # One sorted query over both tables (UNION ALL), so the database still
+        # does the filtering and ordering; rows come back as plain Row objects.
+        columns = [c.name for c in Task.__table__.columns]
+        both = union_all(
+            select(*Task.__table__.c).where(*task_filters(Task, user_id, params)),
+            select(*(ArchivedTask.__table__.c[name] for name in columns)).where(
+                *task_filters(ArchivedTask, user_id, params)
+            ),
+        ).subquery()
+        tasks = db.session.execute(
+            select(both).order_by(*task_order(both.c, params["sort"])),
+            bind_arguments={"mapper": Task},  # route to the user's shard
+        ).all()
+    else:
+        tasks = db.session.scalars(
+            select(Task)
+            .where(*task_filters(Task, user_id, params))
+            .order_by(*task_order(Task.__table__.c, params["sort"]))
+        ).all()
+
+    resp = make_response(tasks_response(tasks, task_to_dict))
+    if resp.status_code == 200:
+        resp.set_etag(etag)
+    return resp
 
 
 @tasks_bp.post("")
 @jwt_required()
+@idempotent
 def create_task():
     """
     Create Task
@@ -99,6 +340,14 @@ def create_task():
     consumes:
       - application/json
     parameters:
+      - in: header
+        name: Idempotency-Key
+        type: string
+        required: false
+        description: >
+          Unique key (e.g. a UUID) per logical write. Repeats with the same
+          key replay the first response (marked Idempotent-Replayed: true)
+          instead of writing again, so clients can safely retry.
       - in: body
         name: body
         description: Task payload
@@ -129,37 +378,209 @@ def create_task():
       201:
         description: Task created successfully
       400:
-        description: Title is missing or invalid
+        description: Body does not match TaskCreate in docs/api/openapi.yaml (errors lists each problem)
       401:
         description: Unauthorized or invalid token
+      409:
+        description: A request with the same Idempotency-Key is still in progress
+      422:
+        description: Idempotency-Key was already used with a different payload
     """
-    user_id = get_jwt_identity()
-    data = request.get_json(silent=True) or {}
+    user_id = int(get_jwt_identity())
+    data, error = validate_json("TaskCreate")
+    if error:
+        return error
 
-    title = sanitize_string(data.get("title"))
+    title = sanitize_string(data["title"])
     description = sanitize_string(data.get("description"))
-    completed = parse_bool(data.get("completed"))
-    priority = parse_priority(data.get("priority"))
-    due_date = parse_datetime(data.get("due_date"))
-
-    if not title:
-        return jsonify({"message": "title is required"}), 400
-
-    t = Task(
-        title=title,
-        description=description,
-        completed=completed,
-        priority=priority,
-        due_date=due_date,
-        user_id=user_id,
+    completed = data.get("completed", False)
+    priority = data.get("priority", "Medium")
+    due_date = data.get("due_date")
+
+    def write(session):
+        t = Task(
+            title=title,
+            description=description,
+            completed=completed,
+            priority=priority,
+            due_date=due_date,
+            user_id=user_id,
+        )
+        session.add(t)
+        session.flush()  # assigns t.id for the event
+        body = task_to_dict(t)
+        record_task_event(user_id, "create", body, session=session)
+        return body
+
+    body = run_write(write)
+    return with_etag(jsonify(body), body["version"]), 201
+
+
+@tasks_bp.get("/due")
+@jwt_required()
+@coalesce
+def due_tasks():
+    """
+    Due Soon / Overdue Tasks
+    ---
+    tags:
+      - Tasks
+    summary: Open tasks that are overdue or due within a window, most urgent first
+    description: >
+      Ordered by urgency: overdue tasks first, then by due date, then by
+      priority (High before Medium before Low). Only the top `limit` tasks
+      are returned; `counts` covers all matching tasks.
+    security:
+      - BearerAuth: []
+    parameters:
+      - in: query
+        name: window
+        type: string
+        required: false
+        default: 7d
+        description: How far ahead to look, e.g. 12h, 7d, 2w (bare numbers are days).
+      - in: query
+        name: include_overdue
+        type: boolean
+        required: false
+        default: true
+        description: Include tasks whose due date has already passed.
+      - in: query
+        name: limit
+        type: integer
+        required: false
+        default: 20
+        description: Maximum number of tasks to return (1-100).
+    responses:
+      200:
+        description: Most urgent open tasks plus overdue / due-today counts
+        examples:
+          application/json:
+            tasks: []
+            counts: { overdue: 2, due_today: 1 }
+            window: 7d
+      400:
+        description: Invalid window or limit
+    """
+    user_id = int(get_jwt_identity())
+
+    window_arg = request.args.get("window") or "7d"
+    window = parse_window(window_arg)
+    if window is None or window > DUE_MAX_WINDOW:
+        return jsonify({"message": "window must look like 12h, 7d or 2w (max 366d)"}), 400
+
+    try:
+        limit = int(request.args.get("limit", DUE_DEFAULT_LIMIT))
+    except ValueError:
+        return jsonify({"message": "limit must be an integer"}), 400
+    limit = max(1, min(limit, DUE_MAX_LIMIT))
+
+    include_overdue = request.args.get("include_overdue")
+    include_overdue = True if include_overdue is None else parse_bool(include_overdue)
+
+    now = datetime.utcnow()
+    today_start = datetime(now.year, now.month, now.day)
+    tomorrow_start = today_start + timedelta(days=1)
+    horizon = now + window
+
+    # These filters match the ix_tasks_open_due partial index
+    base = Task.query.filter(
+        Task.user_id == user_id,
+        Task.completed == False,  # noqa: E712 (renders "= false", matching ix_tasks_open_due)
+        Task.due_date.isnot(None),
+        Task.due_date < horizon,
+    )
+    q = base if include_overdue else base.filter(Task.due_date >= today_start)
+
+    # Ascending due_date already puts overdue tasks first
+    tasks = q.order_by(Task.due_date, Task.priority.desc(), Task.id).limit(limit).all()
+
+    overdue, due_today = (
+        db.session.query(
+            func.count(case((Task.due_date < today_start, 1))),
+            func.count(case(((Task.due_date >= today_start) & (Task.due_date < tomorrow_start), 1))),
+        )
+        .filter(
+            Task.user_id == user_id,
+            Task.completed == False,  # noqa: E712 (renders "= false", matching ix_tasks_open_due)
+            Task.due_date.isnot(None),
+            Task.due_date < tomorrow_start,
+        )
+        .one()
+    )
+
+    return payload_response(
+        {
+            "tasks": [task_to_dict(t) for t in tasks],
+            "counts": {"overdue": overdue, "due_today": due_today},
+            "window": window_arg,
+        }
+    )
+
+
+@tasks_bp.get("/events")
+@jwt_required(locations=["headers", "query_string"])
+def task_events():
+    """
+    Task Change Stream (Server-Sent Events)
+    ---
+    tags:
+      - Tasks
+    summary: Live stream of create / update / delete events for your tasks
+    description: >
+      A text/event-stream. Each event has an `id`, an `event` type
+      (create, update or delete) and a JSON `data` delta: the full task
+      for create, the changed fields plus id and updated_at for update,
+      and just the id for delete. Comment heartbeats keep the connection
+      alive. The server closes the stream after SSE_MAX_DURATION and the
+      client resumes by reconnecting with Last-Event-ID. Browsers'
+      EventSource cannot send headers, so the JWT may also be passed as
+      ?jwt=<token>.
+    security:
+      - BearerAuth: []
+    produces:
+      - text/event-stream
+    parameters:
+      - in: header
+        name: Last-Event-ID
+        type: integer
+        required: false
+        description: Resume after this event id. Without it the stream starts at "now".
+      - in: query
+        name: last_event_id
+        type: integer
+        required: false
+        description: Same as the Last-Event-ID header (for clients that cannot set headers).
+    responses:
+      200:
+        description: Event stream
+      400:
+        description: Invalid Last-Event-ID
+    """
+    user_id = int(get_jwt_identity())
+
+    raw_last_id = request.headers.get("Last-Event-ID") or request.args.get("last_event_id")
+    if raw_last_id:
+        try:
+            last_id = int(raw_last_id)
+        except ValueError:
+            return jsonify({"message": "Last-Event-ID must be an integer"}), 400
+    else:
+        last_id = latest_event_id(user_id)
+        db.session.rollback()
+
+    resp = Response(
+        stream_with_context(event_stream(user_id, last_id)),
+        mimetype="text/event-stream",
     )
-    db.session.add(t)
-    db.session.commit()
-    return jsonify(task_to_dict(t)), 201
+    resp.headers["Cache-Control"] = "no-cache"
+    resp.headers["X-Accel-Buffering"] = "no"  # don't let proxies buffer the stream
+    return resp
 
 
 @tasks_bp.get("/<int:task_id>")
 @jwt_required()
+@coalesce
 def get_task(task_id):
     """
     Get Single Task
@@ -177,19 +598,25 @@ def get_task(task_id):
         description: ID of the task
     responses:
       200:
-        description: Task found
+        description: Task found (ETag header carries the task version)
+      304:
+        description: Unchanged since the If-None-Match ETag
       404:
         description: Task not found
     """
     user_id = get_jwt_identity()
     t = Task.query.filter_by(id=task_id, user_id=user_id).first()
+    if not t:
+        t = find_archived_task(task_id, user_id)
     if not t:
         return jsonify({"message": "task not found"}), 404
-    return jsonify(task_to_dict(t)), 200
+    resp = with_etag(jsonify(task_to_dict(t)), t.version)
+    return resp.make_conditional(request)
 
 
 @tasks_bp.put("/<int:task_id>")
 @jwt_required()
+@idempotent
 def update_task(task_id):
     """
     Update Task
@@ -207,6 +634,21 @@ def update_task(task_id):
         required: true
         type: integer
         description: ID of the task to update
+      - in: header
+        name: If-Match
+        type: string
+        required: false
+        description: >
+          ETag (task version) the edit is based on. If the task changed since,
+          nothing is written and 412 is returned with the current task.
+      - in: header
+        name: Idempotency-Key
+        type: string
+        required: false
+        description: >
+          Unique key (e.g. a UUID) per logical write. Repeats with the same
+          key replay the first response (marked Idempotent-Replayed: true)
+          instead of writing again, so clients can safely retry.
       - in: body
         name: body
         description: Fields to update (partial update allowed)
@@ -235,33 +677,70 @@ def update_task(task_id):
       200:
         description: Task updated successfully
       400:
-        description: Invalid data (for example, empty title)
+        description: Body does not match TaskUpdate in docs/api/openapi.yaml (errors lists each problem)
       404:
         description: Task not found
+      409:
+        description: A request with the same Idempotency-Key is still in progress
+      412:
+        description: If-Match did not match the current version (body includes the current task)
+      422:
+        description: Idempotency-Key was already used with a different payload
     """
-    user_id = get_jwt_identity()
-    t = Task.query.filter_by(id=task_id, user_id=user_id).first()
-    if not t:
-        return jsonify({"message": "task not found"}), 404
+    user_id = int(get_jwt_identity())
+    data, error = validate_json("TaskUpdate")
+    if error:
+        return error
 
-    data = request.get_json(silent=True) or {}
+    expected_version = None
+    if_match = request.headers.get("If-Match")
+    if if_match and if_match.strip() != "*":
+        expected_version = parse_etag_version(if_match)
+        if expected_version is None:
+            return jsonify({"message": "If-Match must be an ETag returned by this API"}), 412
 
-    if "title" in data:
-        new_title = sanitize_string(data.get("title"))
-        if not new_title:
-            return jsonify({"message": "title cannot be empty"}), 400
-        t.title = new_title
-    if "description" in data:
-        t.description = sanitize_string(data.get("description"))
-    if "completed" in data:
-        t.completed = parse_bool(data.get("completed"))
-    if "priority" in data:
-        t.priority = parse_priority(data.get("priority"))
-    if "due_date" in data:
-        t.due_date = parse_datetime(data.get("due_date"))
+    fields = task_fields(data)
 
-    db.session.commit()
-    return jsonify(task_to_dict(t)), 200
+    # One conditional UPDATE: no read-modify-write window between tabs
+    stmt = (
+        update(Task)
+        .where(Task.id == task_id, Task.user_id == user_id)
+        .values(**fields, version=Task.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    if expected_version is not None:
+        stmt = stmt.where(Task.version == expected_version)
+
+    def write(session):
+        if session.execute(stmt).rowcount == 0:
+            current = session.query(Task).filter_by(id=task_id, user_id=user_id).first()
+            if current:
+                return 412, task_to_dict(current)
+
+            # Editing an archived task brings it back to the hot table
+            archived = find_archived_task(task_id, user_id, session=session)
+            if not archived:
+                return 404, None
+            if expected_version is not None and archived.version != expected_version:
+                return 412, task_to_dict(archived)
+            restore_archived_task(archived, session=session)
+            session.flush()
+            session.execute(stmt)
+
+        t = session.get(Task, task_id, populate_existing=True)
+        body = task_to_dict(t)
+        # Event carries only the fields the client sent (plus id/updated_at/version)
+        delta = {k: body[k] for k in ("id", "updated_at", "version", *fields)}
+        record_task_event(user_id, "update", delta, session=session)
+        return 200, body
+
+    status, body = run_write(write)
+    if status == 404:
+        return jsonify({"message": "task not found"}), 404
+    if status == 412:
+        resp = jsonify({"message": "task was modified since you loaded it", "task": body})
+        return with_etag(resp, body["version"]), 412
+    return with_etag(jsonify(body), body["version"]), 200
 
 
 @tasks_bp.delete("/<int:task_id>")
@@ -288,10 +767,143 @@ def delete_task(task_id):
         description: Task not found
     """
     user_id = get_jwt_identity()
-    t = Task.query.filter_by(id=task_id, user_id=user_id).first()
-    if not t:
-        return jsonify({"message": "task not found"}), 404
 
-    db.session.delete(t)
-    db.session.commit()
+    def write(session):
+        t = session.query(Task).filter_by(id=task_id, user_id=user_id).first()
+        if not t:
+            t = find_archived_task(task_id, user_id, session=session)
+        if not t:
+            return False
+        session.delete(t)
+        record_task_event(user_id, "delete", {"id": task_id}, session=session)
+        return True
+
+    if not run_write(write):
+        return jsonify({"message": "task not found"}), 404
     return "", 204
+
+
+@tasks_bp.post("/bulk")
+@jwt_required()
+@idempotent
+def bulk_tasks():
+    """
+    Bulk update or delete
+    ---
+    tags:
+      - Tasks
+    summary: Apply one change to many tasks in a single transaction
+    description: >
+      Updates the same fields on (or deletes) up to 500 of the user's tasks.
+      Ids that don't exist or belong to someone else are listed in
+      not_found; the rest are changed together or not at all. Unlike PUT,
+      there is no If-Match check: the change applies to the current versions.
+    security:
+      - BearerAuth: []
+    consumes:
+      - application/json
+    parameters:
+      - in: header
+        name: Idempotency-Key
+        type: string
+        required: false
+        description: >
+          Unique key (e.g. a UUID) per logical write. Repeats with the same
+          key replay the first response instead of writing again.
+      - in: body
+        name: body
+        required: true
+        schema:
+          type: object
+          required:
+            - action
+            - ids
+          properties:
+            action:
+              type: string
+              enum: [update, delete]
+              example: update
+            ids:
+              type: array
+              items:
+                type: integer
+              example: [12, 15, 18]
+            fields:
+              type: object
+              description: For action=update; same fields as PUT /api/tasks/{id}
+              example: {"completed": true}
+    responses:
+      200:
+        description: >
+          {"updated": [task, ...], "not_found": [id, ...]} for update,
+          {"deleted": [id, ...], "not_found": [id, ...]} for delete
+      400:
+        description: Body does not match BulkTaskRequest in docs/api/openapi.yaml, or fields is empty
+      409:
+        description: A request with the same Idempotency-Key is still in progress
+      422:
+        description: Idempotency-Key was already used with a different payload
+    """
+    user_id = int(get_jwt_identity())
+    data, error = validate_json("BulkTaskRequest")
+    if error:
+        return error
+    action = data["action"]
+    ids = list(dict.fromkeys(data["ids"]))  # de-duplicate, keep order
+
+    fields = {}
+    if action == "update":
+        fields = task_fields(data.get("fields") or {})
+        if not fields:
+            return jsonify({"message": "fields must change at least one task field"}), 400
+
+    def write(session):
+        found = set(session.scalars(
+            select(Task.id).where(Task.id.in_(ids), Task.user_id == user_id)
+        ))
+        missing = [i for i in ids if i not in found]
+        archived = (
+            session.query(ArchivedTask)
+            .filter(ArchivedTask.id.in_(missing), ArchivedTask.user_id == user_id)
+            .all()
+            if missing else []
+        )
+        found |= {a.id for a in archived}
+        done = [i for i in ids if i in found]
+        not_found = [i for i in ids if i not in found]
+
+        if action == "delete":
+            for a in archived:
+                session.delete(a)
+            session.execute(
+                delete(Task)
+                .where(Task.id.in_(done), Task.user_id == user_id)
+                .execution_options(synchronize_session=False)
+            )
+            for task_id in done:
+                record_task_event(user_id, "delete", {"id": task_id}, session=session)
+            return {"deleted": done, "not_found": not_found}
+
+        # Editing archived tasks brings them back to the hot table (as PUT does)
+        for a in archived:
+            restore_archived_task(a, session=session)
+        session.flush()
+        session.execute(
+            update(Task)
+            .where(Task.id.in_(done), Task.user_id == user_id)
+            .values(**fields, version=Task.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+        tasks = session.scalars(
+            select(Task)
+            .where(Task.id.in_(done))
+            .order_by(Task.id)
+            .execution_options(populate_existing=True)
+        ).all()
+        bodies = [task_to_dict(t) for t in tasks]
+        for body in bodies:
+            delta = {k: body[k] for k in ("id", "updated_at", "version", *fields)}
+            record_task_event(user_id, "update", delta, session=session)
+        return {"updated": bodies, "not_found": not_found}
+
+    return jsonify(run_write(write)), 200
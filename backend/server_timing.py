@@ -0,0 +1,64 @@
+# backend/server_timing.py
+"""
+Server-Timing response header (SERVER_TIMING_ENABLED), e.g.
+
+    Server-Timing: db;dur=3.1;desc="4 queries", app;dur=12.7
+
+`db` is time spent executing SQL in the request thread, `app` the whole
+request up to the response headers (compression included; a streamed body
+is not). Clients can subtract `app` from their round trip to see how much
+of it was network. Browsers show the header in the devtools timing tab.
+"""
+
+import time
+
+from flask import g, has_request_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+_listening = False
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and "server_timing_start" in g:
+        context._server_timing_query_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, "_server_timing_query_start", None)
+    if start is not None and has_request_context() and "server_timing_start" in g:
+        g.server_timing_db += time.perf_counter() - start
+        g.server_timing_queries += 1
+
+
+def init_server_timing(app):
+    """
+    Time each request. Call before the other after_request hooks are
+    registered (Flask runs them in reverse), so `app` covers them too.
+    """
+    global _listening
+    if not app.config.get("SERVER_TIMING_ENABLED", True):
+        return
+    if not _listening:
+        # Every engine (default, binds, shards); only counted inside a request
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        _listening = True
+
+    @app.before_request
+    def start_timer():
+        g.server_timing_start = time.perf_counter()
+        g.server_timing_db = 0.0
+        g.server_timing_queries = 0
+
+    @app.after_request
+    def add_server_timing(response):
+        start = g.get("server_timing_start")
+        if start is None:
+            return response
+        total_ms = (time.perf_counter() - start) * 1000
+        db_ms = g.server_timing_db * 1000
+        response.headers["Server-Timing"] = (
+            f'db;dur={db_ms:.1f};desc="{g.server_timing_queries} queries", app;dur={total_ms:.1f}'
+        )
+        return response
@@ -0,0 +1,352 @@
+# backend/sharding.py
+"""
+User-based sharding across the binds in SQLALCHEMY_BINDS.
+
+- Users, the shard directory, jobs and id blocks live in the default DB.
+- Tables marked info={"sharded": True} (tasks, archive, events, idempotency
+  keys) live in one shard per user. ShardedSession routes them using the
+  JWT identity of the request, or an explicit `use_shard(...)` block.
+- Placement: a `shard_directory` row if present, else a consistent-hash ring,
+  so adding a shard only moves ~1/N of the users that follow the ring.
+- Task ids come from globally unique blocks, so a user's rows keep their ids
+  when `move_user` copies them to another shard.
+"""
+
+import bisect
+import hashlib
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from flask import current_app, g, jsonify, request
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from sqlalchemy import (
+    Column,
+    ForeignKeyConstraint,
+    Integer,
+    MetaData,
+    Table,
+    delete,
+    event,
+    func,
+    insert,
+    select,
+    update,
+)
+from sqlalchemy.exc import IntegrityError
+
+from backend.extensions import db
+from backend.models import ArchivedTask, IdBlock, IdempotencyKey, ShardDirectory, Task, TaskEvent
+
+# Copied by move_user (events and idempotency keys are short-lived and are dropped instead)
+MOVED_TABLES = (Task.__table__, ArchivedTask.__table__)
+DROPPED_ON_MOVE = (TaskEvent.__table__, IdempotencyKey.__table__)
+
+
+def _hash(value: str) -> int:
+    return int.from_bytes(hashlib.md5(value.encode()).digest()[:8], "big")
+
+
+class ShardRouter:
+    def __init__(self, keys, vnodes: int, cache_ttl: float, id_block_size: int, id_start: int):
+        self.keys = list(keys)
+        ring = sorted((_hash(f"{key}#{i}"), key) for key in self.keys for i in range(vnodes))
+        self._ring_hashes = [h for h, _ in ring]
+        self._ring_keys = [k for _, k in ring]
+        self._cache_ttl = cache_ttl
+        self._cache = {}  # user_id -> (shard, status, expires_at)
+        self._lock = threading.Lock()
+        self._id_block_size = id_block_size
+        self._id_start = id_start
+        self._id_blocks = {}  # name -> [next, end)
+
+    # ---------- placement ----------
+    def ring_shard(self, user_id) -> str:
+        i = bisect.bisect(self._ring_hashes, _hash(str(int(user_id)))) % len(self._ring_keys)
+        return self._ring_keys[i]
+
+    def lookup(self, user_id):
+        """(shard, status) for a user, from the directory (cached) or the ring."""
+        user_id = int(user_id)
+        now = time.monotonic()
+        cached = self._cache.get(user_id)
+        if cached and cached[2] > now:
+            return cached[0], cached[1]
+
+        with db.engines[None].connect() as conn:
+            row = conn.execute(
+                select(ShardDirectory.shard, ShardDirectory.status)
+                .where(ShardDirectory.user_id == user_id)
+            ).first()
+        shard, status = (row.shard, row.status) if row else (self.ring_shard(user_id), "active")
+        self._cache[user_id] = (shard, status, now + self._cache_ttl)
+        return shard, status
+
+    def shard_for(self, user_id) -> str:
+        return self.lookup(user_id)[0]
+
+    def forget(self, user_id):
+        self._cache.pop(int(user_id), None)
+
+    def current_key(self) -> str:
+        key = g.get("_shard_key") or g.get("_request_shard_key")
+        if key:
+            return key
+        try:
+            user_id = get_jwt_identity()
+        except RuntimeError:
+            user_id = None
+        if user_id is None:
+            raise RuntimeError("sharded table used outside a user request; wrap it in use_shard()")
+        g._request_shard_key = key = self.shard_for(user_id)
+        return key
+
+    def current_engine(self):
+        return db.engines[self.current_key()]
+
+    # ---------- globally unique ids ----------
+    def next_id(self, name: str) -> int:
+        with self._lock:
+            block = self._id_blocks.get(name)
+            if block is None or block[0] >= block[1]:
+                block = self._id_blocks[name] = list(self._allocate_block(name))
+            value = block[0]
+            block[0] += 1
+            return value
+
+    def _allocate_block(self, name: str):
+        table = IdBlock.__table__
+        size = self._id_block_size
+        for _ in range(3):
+            with db.engines[None].begin() as conn:
+                moved = conn.execute(
+                    update(table)
+                    .where(table.c.name == name)
+                    .values(next_value=table.c.next_value + size)
+                ).rowcount
+                if moved:
+                    end = conn.execute(
+                        select(table.c.next_value).where(table.c.name == name)
+                    ).scalar_one()
+                    return end - size, end
+            try:
+                with db.engines[None].begin() as conn:
+                    conn.execute(insert(table).values(name=name, next_value=self._id_start))
+            except IntegrityError:
+                pass  # another worker created it first
+        raise RuntimeError(f"could not allocate ids for {name}")
+
+
+def get_router():
+    return current_app.extensions.get("shard_router")
+
+
+@contextmanager
+def use_shard(key):
+    """Route sharded tables to `key` inside the block (None = leave routing alone)."""
+    previous = g.get("_shard_key")
+    g._shard_key = key
+    try:
+        yield
+    finally:
+        g._shard_key = previous
+
+
+def each_shard():
+    """Iterate once per shard with it selected (a single pass when unsharded)."""
+    router = get_router()
+    for key in (router.keys if router else [None]):
+        with use_shard(key):
+            yield key
+
+
+def _assign_task_id(mapper, connection, target):
+    router = current_app.extensions.get("shard_router")
+    if router is not None and target.id is None:
+        target.id = router.next_id("tasks")
+
+
+def init_sharding(app):
+    """Install a ShardRouter when SQLALCHEMY_BINDS defines shard binds."""
+    keys = sorted(k for k in app.config.get("SQLALCHEMY_BINDS", {}) if k.startswith("shard"))
+    if not keys:
+        return
+    app.extensions["shard_router"] = ShardRouter(
+        keys,
+        vnodes=app.config["SHARD_VNODES"],
+        cache_ttl=app.config["SHARD_DIRECTORY_CACHE_TTL"],
+        id_block_size=app.config["SHARD_ID_BLOCK_SIZE"],
+        id_start=app.config["SHARD_ID_START"],
+    )
+    if not event.contains(Task, "before_insert", _assign_task_id):
+        event.listen(Task, "before_insert", _assign_task_id)
+
+
+# -------------------------------------------------
+# Request helpers
+# -------------------------------------------------
+def place_new_user(user):
+    """Record where a freshly registered user lives (no-op when unsharded)."""
+    router = get_router()
+    if router is not None:
+        db.session.add(ShardDirectory(user_id=user.id, shard=router.ring_shard(user.id)))
+
+
+def reject_writes_during_move():
+    """before_request hook: writes get 503 while the caller's data is being moved."""
+    router = get_router()
+    if router is None or request.method in ("GET", "HEAD", "OPTIONS"):
+        return None
+    verify_jwt_in_request(optional=True)
+    user_id = get_jwt_identity()
+    if user_id is not None and router.lookup(user_id)[1] == "moving":
+        resp = jsonify({"message": "your data is being moved; please retry shortly"})
+        resp.headers["Retry-After"] = "5"
+        return resp, 503
+    return None
+
+
+# -------------------------------------------------
+# Schema + online user moves
+# -------------------------------------------------
+def init_databases():
+    """create_all() for the default DB plus the sharded tables in every shard."""
+    db.create_all()
+    router = get_router()
+    for key in (router.keys if router else []):
+        create_shard_schema(db.engines[key])
+
+
+def create_shard_schema(engine):
+    """Create the sharded tables in a shard DB (without FKs to the default DB's users)."""
+    metadata = MetaData()
+    # Stand-in so FKs to users resolve while copying; it is never created
+    Table("users", metadata, Column("id", Integer, primary_key=True))
+    tables = []
+    for table in db.metadata.sorted_tables:
+        if not table.info.get("sharded"):
+            continue
+        copy = table.to_metadata(metadata)
+        for constraint in list(copy.constraints):
+            if isinstance(constraint, ForeignKeyConstraint):
+                copy.constraints.discard(constraint)
+        tables.append(copy)
+    metadata.create_all(engine, tables=tables)
+
+
+def _set_directory(user_id, shard, status):
+    row = db.session.get(ShardDirectory, user_id)
+    if row is None:
+        db.session.add(ShardDirectory(user_id=user_id, shard=shard, status=status))
+    else:
+        row.shard, row.status = shard, status
+    db.session.commit()
+    get_router().forget(user_id)
+
+
+def _copy_rows(src, dst, table, user_id, batch_size, ids=None):
+    """Copy a user's rows (optionally only `ids`) from src to dst in bounded batches."""
+    copied = 0
+    last_id = 0
+    while True:
+        q = select(table).where(table.c.user_id == user_id, table.c.id > last_id)
+        if ids is not None:
+            q = q.where(table.c.id.in_(ids))
+        with src.connect() as conn:
+            rows = conn.execute(q.order_by(table.c.id).limit(batch_size)).mappings().all()
+        if not rows:
+            return copied
+        with dst.begin() as conn:
+            conn.execute(delete(table).where(table.c.id.in_([r["id"] for r in rows])))
+            conn.execute(insert(table), [dict(r) for r in rows])
+        copied += len(rows)
+        last_id = rows[-1]["id"]
+
+
+def _delete_rows(engine, table, user_id, batch_size, ids=None):
+    while True:
+        q = select(table.c.id).where(table.c.user_id == user_id)
+        if ids is not None:
+            q = q.where(table.c.id.in_(ids))
+        with engine.begin() as conn:
+            batch = conn.execute(q.limit(batch_size)).scalars().all()
+            if not batch:
+                return
+            conn.execute(delete(table).where(table.c.id.in_(batch)))
+
+
+def _user_ids(engine, table, user_id, since=None, column="updated_at"):
+    q = select(table.c.id).where(table.c.user_id == user_id)
+    if since is not None:
+        q = q.where(table.c[column] >= since)
+    with engine.connect() as conn:
+        return set(conn.execute(q).scalars())
+
+
+def move_user(user_id: int, target: str, batch_size: int = 500, log=print):
+    """
+    Move one user's task data to `target` while the app keeps serving them.
+
+    1. Bulk-copy rows (user still fully writable).
+    2. Mark the user "moving" (writes get 503), wait for caches to expire,
+       then copy whatever changed during step 1.
+    3. Point the directory at the target, wait again so every worker
+       routes there, then delete the source rows.
+    """
+    router = get_router()
+    if router is None:
+        raise RuntimeError("sharding is not enabled (SHARD_DATABASE_URLS is empty)")
+    if target not in router.keys:
+        raise ValueError(f"unknown shard {target!r}; have {', '.join(router.keys)}")
+
+    source, status = router.lookup(user_id)
+    if status == "moving":
+        raise RuntimeError(f"user {user_id} is already being moved")
+    if source == target:
+        log(f"user {user_id} already lives on {target}")
+        return
+
+    src, dst = db.engines[source], db.engines[target]
+    settle = current_app.config["SHARD_DIRECTORY_CACHE_TTL"] + 1
+    # Small margin for clock skew between app servers and this tool
+    started = datetime.utcnow() - timedelta(seconds=5)
+
+    log(f"[1/3] copying user {user_id}: {source} -> {target}")
+    for table in MOVED_TABLES:
+        _delete_rows(dst, table, user_id, batch_size)  # leftovers of an aborted move
+        log(f"  {table.name}: {_copy_rows(src, dst, table, user_id, batch_size)} row(s)")
+
+    log("[2/3] pausing writes and syncing changes")
+    _set_directory(user_id, source, "moving")
+    try:
+        time.sleep(settle)
+        for table in MOVED_TABLES:
+            column = "archived_at" if table is ArchivedTask.__table__ else "updated_at"
+            src_ids = _user_ids(src, table, user_id)
+            dst_ids = _user_ids(dst, table, user_id)
+            changed = (src_ids - dst_ids) | _user_ids(src, table, user_id, since=started, column=column)
+            _delete_rows(dst, table, user_id, batch_size, ids=list(dst_ids - src_ids))
+            _copy_rows(src, dst, table, user_id, batch_size, ids=list(changed))
+            log(f"  {table.name}: {len(changed)} changed, {len(dst_ids - src_ids)} removed")
+    except Exception:
+        _set_directory(user_id, source, "active")
+        raise
+
+    log("[3/3] switching directory and cleaning up the source")
+    _set_directory(user_id, target, "active")
+    time.sleep(settle)  # stale caches may still read from the source until now
+    for table in MOVED_TABLES + DROPPED_ON_MOVE:
+        _delete_rows(src, table, user_id, batch_size)
+    log(f"user {user_id} now lives on {target}")
+
+
+def shard_summary():
+    """Users with an explicit directory entry per shard."""
+    router = get_router()
+    counts = dict.fromkeys(router.keys, 0)
+    rows = db.session.execute(
+        select(ShardDirectory.shard, func.count()).group_by(ShardDirectory.shard)
+    )
+    counts.update({shard: n for shard, n in rows})
+    return counts
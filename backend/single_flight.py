@@ -0,0 +1,143 @@
+# backend/single_flight.py
+"""
+Single-flight for identical concurrent reads (SINGLE_FLIGHT_ENABLED).
+
+Streamlit reruns, the home page preview and several open tabs often send
+the same GET /api/tasks for the same user within a few milliseconds. With
+@coalesce on a view, the first such request in a worker process (the
+leader) runs the view; identical requests arriving while it runs wait for
+it and get a copy of its response body instead of running their own
+queries and serialization.
+
+"Identical" means same user, path, query string, Accept and If-None-Match.
+Nothing is cached: once the leader finishes, the next request runs the view
+again. A write by the user detaches the reads already in flight, so a GET
+sent after a PUT never gets a response computed before it (in this worker).
+Followers fall back to running the view themselves if the leader fails,
+streams its body or takes longer than SINGLE_FLIGHT_WAIT_SECONDS.
+
+Only the view's own response is shared: headers that describe one request
+(Server-Timing, cookies, encoding and length) are dropped from the copy and
+each follower's after_request hooks add their own.
+
+Requests can only overlap inside a worker with threaded workers (gunicorn
+-k gthread --threads N, as in the Procfile); with sync workers every
+request runs alone and coalescing never happens.
+
+Shared responses carry `Single-Flight: shared`; counts per endpoint are in
+GET /metrics (per worker process).
+"""
+
+import threading
+from functools import wraps
+
+from flask import Response, current_app, request
+from flask_jwt_extended import get_jwt_identity
+
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+# Describe the leader's request, not the response body: never copied to followers
+PER_REQUEST_HEADERS = {"server-timing", "set-cookie", "content-length", "content-encoding", "date"}
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.response = None  # (body, status, headers) once the leader succeeds
+        self.followers = 0
+
+
+class SingleFlight:
+    def __init__(self, wait_seconds: float):
+        self.wait_seconds = wait_seconds
+        self._lock = threading.Lock()
+        self._flights = {}  # key -> _Flight
+        self._stats = {}    # endpoint -> counters
+
+    def _count(self, endpoint: str, name: str, n: int = 1):
+        with self._lock:
+            entry = self._stats.setdefault(endpoint, {"executed": 0, "coalesced": 0, "fallbacks": 0})
+            entry[name] += n
+
+    def run(self, key, endpoint: str, view):
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                flight.followers += 1
+
+        if leader:
+            return self._lead(key, endpoint, flight, view)
+
+        if flight.done.wait(self.wait_seconds) and flight.response is not None:
+            self._count(endpoint, "coalesced")
+            body, status, headers = flight.response
+            resp = Response(body, status=status, headers=headers)
+            resp.headers["Single-Flight"] = "shared"
+            return resp
+        self._count(endpoint, "fallbacks")
+        return current_app.make_response(view())
+
+    def _lead(self, key, endpoint, flight, view):
+        try:
+            resp = current_app.make_response(view())
+            if not resp.is_streamed:
+                headers = [(k, v) for k, v in resp.headers if k.lower() not in PER_REQUEST_HEADERS]
+                flight.response = (resp.get_data(), resp.status_code, headers)
+            return resp
+        finally:
+            with self._lock:
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+            self._count(endpoint, "executed")
+            flight.done.set()
+
+    def forget_user(self, user_id):
+        """Later reads by this user start a new flight instead of joining one already running."""
+        with self._lock:
+            for key in [k for k in self._flights if k[0] == user_id]:
+                del self._flights[key]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {endpoint: dict(entry) for endpoint, entry in self._stats.items()}
+
+
+def get_single_flight():
+    return current_app.extensions.get("single_flight")
+
+
+def coalesce(view):
+    """Decorator for GET views behind @jwt_required(); see the module docstring."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        flights = get_single_flight()
+        if flights is None:
+            return view(*args, **kwargs)
+        key = (
+            get_jwt_identity(),
+            request.path,
+            request.query_string,
+            request.headers.get("Accept", ""),
+            request.headers.get("If-None-Match", ""),
+        )
+        return flights.run(key, request.endpoint, lambda: view(*args, **kwargs))
+    return wrapper
+
+
+def init_single_flight(app):
+    if not app.config.get("SINGLE_FLIGHT_ENABLED", True):
+        return
+    flights = app.extensions["single_flight"] = SingleFlight(app.config["SINGLE_FLIGHT_WAIT_SECONDS"])
+
+    @app.after_request
+    def detach_reads_after_write(response):
+        if request.method in WRITE_METHODS and response.status_code < 400:
+            try:
+                user_id = get_jwt_identity()
+            except RuntimeError:  # view without @jwt_required()
+                user_id = None
+            if user_id is not None:
+                flights.forget_user(user_id)
+        return response
@@ -1,6 +1,10 @@
-from datetime import datetime
+import re
+from datetime import datetime, timedelta
 
 ALLOWED_PRIORITIES = {"Low", "Medium", "High"}
+# Compact wire encoding for priority: index into PRIORITY_LEVELS
+PRIORITY_LEVELS = ("Low", "Medium", "High")
+PRIORITY_CODES = {p: i for i, p in enumerate(PRIORITY_LEVELS)}
 
 def sanitize_string(s: str) -> str:
     if s is None:
@@ -13,6 +17,26 @@ def parse_priority(value: str) -> str:
     v = value.strip().capitalize()
     return v if v in ALLOWED_PRIORITIES else "Medium"
 
+def parse_priority_set(value: str):
+    """"high,low" -> {"High", "Low"}; None if any name is unknown."""
+    names = {v.strip().capitalize() for v in value.split(",") if v.strip()}
+    return names if names and names <= ALLOWED_PRIORITIES else None
+
+def parse_sort(value: str, allowed):
+    """
+    "due_date,-priority" -> [("due_date", False), ("priority", True)]
+    (name, descending); None if a field isn't in `allowed` or repeats.
+    """
+    keys = []
+    for part in value.split(","):
+        part = part.strip()
+        descending = part.startswith("-")
+        name = part.lstrip("-+")
+        if name not in allowed or name in (k for k, _ in keys):
+            return None
+        keys.append((name, descending))
+    return keys
+
 def parse_bool(value):
     if isinstance(value, bool):
         return value
@@ -28,3 +52,23 @@ def parse_datetime(value):
         return datetime.fromisoformat(value.replace("Z", "").replace("T", " "))
     except Exception:
         return None
+
+def parse_etag_version(value):
+    """'"3"', 'W/"3"' or '3' -> 3; anything else -> None."""
+    if not value:
+        return None
+    v = value.strip()
+    if v.startswith("W/"):
+        v = v[2:]
+    v = v.strip('"')
+    return int(v) if v.isdigit() else None
+
+_WINDOW_RE = re.compile(r"^\s*(\d+)\s*([mhdw]?)\s*$", re.IGNORECASE)
+_WINDOW_UNITS = {"m": "minutes", "h": "hours", "d": "days", "w": "weeks", "": "days"}
+
+def parse_window(value, default: str = "7d"):
+    """Parse "30m", "12h", "7d", "2w" (bare numbers are days) into a timedelta, or None."""
+    m = _WINDOW_RE.match(value or default)
+    if not m:
+        return None
+    return timedelta(**{_WINDOW_UNITS[m.group(2).lower()]: int(m.group(1))})
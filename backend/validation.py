@@ -0,0 +1,372 @@
+# backend/validation.py
+"""
+Request body validation compiled from docs/api/openapi.yaml.
+
+At startup every schema under components/schemas is turned into Python
+source - one straight-line function per schema, with the checks for its
+properties inlined - and exec'd once. Validating a request then costs a
+handful of type checks and dict lookups instead of walking the schema.
+
+    value, errors = get_validator("TaskCreate")(data)
+    values, errors = get_validator("TaskCreate").many(list_of_thousands)
+
+`value` is the input with formats converted (date-time -> datetime) and,
+for objects, only the declared properties. `errors` lists every problem as
+{"path": JSON pointer, "code": keyword, "message": ...}; a batch is checked
+in one pass and its paths start with the item index ("/12/title").
+
+Supported (OpenAPI 3.0 subset): $ref to components, type, nullable, enum,
+minLength, maxLength, pattern (message via x-pattern-message), format
+(date-time, date, email), minimum, maximum, properties, required,
+additionalProperties: false, minProperties, items, minItems, maxItems.
+Anything else is rejected when compiling, rather than silently ignored.
+"""
+
+import re
+from datetime import datetime
+from pathlib import Path
+
+import yaml
+from flask import current_app, jsonify, request
+
+from backend.utils import parse_datetime
+
+DEFAULT_SPEC = Path(__file__).resolve().parent.parent / "docs" / "api" / "openapi.yaml"
+MAX_REPORTED_ERRORS = 50  # per response; error_count has the total
+
+_ANNOTATIONS = {"description", "example", "examples", "title", "default", "readOnly", "writeOnly", "deprecated"}
+_KEYWORDS = {
+    "$ref", "type", "nullable", "enum", "minLength", "maxLength", "pattern", "x-pattern-message",
+    "format", "minimum", "maximum", "properties", "required", "additionalProperties",
+    "minProperties", "items", "minItems", "maxItems",
+}
+_TYPE_CHECKS = {
+    "string": "type({v}) is str",
+    "integer": "type({v}) is int",
+    "number": "(type({v}) is int or type({v}) is float)",
+    "boolean": "({v} is True or {v} is False)",
+    "object": "type({v}) is dict",
+    "array": "type({v}) is list",
+}
+_TYPE_NAMES = {
+    "string": "a string",
+    "integer": "an integer",
+    "number": "a number",
+    "boolean": "true or false",
+    "object": "an object",
+    "array": "an array",
+}
+# Patterns with a cheaper equivalent string test (true when the pattern matches)
+_PATTERN_SHORTCUTS = {r"\S": "({v} and not {v}.isspace())"}
+_EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+$")
+
+
+def _parse_date_time(value):
+    """parse_datetime() with a fast path for the plain "2025-10-01T15:30:00" form."""
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return parse_datetime(value)
+    # Zone suffixes go through parse_datetime so "Z" still gives a naive UTC value
+    return parsed if parsed.tzinfo is None else parse_datetime(value)
+
+
+def _parse_date(value):
+    if len(value) > 10:
+        return None
+    return parse_datetime(value)
+
+
+_FORMATS = {
+    # format: (converter returning None when invalid, message)
+    "date-time": (_parse_date_time, "must be an ISO 8601 date or datetime"),
+    "date": (_parse_date, "must be an ISO 8601 date"),
+    "email": (lambda v: v if _EMAIL_RE.match(v) else None, "must be an email address"),
+}
+
+
+_MISSING = object()
+
+
+def _escape(name: str) -> str:
+    """JSON pointer segment (RFC 6901)."""
+    return name.replace("~", "~0").replace("/", "~1")
+
+
+class SchemaCompiler:
+    """Generates and loads the validator functions for one spec."""
+
+    def __init__(self, spec: dict):
+        self.spec = spec
+        self.source = []
+        self.namespace = {"_escape": _escape, "_MISSING": _MISSING}
+        self.functions = {}  # "$ref" -> generated function name
+        self.counter = 0
+        self._scopes = []    # constants used by each function being generated
+
+    def _name(self, prefix: str) -> str:
+        self.counter += 1
+        return f"{prefix}{self.counter}"
+
+    def _constant(self, value) -> str:
+        name = self._name("_c")
+        self.namespace[name] = value
+        self._scopes[-1].add(name)
+        return name
+
+    def _resolve(self, ref: str) -> dict:
+        if not ref.startswith("#/"):
+            raise ValueError(f"only local $refs are supported: {ref}")
+        node = self.spec
+        for part in ref[2:].split("/"):
+            node = node[part.replace("~1", "/").replace("~0", "~")]
+        return node
+
+    def function(self, schema: dict) -> str:
+        """Name of the generated `f(value, path, errors) -> value` for `schema`."""
+        ref = schema.get("$ref")
+        if ref is not None and len(schema) == 1:
+            if ref not in self.functions:
+                self.functions[ref] = self._name("_schema")  # before the body: allows recursion
+                self._define(self.functions[ref], self._resolve(ref))
+            return self.functions[ref]
+        name = self._name("_schema")
+        self._define(name, schema)
+        return name
+
+    def _define(self, name: str, schema: dict):
+        body = []
+        self._scopes.append(set())
+        self._emit(body, schema, "value", "out", "path", 1)
+        # Constants become keyword defaults: local lookups instead of global ones
+        constants = "".join(f", {c}={c}" for c in sorted(self._scopes.pop()))
+        signature = f"def {name}(value, path, errors, *, _escape=_escape, _MISSING=_MISSING{constants}):"
+        self.source.extend([signature, "    out = value", *body, "    return out", ""])
+
+    def load(self):
+        exec(compile("\n".join(self.source), "<openapi validators>", "exec"), self.namespace)
+
+    # ---------- code generation ----------
+    def _emit(self, lines, schema, src, dst, path, depth):
+        """Lines checking the local `src`; the converted value ends up in `dst`."""
+        pad = "    " * depth
+        if "$ref" in schema:
+            lines.append(f"{pad}{dst} = {self.function({'$ref': schema['$ref']})}({src}, {path}, errors)")
+            return
+        unknown = set(schema) - _KEYWORDS - _ANNOTATIONS
+        if unknown:
+            raise ValueError(f"unsupported schema keyword(s): {', '.join(sorted(unknown))}")
+
+        if schema.get("nullable"):
+            lines.append(f"{pad}if {src} is None:")
+            lines.append(f"{pad}    {dst} = None")
+            lines.append(f"{pad}else:")
+            depth += 1
+            pad += "    "
+
+        kind = schema.get("type")
+        if kind is None:
+            lines.append(f"{pad}{dst} = {src}")
+            self._emit_enum(lines, schema, src, path, pad)
+            return
+        if kind not in _TYPE_CHECKS:
+            raise ValueError(f"unsupported type: {kind}")
+
+        lines.append(f"{pad}if {_TYPE_CHECKS[kind].format(v=src)}:")
+        inner = len(lines)
+        getattr(self, f"_emit_{kind}", self._emit_plain)(lines, schema, src, dst, path, depth + 1)
+        if len(lines) == inner:
+            lines.append(f"{pad}    pass")
+        message = f"must be {_TYPE_NAMES[kind]}" + (" or null" if schema.get("nullable") else "")
+        lines.append(f"{pad}else:")
+        lines.append(f"{pad}    errors.append(({path}, 'type', {message!r}))")
+        if dst != "out":
+            lines.append(f"{pad}    {dst} = {src}")
+
+    def _emit_enum(self, lines, schema, src, path, pad):
+        if "enum" not in schema:
+            return
+        allowed = self._constant(frozenset(schema["enum"]))
+        message = "must be one of " + ", ".join(str(v) for v in schema["enum"])
+        lines.append(f"{pad}if {src} not in {allowed}:")
+        lines.append(f"{pad}    errors.append(({path}, 'enum', {message!r}))")
+
+    def _emit_plain(self, lines, schema, src, dst, path, depth):
+        pad = "    " * depth
+        if dst != "out":
+            lines.append(f"{pad}{dst} = {src}")
+        self._emit_enum(lines, schema, src, path, pad)
+        if "minimum" in schema:
+            lines.append(f"{pad}if {src} < {schema['minimum']!r}:")
+            lines.append(f"{pad}    errors.append(({path}, 'minimum', {'must be at least ' + str(schema['minimum'])!r}))")
+        if "maximum" in schema:
+            lines.append(f"{pad}if {src} > {schema['maximum']!r}:")
+            lines.append(f"{pad}    errors.append(({path}, 'maximum', {'must be at most ' + str(schema['maximum'])!r}))")
+
+    _emit_integer = _emit_number = _emit_boolean = _emit_plain
+
+    def _emit_string(self, lines, schema, src, dst, path, depth):
+        pad = "    " * depth
+        if dst != "out" and "format" not in schema:
+            lines.append(f"{pad}{dst} = {src}")
+        self._emit_enum(lines, schema, src, path, pad)
+        if "minLength" in schema:
+            lines.append(f"{pad}if len({src}) < {int(schema['minLength'])}:")
+            lines.append(f"{pad}    errors.append(({path}, 'minLength', "
+                         f"{'must be at least ' + str(schema['minLength']) + ' character(s)'!r}))")
+        if "maxLength" in schema:
+            lines.append(f"{pad}if len({src}) > {int(schema['maxLength'])}:")
+            lines.append(f"{pad}    errors.append(({path}, 'maxLength', "
+                         f"{'must be at most ' + str(schema['maxLength']) + ' characters'!r}))")
+        if "pattern" in schema:
+            message = schema.get("x-pattern-message", f"must match {schema['pattern']}")
+            if schema["pattern"] in _PATTERN_SHORTCUTS:
+                lines.append(f"{pad}if not {_PATTERN_SHORTCUTS[schema['pattern']].format(v=src)}:")
+            else:
+                search = self._constant(re.compile(schema["pattern"]).search)
+                lines.append(f"{pad}if {search}({src}) is None:")
+            lines.append(f"{pad}    errors.append(({path}, 'pattern', {message!r}))")
+        if "format" in schema:
+            if schema["format"] not in _FORMATS:
+                raise ValueError(f"unsupported format: {schema['format']}")
+            convert, message = _FORMATS[schema["format"]]
+            converter = self._constant(convert)
+            converted = self._name("_f")
+            lines.append(f"{pad}{converted} = {converter}({src})")
+            lines.append(f"{pad}if {converted} is None:")
+            lines.append(f"{pad}    errors.append(({path}, 'format', {message!r}))")
+            lines.append(f"{pad}{dst} = {converted}")
+
+    def _emit_object(self, lines, schema, src, dst, path, depth):
+        pad = "    " * depth
+        properties = schema.get("properties", {})
+        for name in schema.get("required", ()):
+            lines.append(f"{pad}if {name!r} not in {src}:")
+            lines.append(f"{pad}    errors.append(({path} + {'/' + _escape(name)!r}, 'required', 'is required'))")
+        if "minProperties" in schema:
+            count = int(schema["minProperties"])
+            lines.append(f"{pad}if len({src}) < {count}:")
+            lines.append(f"{pad}    errors.append(({path}, 'minProperties', {f'must have at least {count} field(s)'!r}))")
+        closed = schema.get("additionalProperties", True) is not True
+        if closed and schema.get("additionalProperties") is not False:
+            raise ValueError("additionalProperties must be false or absent")
+
+        result = self._name("_obj")
+        lines.append(f"{pad}{result} = {{}}")
+        for name, prop in properties.items():
+            item = self._name("_v")
+            lines.append(f"{pad}{item} = {src}.get({name!r}, _MISSING)")
+            lines.append(f"{pad}if {item} is not _MISSING:")
+            self._emit(lines, prop, item, f"{result}[{name!r}]", f"{path} + {'/' + _escape(name)!r}", depth + 1)
+        if closed:
+            # Every present property was copied into the result: extra keys exist
+            # only if the sizes differ, so valid input skips the set difference
+            known = self._constant(frozenset(properties))
+            lines.append(f"{pad}if len({result}) != len({src}):")
+            lines.append(f"{pad}    for _key in sorted({src}.keys() - {known}, key=str):")
+            lines.append(f"{pad}        errors.append(({path} + '/' + _escape(str(_key)), 'additionalProperties', 'is not a known field'))")
+        lines.append(f"{pad}{dst} = {result}")
+
+    def _emit_array(self, lines, schema, src, dst, path, depth):
+        pad = "    " * depth
+        if "minItems" in schema:
+            count = int(schema["minItems"])
+            lines.append(f"{pad}if len({src}) < {count}:")
+            lines.append(f"{pad}    errors.append(({path}, 'minItems', {f'must have at least {count} item(s)'!r}))")
+        if "maxItems" in schema:
+            count = int(schema["maxItems"])
+            lines.append(f"{pad}if len({src}) > {count}:")
+            lines.append(f"{pad}    errors.append(({path}, 'maxItems', {f'must have at most {count} items'!r}))")
+        if "items" not in schema:
+            if dst != "out":
+                lines.append(f"{pad}{dst} = {src}")
+            return
+        index, item, result = self._name("_i"), self._name("_item"), self._name("_list")
+        items = schema["items"]
+        if "$ref" in items:
+            # One call per item to the referenced schema's function
+            func = self.function({"$ref": items["$ref"]})
+            lines.append(f"{pad}{result} = [{func}({item}, {path} + '/' + str({index}), errors) "
+                         f"for {index}, {item} in enumerate({src})]")
+        else:
+            converted = self._name("_conv")
+            lines.append(f"{pad}{result} = []")
+            lines.append(f"{pad}for {index}, {item} in enumerate({src}):")
+            self._emit(lines, items, item, converted, f"{path} + '/' + str({index})", depth + 1)
+            lines.append(f"{pad}    {result}.append({converted})")
+        lines.append(f"{pad}{dst} = {result}")
+
+
+class Validator:
+    """A compiled schema: call it on one value, or use .many() on a list of them."""
+
+    def __init__(self, name: str, single, batch):
+        self.name = name
+        self._single = single
+        self._batch = batch
+
+    @staticmethod
+    def _errors(raw):
+        if not raw:
+            return raw
+        return [{"path": path, "code": code, "message": message} for path, code, message in raw]
+
+    def __call__(self, data):
+        """(converted value, errors) for one value."""
+        raw = []
+        return self._single(data, "", raw), self._errors(raw)
+
+    def many(self, items):
+        """(converted values, errors) for a list, in one pass; paths start with the index."""
+        raw = []
+        return self._batch(items, "", raw), self._errors(raw)
+
+
+def compile_spec(spec: dict) -> dict:
+    """{schema name: Validator} for every schema under components/schemas."""
+    compiler = SchemaCompiler(spec)
+    names = {}
+    for name in spec.get("components", {}).get("schemas", {}):
+        ref = f"#/components/schemas/{_escape(name)}"
+        names[name] = (
+            compiler.function({"$ref": ref}),
+            compiler.function({"type": "array", "items": {"$ref": ref}}),
+        )
+    compiler.load()
+    ns = compiler.namespace
+    return {name: Validator(name, ns[single], ns[batch]) for name, (single, batch) in names.items()}
+
+
+def load_validators(path=DEFAULT_SPEC) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return compile_spec(yaml.safe_load(f))
+
+
+def init_validation(app):
+    app.extensions["validators"] = load_validators(app.config.get("OPENAPI_SPEC_PATH") or DEFAULT_SPEC)
+
+
+def get_validator(name: str) -> Validator:
+    return current_app.extensions["validators"][name]
+
+
+def validation_error(errors, status: int = 400):
+    """JSON error response: the first problems, plus how many there were in total."""
+    first = errors[0]
+    more = f" (and {len(errors) - 1} more)" if len(errors) > 1 else ""
+    return jsonify({
+        "message": f"{first['path'] or 'body'}: {first['message']}{more}",
+        "errors": errors[:MAX_REPORTED_ERRORS],
+        "error_count": len(errors),
+    }), status
+
+
+def validate_json(schema_name: str):
+    """Validate the request's JSON body: (converted value, error response or None)."""
+    data = request.get_json(silent=True)
+    if data is None:
+        data = {}
+    value, errors = get_validator(schema_name)(data)
+    if errors:
+        return None, validation_error(errors)
+    return value, None
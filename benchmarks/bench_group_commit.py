@@ -0,0 +1,123 @@
+# benchmarks/bench_group_commit.py
+"""
+Measure POST /api/tasks throughput with and without group commit.
+
+Concurrent clients (threads, like a gunicorn --threads worker) create tasks
+against a fresh file-backed database; each configuration is run with group
+commit off and then at several batch windows.
+
+Run from the repo root:
+    python -m benchmarks.bench_group_commit --threads 16 --requests 100
+    python -m benchmarks.bench_group_commit --database-url postgresql://...   # reuses that DB
+"""
+
+import argparse
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from backend.config import Config  # noqa: E402
+
+
+def make_app(database_url, window_ms, durability):
+    # Config is read when the class is imported, so set attributes directly
+    Config.SQLALCHEMY_DATABASE_URI = database_url
+    Config.SHARD_DATABASE_URLS = []
+    Config.SQLALCHEMY_BINDS = {}
+    Config.GROUP_COMMIT_ENABLED = window_ms is not None
+    Config.GROUP_COMMIT_WINDOW_MS = window_ms or 0
+    Config.GROUP_COMMIT_DURABILITY = durability
+
+    from backend.app import create_app
+    from backend.extensions import db
+    from backend.sharding import init_databases
+
+    app = create_app()
+    with app.app_context():
+        db.drop_all()
+        init_databases()
+    return app
+
+
+def login(app):
+    client = app.test_client()
+    client.post("/api/auth/register", json={"email": "bench@example.com", "password": "bench"})
+    resp = client.post("/api/auth/login", json={"email": "bench@example.com", "password": "bench"})
+    return {"Authorization": f"Bearer {resp.get_json()['access_token']}"}
+
+
+def run(app, headers, threads, requests_per_thread):
+    latencies, errors = [], []
+    lock = threading.Lock()
+    start_gate = threading.Barrier(threads)
+
+    def client_loop(n):
+        client = app.test_client()
+        local = []
+        start_gate.wait()
+        for i in range(requests_per_thread):
+            t0 = time.perf_counter()
+            resp = client.post("/api/tasks", json={"title": f"bench {n}-{i}"}, headers=headers)
+            local.append((time.perf_counter() - t0) * 1000)
+            if resp.status_code != 201:
+                with lock:
+                    errors.append(resp.status_code)
+        with lock:
+            latencies.extend(local)
+
+    workers = [threading.Thread(target=client_loop, args=(n,)) for n in range(threads)]
+    start = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "rps": len(latencies) / elapsed,
+        "p50": statistics.median(latencies),
+        "p99": latencies[int(len(latencies) * 0.99) - 1],
+        "errors": len(errors),
+        "stats": app.extensions.get("group_committer") and app.extensions["group_committer"].stats,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=100, help="requests per thread")
+    parser.add_argument("--windows", default="1,2,5,10", help="comma-separated batch windows (ms)")
+    parser.add_argument("--durability", choices=["full", "relaxed"], default="full")
+    parser.add_argument("--database-url", help="default: a new SQLite file per run")
+    args = parser.parse_args()
+
+    windows = [None] + [float(w) for w in args.windows.split(",") if w]
+    print(f"{args.threads} threads x {args.requests} creates, durability={args.durability}\n")
+    print(f"{'group commit':<14}{'req/s':>9}{'p50 ms':>9}{'p99 ms':>9}{'errors':>8}{'writes/batch':>14}")
+
+    baseline = None
+    with tempfile.TemporaryDirectory() as tmp:
+        for i, window in enumerate(windows):
+            url = args.database_url or f"sqlite:///{tmp}/bench{i}.sqlite3"
+            app = make_app(url, window, args.durability)
+            result = run(app, login(app), args.threads, args.requests)
+
+            label = "off" if window is None else f"{window:g} ms"
+            stats = result["stats"]
+            per_batch = f"{stats['writes'] / stats['batches']:.1f}" if stats and stats["batches"] else "1.0"
+            baseline = baseline or result["rps"]
+            print(
+                f"{label:<14}{result['rps']:>9.0f}{result['p50']:>9.1f}{result['p99']:>9.1f}"
+                f"{result['errors']:>8}{per_batch:>14}   x{result['rps'] / baseline:.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# benchmarks/bench_task_formats.py
+"""
+Compare GET /api/tasks payload formats: size on the wire and client decode time.
+
+Run from the repo root:
+    python -m benchmarks.bench_task_formats --tasks 2000
+"""
+
+import argparse
+import gzip
+import json
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "frontend"))
+
+from backend.formats import msgpack, tasks_to_columnar  # noqa: E402
+from backend.models import Task  # noqa: E402
+from backend.routes.tasks import task_to_dict  # noqa: E402
+from task_codec import decode_tasks  # noqa: E402
+
+
+def make_tasks(n: int):
+    base = datetime(2025, 1, 1, 9, 30, 15, 123456)
+    tasks = []
+    for i in range(n):
+        tasks.append(
+            Task(
+                id=i + 1,
+                title=f"Task number {i} - follow up on the quarterly report",
+                description="Write final reflection and upload PDF" if i % 3 else None,
+                completed=i % 4 == 0,
+                priority=("Low", "Medium", "High")[i % 3],
+                due_date=base + timedelta(days=i % 45) if i % 2 else None,
+                user_id=1,
+                created_at=base + timedelta(minutes=i),
+                updated_at=base + timedelta(minutes=i, seconds=30),
+            )
+        )
+    return tasks
+
+
+def time_decode(body: bytes, content_type: str, repeat: int) -> float:
+    """Median decode time in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        decode_tasks(body, content_type)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tasks", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    tasks = make_tasks(args.tasks)
+    rows = [task_to_dict(t) for t in tasks]
+    columnar = tasks_to_columnar(tasks)
+
+    variants = [
+        ("json rows", json.dumps(rows).encode(), "application/json"),
+        ("json columnar", json.dumps(columnar).encode(), "application/json"),
+    ]
+    if msgpack is not None:
+        variants += [
+            ("msgpack rows", msgpack.packb(rows, use_bin_type=True), "application/msgpack"),
+            ("msgpack columnar", msgpack.packb(columnar, use_bin_type=True), "application/msgpack"),
+        ]
+    else:
+        print("msgpack not installed: skipping MessagePack variants\n")
+
+    baseline = len(variants[0][1])
+    print(f"{args.tasks} tasks, median of {args.repeat} decodes\n")
+    print(f"{'format':<18}{'bytes':>10}{'gzip':>10}{'vs json':>9}{'decode ms':>11}")
+    for name, body, content_type in variants:
+        gz = len(gzip.compress(body, 6))
+        ms = time_decode(body, content_type, args.repeat)
+        print(f"{name:<18}{len(body):>10}{gz:>10}{len(body) / baseline:>8.0%}{ms:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
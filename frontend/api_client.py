@@ -0,0 +1,234 @@
+# frontend/api_client.py
+"""
+The one way pages talk to the KaryaMate API.
+
+All calls go through a keep-alive requests.Session cached per base URL for
+the whole Streamlit process, so consecutive calls (from any page or user)
+reuse pooled TCP/TLS connections instead of handshaking every time.
+Base URL, timeouts and the Authorization header are filled in here, and
+every call's latency is recorded in st.session_state["api_calls"].
+
+Calls are guarded by a per-endpoint circuit breaker (see resilience.py):
+while the API is down they fail fast with CircuitOpenError instead of each
+waiting out the timeout. Idempotent requests - GET/DELETE, and PUT/POST
+carrying an Idempotency-Key - are retried with jittered exponential
+backoff. With KARYAMATE_HEDGE_GETS=1, a GET still running after the
+endpoint's p95 latency gets a second, hedged request; the first to answer wins.
+
+The shared Session never holds per-user state: the bearer token is sent
+per request from the caller's own session_state, and cookies are ignored.
+"""
+
+import os
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+
+import requests
+import streamlit as st
+from requests.adapters import HTTPAdapter
+
+from resilience import CLOSED, CircuitBreaker, CircuitOpenError, backoff_delay, endpoint_key
+
+# Deployed backend; for local testing run with KARYAMATE_API_URL=http://127.0.0.1:5000
+API_BASE_URL = os.getenv("KARYAMATE_API_URL", "https://karyamate-api.onrender.com").rstrip("/")
+
+DEFAULT_TIMEOUT = (5, 10)  # (connect, read) seconds
+POOL_MAXSIZE = 20          # concurrent connections kept per host
+CALL_HISTORY = 100         # latency samples kept per browser session
+RETRIES = 2                # extra attempts for idempotent requests
+HEDGE_GETS = os.getenv("KARYAMATE_HEDGE_GETS", "").lower() in {"1", "true", "yes", "on"}
+HEDGE_WORKERS = 8
+
+# Network failures that are worth retrying (the request may not have arrived).
+# CircuitOpenError is a ConnectionError, so it is one of these too.
+TRANSIENT_ERRORS = (requests.Timeout, requests.ConnectionError)
+# Responses from a struggling server/proxy: retried and counted by the breaker
+UNAVAILABLE_STATUSES = {502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "DELETE"}
+
+
+class _NoCookies(requests.cookies.RequestsCookieJar):
+    """The Session is shared by every user; never carry cookies between them."""
+
+    def set_cookie(self, cookie, *args, **kwargs):
+        return None
+
+
+@st.cache_resource(show_spinner=False)
+def _session(base_url: str) -> requests.Session:
+    session = requests.Session()
+    session.cookies = _NoCookies()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_MAXSIZE)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+@st.cache_resource(show_spinner=False)
+def _breakers(base_url: str) -> dict:
+    return {}
+
+
+@st.cache_resource(show_spinner=False)
+def _hedge_pool() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=HEDGE_WORKERS, thread_name_prefix="api-hedge")
+
+
+def breaker(method: str, path: str) -> CircuitBreaker:
+    key = endpoint_key(method, path)
+    # dict.setdefault is atomic; a losing duplicate is simply dropped
+    return _breakers(API_BASE_URL).setdefault(key, CircuitBreaker(key))
+
+
+def degraded_endpoints() -> list[dict]:
+    """Snapshots of breakers that are open or half-open (empty when all is well)."""
+    return [b.snapshot() for b in list(_breakers(API_BASE_URL).values()) if b.state != CLOSED]
+
+
+def auth_headers() -> dict:
+    token = st.session_state.get("access_token")
+    return {"Authorization": f"Bearer {token}"} if token else {}
+
+
+def parse_server_timing(header: str | None) -> dict:
+    """'db;dur=3.1;desc="4 queries", app;dur=12.7' -> {"db": 3.1, "app": 12.7}"""
+    timings = {}
+    for metric in (header or "").split(","):
+        name, _, params = metric.strip().partition(";")
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "dur" and name:
+                try:
+                    timings[name] = float(value)
+                except ValueError:
+                    pass
+    return timings
+
+
+def _record(method: str, path: str, resp, elapsed_ms: float, attempt: int = 0, hedged: bool = False):
+    call = {
+        "method": method,
+        "path": path,
+        "status": resp.status_code if resp is not None else None,
+        "ms": round(elapsed_ms, 1),
+        "at": datetime.now().isoformat(timespec="seconds"),
+        "attempt": attempt,
+        "hedged": hedged,
+        "bytes": len(resp.content) if resp is not None else None,
+        "server": parse_server_timing(resp.headers.get("Server-Timing")) if resp is not None else {},
+    }
+    calls = st.session_state.setdefault("api_calls", deque(maxlen=CALL_HISTORY))
+    calls.append(call)
+    # The dashboard's perf HUD (perf_hud.py) groups calls by rerun
+    run = st.session_state.get("perf_run")
+    if run is not None:
+        run["calls"].append(call)
+
+
+def _retryable(method: str, headers: dict) -> bool:
+    return method in IDEMPOTENT_METHODS or "Idempotency-Key" in headers
+
+
+def _send_hedged(send, delay: float):
+    """
+    Run send(); if it hasn't answered after `delay` seconds, run it again
+    and return whichever finishes first. Returns (response, hedged).
+    """
+    pool = _hedge_pool()
+    first = pool.submit(send)
+    done, _ = wait([first], timeout=delay)
+    if done:
+        return first.result(), False
+
+    second = pool.submit(send)
+    done, pending = wait([first, second], return_when=FIRST_COMPLETED)
+    winner = done.pop()
+    if winner.exception() is not None and pending:
+        winner = pending.pop()  # one failed; the other may still answer
+    return winner.result(), True  # the loser finishes in the background
+
+
+def request(method: str, path: str, *, auth: bool = True, headers=None,
+            timeout=DEFAULT_TIMEOUT, retries: int | None = None, hedge: bool | None = None,
+            **kwargs) -> requests.Response:
+    """
+    Send `method path` (e.g. "GET", "/api/tasks") to the API.
+    Raises requests exceptions like requests itself (CircuitOpenError when
+    the endpoint's breaker is open); callers handle them. `retries` and
+    `hedge` default to what is safe for the method and headers.
+    """
+    method = method.upper()
+    all_headers = auth_headers() if auth else {}
+    all_headers.update(headers or {})
+    if retries is None:
+        retries = RETRIES if _retryable(method, all_headers) else 0
+    if hedge is None:
+        hedge = HEDGE_GETS and method == "GET"
+
+    guard = breaker(method, path)
+    session = _session(API_BASE_URL)
+
+    def send():
+        return session.request(
+            method, f"{API_BASE_URL}{path}", headers=all_headers, timeout=timeout, **kwargs
+        )
+
+    for attempt in range(retries + 1):
+        guard.before_call()
+        hedged = False
+        start = time.perf_counter()
+        try:
+            delay = guard.hedge_delay() if hedge else None
+            if delay is None:
+                resp = send()
+            else:
+                resp, hedged = _send_hedged(send, delay)
+        except TRANSIENT_ERRORS:
+            guard.record_failure()
+            _record(method, path, None, (time.perf_counter() - start) * 1000, attempt, hedged)
+            if attempt == retries:
+                raise
+        except Exception:
+            guard.release()  # not the server's fault; let the next call probe
+            raise
+        else:
+            elapsed = time.perf_counter() - start
+            _record(method, path, resp, elapsed * 1000, attempt, hedged)
+            if resp.status_code not in UNAVAILABLE_STATUSES:
+                guard.record_success(elapsed)
+                return resp
+            guard.record_failure()
+            if attempt == retries:
+                return resp
+        time.sleep(backoff_delay(attempt))
+
+
+def get(path: str, **kwargs) -> requests.Response:
+    return request("GET", path, **kwargs)
+
+
+def post(path: str, **kwargs) -> requests.Response:
+    return request("POST", path, **kwargs)
+
+
+def put(path: str, **kwargs) -> requests.Response:
+    return request("PUT", path, **kwargs)
+
+
+def delete(path: str, **kwargs) -> requests.Response:
+    return request("DELETE", path, **kwargs)
+
+
+def error_message(resp: requests.Response) -> str:
+    """The API's {"message": ...} if there is one, else the raw body."""
+    try:
+        return resp.json().get("message", resp.text)
+    except Exception:
+        return resp.text
+
+
+def recent_calls() -> list[dict]:
+    """Latency log for this browser session, oldest first."""
+    return list(st.session_state.get("api_calls", ()))
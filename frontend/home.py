@@ -1,7 +1,9 @@
 import streamlit as st
-import requests
 from pathlib import Path
 
+import task_cache
+from api_client import API_BASE_URL
+
 # ------------------- Page Config -------------------
 THIS_DIR = Path(__file__).parent
 FAVICON_PATH = THIS_DIR / "assets" / "favicon.ico"
@@ -13,11 +15,6 @@ st.set_page_config(
     layout="wide",
 )
 
-# ------------------- Backend Config -------------------
-API_BASE_URL = "https://karyamate-api.onrender.com"
-if "API_BASE_URL" not in st.session_state:
-    st.session_state["API_BASE_URL"] = API_BASE_URL
-
 # ------------------- Custom CSS -------------------
 st.markdown(
     """
@@ -261,26 +258,17 @@ preview_tasks = []
 error_msg = None
 
 if "access_token" in st.session_state and st.session_state.access_token:
-    token = st.session_state.access_token
-    headers = {"Authorization": f"Bearer {token}"}
-
-    try:
+    # Same on-disk cache as the dashboard; only call the API when it's empty
+    cached = task_cache.load()
+    if cached is not None:
+        preview_tasks = cached.tasks
+        st.caption(f"From your saved task list ({task_cache.age_text(cached.saved_at)}).")
+    else:
         with st.spinner("Calling GET /api/tasks ..."):
-            resp = requests.get(
-                f"{API_BASE_URL}/api/tasks",
-                headers=headers,
-                timeout=10,
-            )
-        if resp.status_code == 200:
-            preview_tasks = resp.json()
-        else:
-            try:
-                msg = resp.json().get("message", resp.text)
-            except Exception:
-                msg = resp.text
-            error_msg = f"API returned {resp.status_code}: {msg}"
-    except Exception as e:
-        error_msg = f"Error contacting API: {e}"
+            tasks, etag, error_msg = task_cache.fetch()
+        if tasks is not None:
+            task_cache.save(tasks, etag)
+            preview_tasks = tasks
 else:
     st.info("Login first (Login Page) to preview your tasks here.")
 
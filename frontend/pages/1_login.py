@@ -1,18 +1,12 @@
 import streamlit as st
 from pathlib import Path
-import requests
+
+import api_client
 
 # ----- Absolute path to favicon -----
 THIS_DIR = Path(__file__).parent
 FAVICON_PATH = THIS_DIR / "assets" / "favicon.ico"
 
-# ------------------- Config -------------------
-# Deployed backend
-API_BASE_URL = "https://karyamate-api.onrender.com"
-# For local testing, you can temporarily change to:
-# API_BASE_URL = "http://127.0.0.1:5000"
-
-
 st.set_page_config(
     page_title="KaryaMate - Login",
     page_icon=str(FAVICON_PATH),
@@ -36,10 +30,10 @@ def do_login(email: str, password: str):
         return
 
     try:
-        resp = requests.post(
-            f"{API_BASE_URL}/api/auth/login",
+        resp = api_client.post(
+            "/api/auth/login",
             json={"email": email, "password": password},
-            timeout=10,
+            auth=False,
         )
     except Exception as e:
         st.error(f"Could not connect to backend: {e}")
@@ -63,11 +57,7 @@ def do_login(email: str, password: str):
             # Fallback: rerun if switch_page not available
             st.rerun()
     else:
-        try:
-            msg = resp.json().get("message", resp.text)
-        except Exception:
-            msg = resp.text
-        st.error(f"Login failed ({resp.status_code}): {msg}")
+        st.error(f"Login failed ({resp.status_code}): {api_client.error_message(resp)}")
 
 
 def do_register(email: str, password: str):
@@ -77,10 +67,10 @@ def do_register(email: str, password: str):
         return
 
     try:
-        resp = requests.post(
-            f"{API_BASE_URL}/api/auth/register",
+        resp = api_client.post(
+            "/api/auth/register",
             json={"email": email, "password": password},
-            timeout=10,
+            auth=False,
         )
     except Exception as e:
         st.error(f"Could not connect to backend: {e}")
@@ -89,11 +79,7 @@ def do_register(email: str, password: str):
     if resp.status_code == 201:
         st.success("🎉 Registration successful! You can now log in.")
     else:
-        try:
-            msg = resp.json().get("message", resp.text)
-        except Exception:
-            msg = resp.text
-        st.error(f"Registration failed ({resp.status_code}): {msg}")
+        st.error(f"Registration failed ({resp.status_code}): {api_client.error_message(resp)}")
 
 
 # ------------------- UI -------------------
@@ -1,10 +1,21 @@
 # frontend/pages/2_dashboard.py
 
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+
 import streamlit as st
-import requests
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 from datetime import datetime, date
 from pathlib import Path
 
+import api_client
+import perf_hud
+import task_cache
+from api_client import API_BASE_URL
+from task_index import TaskIndex
+
 # ==================== Page Config ====================
 THIS_DIR = Path(__file__).parent.parent  # /frontend
 FAVICON_PATH = THIS_DIR / "assets" / "favicon.ico"
@@ -16,12 +27,6 @@ st.set_page_config(
     layout="wide",
 )
 
-# ==================== Backend Config ====================
-API_BASE_URL = st.session_state.get(
-    "API_BASE_URL",
-    "https://karyamate-api.onrender.com",  # deployed backend
-)
-
 # ==================== Auth Guard ====================
 if "access_token" not in st.session_state or not st.session_state.access_token:
     st.title("📋 KaryaMate Task Dashboard")
@@ -32,50 +37,141 @@ if "access_token" not in st.session_state or not st.session_state.access_token:
     )
     st.stop()
 
-TOKEN = st.session_state.access_token
-HEADERS = {"Authorization": f"Bearer {TOKEN}"}
+st.sidebar.toggle(
+    "⏱ Performance HUD", key="perf_hud", value=perf_hud.DEFAULT_ON,
+    help="Show script, API and render timings for recent reruns (exportable as JSON).",
+)
+perf_hud.start_run()
+
+# Writes carry an Idempotency-Key, so api_client retries them (short timeout for create)
+CREATE_TIMEOUT = 5
+
+# Task list: cards are paginated; compact mode is one selectable table
+PAGE_SIZES = [10, 25, 50]
+COMPACT_TABLE_HEIGHT = 420
+AUTO_REFRESH_SECONDS = 30  # list fragment's run_every when auto-refresh is on
+REVALIDATE_POLL_SECONDS = 1  # ... and while a background refetch is running
+DUE_BADGES = {"overdue": "🔥 Overdue", "today": "📅 Due today"}
+
+# Bulk actions: one POST /api/tasks/bulk, or (older API) this many requests at once
+BULK_CHUNK = 500  # the API's limit on ids per bulk request
+BULK_WORKERS = 8
 
 # ---- Session defaults ----
 if "tasks" not in st.session_state:
     st.session_state.tasks = []          # always "all" tasks from API
+if "tasks_version" not in st.session_state:
+    st.session_state.tasks_version = 0   # bumped by set_tasks(); keys the TaskIndex
+if "tasks_etag" not in st.session_state:
+    st.session_state.tasks_etag = None   # ETag of the server list we hold (None once patched)
 if "selected_task_id" not in st.session_state:
     st.session_state.selected_task_id = None
-if "show_view_dialog" not in st.session_state:
-    st.session_state.show_view_dialog = False
 if "view_task_data" not in st.session_state:
     st.session_state.view_task_data = None
-if "show_edit_dialog" not in st.session_state:
-    st.session_state.show_edit_dialog = False
 if "edit_task_data" not in st.session_state:
     st.session_state.edit_task_data = None
+if "revalidation" not in st.session_state:
+    st.session_state.revalidation = None  # Future of a background refetch
+if "page_size" not in st.session_state:
+    st.session_state.page_size = PAGE_SIZES[0]
+if "table_nonce" not in st.session_state:
+    st.session_state.table_nonce = 0     # bumped to clear the table selection
+if "auto_refresh" not in st.session_state:
+    st.session_state.auto_refresh = False
 
 
 # ==================== Helper Functions ====================
+def set_tasks(tasks: list[dict], etag: str | None = None, persist: bool = True):
+    """
+    The only way to change session_state.tasks, so derived data and the
+    on-disk cache stay in sync. `etag` is None for locally patched lists.
+    """
+    st.session_state.tasks = tasks
+    st.session_state.tasks_etag = etag
+    st.session_state.tasks_version += 1
+    if persist:
+        task_cache.save(tasks, etag)
+
+
+def task_index() -> TaskIndex:
+    """TaskIndex for the current tasks, rebuilt only when they change (or the day does)."""
+    key = (st.session_state.tasks_version, date.today())
+    cached = st.session_state.get("task_index")
+    if cached is None or cached[0] != key:
+        cached = (key, TaskIndex(st.session_state.tasks, today=key[1], row=table_row))
+        st.session_state.task_index = cached
+    return cached[1]
+
+
 def fetch_tasks():
-    """GET /api/tasks (all) and store in session_state.tasks."""
-    try:
-        resp = requests.get(
-            f"{API_BASE_URL}/api/tasks",
-            headers=HEADERS,
-            timeout=10,
-        )
-    except Exception as e:
-        st.error(f"❌ Failed to fetch tasks: {e}")
+    """GET /api/tasks (all, conditional on what we hold) and store in session_state.tasks."""
+    tasks, etag, error = task_cache.fetch(st.session_state.tasks_etag)
+    st.session_state.fetched_at = time.monotonic()
+    if error:
+        st.error(error)
+    elif tasks is not None:
+        set_tasks(tasks, etag)
+
+
+# ---- Local patches from write responses (no refetch) ----
+def patch_task(task: dict):
+    """Insert or replace one task in session_state.tasks by id."""
+    tasks = st.session_state.tasks
+    if any(x["id"] == task["id"] for x in tasks):
+        set_tasks([task if x["id"] == task["id"] else x for x in tasks])
+    else:
+        set_tasks(tasks + [task])
+
+
+def drop_task(task_id):
+    set_tasks([x for x in st.session_state.tasks if x["id"] != task_id])
+
+
+def optimistic(apply, send):
+    """
+    Apply a local change right away, then send the write. If the request fails
+    or the API rejects it, session_state.tasks is rolled back.
+    """
+    snapshot = st.session_state.tasks
+    apply()
+    resp = send()
+    if resp is None or resp.status_code >= 400:
+        set_tasks(snapshot)
+    return resp
+
+
+def start_revalidation():
+    """
+    Refetch the list in a background thread: after a version mismatch (412),
+    and when the page opened on cached tasks. The list fragment polls for
+    the result and merges it.
+    """
+    if st.session_state.revalidation is not None:
         return
+    future = Future()
+    etag = st.session_state.tasks_etag
 
-    if resp.status_code == 200:
-        try:
-            st.session_state.tasks = resp.json()
-        except Exception as e:
-            st.error(f"❌ Could not parse tasks response: {e}")
-    elif resp.status_code == 401:
-        st.error("Unauthorized (401). Your session may have expired. Please log in again.")
-    else:
-        try:
-            msg = resp.json().get("message", resp.text)
-        except Exception:
-            msg = resp.text
-        st.error(f"❌ Could not load tasks ({resp.status_code}): {msg}")
+    def run():
+        future.set_result(task_cache.fetch(etag))
+
+    thread = threading.Thread(target=run, daemon=True)
+    add_script_run_ctx(thread)  # lets api_client read this session's token
+    thread.start()
+    st.session_state.revalidation = future
+
+
+def apply_revalidation() -> bool:
+    """Merge a finished background refetch. True if one finished."""
+    future = st.session_state.revalidation
+    if future is None or not future.done():
+        return False
+    st.session_state.revalidation = None
+    st.session_state.cached_at = None
+    st.session_state.fetched_at = time.monotonic()
+    tasks, etag, _ = future.result()
+    if tasks is not None:  # None: 304 (still current) or an error; keep what we show
+        set_tasks(tasks, etag)
+    return True
 
 
 def create_task(title: str, description: str, priority: str, due_date: date | None):
@@ -93,30 +189,37 @@ def create_task(title: str, description: str, priority: str, due_date: date | No
             due_date, datetime.min.time()
         ).isoformat()
 
+    # Same key on every retry: the API replays the first result instead of
+    # creating a duplicate, so a slow/cold backend can be retried safely.
     try:
-        resp = requests.post(
-            f"{API_BASE_URL}/api/tasks",
-            headers=HEADERS,
+        resp = api_client.post(
+            "/api/tasks",
+            headers={"Idempotency-Key": str(uuid.uuid4())},
             json=payload,
-            timeout=10,
+            timeout=CREATE_TIMEOUT,
         )
     except Exception as e:
         st.error(f"❌ Failed to create task: {e}")
         return
 
     if resp.status_code == 201:
-        st.success("Task created successfully 🎉")
-        fetch_tasks()  # refresh ALL tasks
+        st.toast("Task created successfully 🎉")
+        patch_task(resp.json())
+        st.rerun()  # whole page: the list and metrics show the new task
     else:
-        try:
-            msg = resp.json().get("message", resp.text)
-        except Exception:
-            msg = resp.text
-        st.error(f"❌ Could not create task ({resp.status_code}): {msg}")
+        st.error(f"❌ Could not create task ({resp.status_code}): {api_client.error_message(resp)}")
 
 
-def update_task(task_id, **fields):
-    """PUT /api/tasks/<id> with only changed fields."""
+def update_task(task_id, version=None, **fields):
+    """
+    PUT /api/tasks/<id> with only changed fields.
+    With `version`, the API rejects the edit (412) if the task changed since it was loaded.
+    The Idempotency-Key makes a retried PUT replay its first answer, not hit a 412.
+    """
+    headers = {"Idempotency-Key": str(uuid.uuid4())}
+    if version is not None:
+        headers["If-Match"] = f'"{version}"'
+
     payload = {}
     for key, value in fields.items():
         if value is not None:
@@ -126,11 +229,10 @@ def update_task(task_id, **fields):
                 payload[key] = value
 
     try:
-        resp = requests.put(
-            f"{API_BASE_URL}/api/tasks/{task_id}",
-            headers=HEADERS,
+        resp = api_client.put(
+            f"/api/tasks/{task_id}",
+            headers=headers,
             json=payload,
-            timeout=10,
         )
     except Exception as e:
         st.error(f"❌ Failed to update task: {e}")
@@ -142,11 +244,7 @@ def update_task(task_id, **fields):
 def delete_task(task_id):
     """DELETE /api/tasks/<id>."""
     try:
-        resp = requests.delete(
-            f"{API_BASE_URL}/api/tasks/{task_id}",
-            headers=HEADERS,
-            timeout=10,
-        )
+        resp = api_client.delete(f"/api/tasks/{task_id}")
     except Exception as e:
         st.error(f"❌ Failed to delete task: {e}")
         return None
@@ -154,6 +252,131 @@ def delete_task(task_id):
     return resp
 
 
+# ---- Bulk actions ----
+def apply_changes(updated: list[dict], gone: list):
+    """Patch many tasks into session_state.tasks in one set_tasks() call."""
+    by_id = {t["id"]: t for t in updated}
+    gone = set(gone)
+    set_tasks([by_id.get(x["id"], x) for x in st.session_state.tasks if x["id"] not in gone])
+
+
+def bulk_via_api(ids: list, action: str, fields: dict):
+    """
+    POST /api/tasks/bulk in chunks. Returns (updated, gone, failed), or None
+    if this API has no bulk endpoint (then the caller falls back).
+    """
+    updated, gone, failed = [], [], []
+    for start in range(0, len(ids), BULK_CHUNK):
+        chunk = ids[start:start + BULK_CHUNK]
+        try:
+            resp = api_client.post(
+                "/api/tasks/bulk",
+                headers={"Idempotency-Key": str(uuid.uuid4())},
+                json={"action": action, "ids": chunk, "fields": fields},
+            )
+        except Exception:
+            failed.extend(chunk)
+            continue
+        if resp.status_code in (404, 405) and start == 0:
+            st.session_state.bulk_endpoint = False
+            return None
+        if resp.status_code != 200:
+            failed.extend(chunk)
+            continue
+        body = resp.json()
+        updated.extend(body.get("updated", []))
+        # not_found: deleted elsewhere, so gone from our list too
+        gone.extend(body.get("deleted", []) + body.get("not_found", []))
+    return updated, gone, failed
+
+
+def bulk_via_requests(ids: list, action: str, fields: dict):
+    """One PUT/DELETE per task, BULK_WORKERS at a time. Returns (updated, gone, failed)."""
+    def one(task_id):
+        try:
+            if action == "delete":
+                resp = api_client.delete(f"/api/tasks/{task_id}")
+            else:
+                resp = api_client.put(
+                    f"/api/tasks/{task_id}",
+                    headers={"Idempotency-Key": str(uuid.uuid4())},
+                    json=fields,
+                )
+        except Exception:
+            return "failed", task_id
+        if resp.status_code == 404 or (action == "delete" and resp.status_code in (200, 204)):
+            return "gone", task_id
+        if resp.status_code == 200:
+            return "updated", resp.json()
+        return "failed", task_id
+
+    # Workers call api_client, which reads this session's token and call log
+    ctx = get_script_run_ctx()
+    with ThreadPoolExecutor(
+        max_workers=BULK_WORKERS, initializer=add_script_run_ctx, initargs=(None, ctx)
+    ) as pool:
+        results = list(pool.map(one, ids))
+
+    def outcome(kind):
+        return [value for k, value in results if k == kind]
+
+    return outcome("updated"), outcome("gone"), outcome("failed")
+
+
+def bulk_action(tasks: list[dict], action: str, label: str, **fields):
+    """
+    Apply one change (action "update" with fields, or "delete") to many tasks,
+    then patch the list once and rerun the page.
+    """
+    ids = [t["id"] for t in tasks]
+    result = None
+    with st.spinner(f"{label} {len(ids)} task(s)..."):
+        try:
+            if st.session_state.get("bulk_endpoint", True):
+                result = bulk_via_api(ids, action, fields)
+            if result is None:
+                result = bulk_via_requests(ids, action, fields)
+        except Exception as e:
+            st.error(f"❌ Bulk action failed: {e}")
+            return
+
+    updated, gone, failed = result
+    apply_changes(updated, gone)
+    st.session_state.table_nonce += 1  # clear the selection
+    if failed:
+        st.session_state.bulk_failed = f"{len(failed)} task(s) could not be changed: " + ", ".join(
+            f"#{i}" for i in failed
+        )
+    st.toast(f"{label}: {len(ids) - len(failed)} of {len(ids)} task(s) done")
+    st.rerun()
+
+
+def render_bulk_actions(selected: list[dict]):
+    """Complete / Delete / Change priority for several selected tasks."""
+    st.markdown(f"**Selected:** {len(selected)} tasks")
+    b1, b2, b3, b4 = st.columns([1, 1, 1, 1])
+    with b1:
+        if st.button("✅ Complete", key="bulk_complete", disabled=all(t.get("completed") for t in selected)):
+            bulk_action([t for t in selected if not t.get("completed")], "update", "Completed", completed=True)
+    with b2:
+        if st.button("🗑 Delete", key="bulk_delete"):
+            bulk_action(selected, "delete", "Deleted")
+    with b3:
+        priority = st.selectbox(
+            "Priority", ["Low", "Medium", "High"], index=2, key="bulk_priority",
+            label_visibility="collapsed",
+        )
+    with b4:
+        if st.button("Set priority", key="bulk_set_priority"):
+            bulk_action(selected, "update", f"Priority set to {priority}", priority=priority)
+
+
+STALE_TASK_MSG = (
+    "This task was changed in another tab or device. "
+    "The latest version has been loaded; please review and try again."
+)
+
+
 def format_priority(priority: str) -> str:
     p = (priority or "Medium").lower()
     if p == "high":
@@ -167,23 +390,224 @@ def format_status(completed: bool) -> str:
     return "✅ Completed" if completed else "⏳ Pending"
 
 
-def due_flag(due_date_str: str | None, completed: bool) -> str | None:
-    """
-    Return 'overdue', 'today', or None based on due date and completion.
-    Only for NOT completed tasks.
-    """
-    if not due_date_str or completed:
-        return None
-    try:
-        d = datetime.fromisoformat(due_date_str).date()
-    except Exception:
-        return None
-    today = date.today()
-    if d < today:
-        return "overdue"
-    if d == today:
-        return "today"
-    return None
+def table_row(t: dict, flag: str | None) -> dict:
+    """One row of the compact task table (built once per task list version)."""
+    return {
+        "ID": t["id"],
+        "Title": t.get("title", ""),
+        "Priority": format_priority(t.get("priority")),
+        "Due": (t.get("due_date") or "")[:10],
+        "Status": format_status(bool(t.get("completed"))),
+        "Flag": DUE_BADGES.get(flag, ""),
+    }
+
+
+# ---- Task actions (shared by the cards and the compact action bar) ----
+# Anything that changes the task list reruns the whole page (st.rerun()) so
+# the metrics follow; everything else stays inside its fragment.
+def open_view(t):
+    st.session_state.selected_task_id = t["id"]
+    st.session_state.view_task_data = t
+    show_task_dialog()
+
+
+def open_edit(t):
+    st.session_state.selected_task_id = t["id"]
+    st.session_state.edit_task_data = t
+    edit_task_dialog()
+
+
+def complete_action(t):
+    task_id = t["id"]
+    resp = optimistic(
+        lambda: patch_task({**t, "completed": True}),
+        lambda: update_task(task_id, version=t.get("version"), completed=True),
+    )
+    if resp is not None and resp.status_code == 200:
+        st.toast("Task marked as completed 🎉")
+        patch_task(resp.json())
+        st.rerun()
+    elif resp is not None and resp.status_code == 412:
+        st.toast(STALE_TASK_MSG)
+        patch_task(resp.json()["task"])
+        start_revalidation()
+        st.rerun()
+    elif resp is not None:
+        st.error(f"Failed to mark task completed ({resp.status_code}): {resp.text}")
+
+
+def delete_action(task_id):
+    resp = optimistic(
+        lambda: drop_task(task_id),
+        lambda: delete_task(task_id),
+    )
+    # 404: already deleted elsewhere, so dropping it locally is right too
+    if resp is not None and resp.status_code in (200, 204, 404):
+        drop_task(task_id)
+        st.toast("Task deleted 🗑")
+        st.session_state.selected_task_id = None
+        st.session_state.table_nonce += 1
+        st.rerun()
+    elif resp is not None:
+        st.error(f"Failed to delete task ({resp.status_code}): {resp.text}")
+
+
+def render_task_actions(t, key_prefix: str):
+    """View / Edit / Complete / Delete buttons for one task."""
+    task_id = t["id"]
+    completed = bool(t.get("completed"))
+    a1, a2, a3, a4 = st.columns(4)
+    with a1:
+        if st.button("👁 View", key=f"{key_prefix}_view_{task_id}"):
+            open_view(t)
+    with a2:
+        if st.button("✏️ Edit", key=f"{key_prefix}_edit_{task_id}"):
+            open_edit(t)
+    with a3:
+        if st.button("✅ Complete", key=f"{key_prefix}_complete_{task_id}", disabled=completed):
+            complete_action(t)
+    with a4:
+        if st.button("🗑 Delete", key=f"{key_prefix}_delete_{task_id}"):
+            delete_action(task_id)
+
+
+def render_task_card(t):
+    title = t.get("title", "")
+    desc = t.get("description") or ""
+    completed = bool(t.get("completed"))
+    due_date_str = t.get("due_date")
+
+    with st.container(border=True):
+        row1, row2 = st.columns([3, 2])
+
+        # Row 1: title + description
+        with row1:
+            st.markdown(f"**#{t['id']} – {title}**")
+            if desc:
+                st.caption(desc)
+
+        # Row 2: priority / due / status + overdue/today badge
+        with row2:
+            st.markdown(f"**Priority:** {format_priority(t.get('priority'))}")
+            if due_date_str:
+                st.markdown(f"**Due:** {due_date_str[:10]}")
+            st.markdown(f"**Status:** {format_status(completed)}")
+            badge = DUE_BADGES.get(task_index().flag(t))
+            if badge:
+                st.markdown(f"**{badge}**")
+
+        # Row 3: action buttons in one row
+        render_task_actions(t, key_prefix="card")
+
+
+# ==================== VIEW POPUP (MODAL) ====================
+# Dialogs are fragments: their own widgets only rerun the dialog.
+@st.dialog("👁 Task details")
+def show_task_dialog():
+    t = st.session_state.view_task_data
+    st.markdown(f"### #{t['id']} – {t.get('title','')}")
+    st.markdown(f"**Priority:** {format_priority(t.get('priority'))}")
+    if t.get("due_date"):
+        st.markdown(f"**Due:** {t['due_date'][:10]}")
+    st.markdown(f"**Status:** {format_status(bool(t.get('completed')))}")
+    flag = task_index().flag(t)
+    if flag == "overdue":
+        st.markdown("🔥 **Overdue**")
+    elif flag == "today":
+        st.markdown("📅 **Due today**")
+
+    if t.get("description"):
+        st.markdown("---")
+        st.markdown("**Description**")
+        st.write(t.get("description"))
+
+    st.markdown("---")
+    col_v1, col_v2 = st.columns(2)
+    with col_v1:
+        if st.button("✏️ Edit this task", use_container_width=True, key="view_to_edit"):
+            # Dialogs can't nest: reopen as the edit dialog on the next run
+            st.session_state.edit_task_data = t
+            st.session_state.pending_dialog = "edit"
+            st.rerun()
+    with col_v2:
+        if st.button("Close", use_container_width=True, key="close_view_dialog"):
+            st.rerun()
+
+
+# ==================== EDIT POPUP (MODAL) ====================
+@st.dialog("✏️ Edit task")
+def edit_task_dialog():
+    t = st.session_state.edit_task_data
+
+    edit_title = st.text_input(
+        "Title",
+        value=t.get("title", ""),
+        key="dlg_edit_title",
+    )
+    edit_description = st.text_area(
+        "Description",
+        value=t.get("description") or "",
+        key="dlg_edit_desc",
+    )
+
+    current_priority = (t.get("priority") or "Medium").title()
+    edit_priority = st.selectbox(
+        "Priority",
+        ["Low", "Medium", "High"],
+        index=["Low", "Medium", "High"].index(current_priority),
+        key="dlg_edit_priority",
+    )
+
+    existing_due = None
+    if t.get("due_date"):
+        try:
+            existing_due = datetime.fromisoformat(t["due_date"]).date()
+        except Exception:
+            existing_due = None
+    edit_due = st.date_input(
+        "Due date",
+        value=existing_due,
+        format="YYYY-MM-DD",
+        key="dlg_edit_due",
+    )
+
+    edit_completed = st.checkbox(
+        "Completed",
+        value=bool(t.get("completed")),
+        key="dlg_edit_completed",
+    )
+
+    col_e1, col_e2 = st.columns(2)
+    with col_e1:
+        if st.button("💾 Save changes", use_container_width=True, key="dlg_save"):
+            resp = update_task(
+                t["id"],
+                version=t.get("version"),
+                title=edit_title.strip(),
+                description=edit_description.strip(),
+                priority=edit_priority,
+                completed=edit_completed,
+                due_date=edit_due,
+            )
+            if resp is not None and resp.status_code == 200:
+                st.toast("Task updated successfully ✅")
+                patch_task(resp.json())
+                st.rerun()
+            elif resp is not None and resp.status_code == 412:
+                # Someone else saved first: show their version instead of overwriting it
+                st.warning(STALE_TASK_MSG)
+                current = resp.json().get("task", t)
+                st.session_state.edit_task_data = current
+                patch_task(current)
+                start_revalidation()
+            elif resp is not None:
+                st.error(
+                    f"Failed to update task ({resp.status_code}): {resp.text}"
+                )
+
+    with col_e2:
+        if st.button("Cancel", use_container_width=True, key="dlg_cancel"):
+            st.rerun()
 
 
 # ==================== Header / Top Bar ====================
@@ -210,53 +634,71 @@ with header_col_btns:
         st.switch_page("home.py")
 
     if do_logout:
+        try:
+            # Revoke the token server-side too; logging out locally works regardless
+            api_client.post("/api/auth/logout", timeout=5, retries=0)
+        except Exception:
+            pass
         st.session_state.clear()
         st.success("You have been logged out.")
         st.switch_page("home.py")
 
 st.markdown("---")
 
+
+def render_api_status():
+    """Warn while any endpoint's circuit breaker is open: requests fail fast until it recovers."""
+    degraded = api_client.degraded_endpoints()
+    if not degraded:
+        return
+    details = ", ".join(
+        f"`{b['endpoint']}` ({'retrying in ' + str(int(b['retry_in'])) + 's' if b['retry_in'] else 'testing'})"
+        for b in degraded
+    )
+    st.warning(
+        "⚠️ The KaryaMate API is slow or unavailable. Affected actions fail right away "
+        f"instead of waiting for a timeout until it recovers: {details}."
+    )
+
+
+render_api_status()
+
 # ==================== Initial Fetch (ALL tasks) ====================
+# Stale-while-revalidate: show the cached list now, refetch in the background
 if "tasks_loaded_once" not in st.session_state:
-    with st.spinner("Loading your tasks from the API..."):
-        fetch_tasks()
+    with perf_hud.section("initial load"):
+        cached = task_cache.load()
+        if cached is not None:
+            set_tasks(cached.tasks, cached.etag, persist=False)
+            st.session_state.cached_at = cached.saved_at
+            start_revalidation()
+        else:
+            with st.spinner("Loading your tasks from the API..."):
+                fetch_tasks()
     st.session_state.tasks_loaded_once = True
+apply_revalidation()
 
-tasks_all = st.session_state.tasks
-
-# ---- Overdue / today counts for metrics + focus card ----
-overdue_count = 0
-due_today_count = 0
-for _t in tasks_all:
-    flag = due_flag(_t.get("due_date"), bool(_t.get("completed")))
-    if flag == "overdue":
-        overdue_count += 1
-    elif flag == "today":
-        due_today_count += 1
 
 # ==================== Metrics Row (always based on ALL tasks) ====================
-open_count = sum(1 for t in tasks_all if not t.get("completed"))
-completed_count = sum(1 for t in tasks_all if t.get("completed"))
-total_count = len(tasks_all)
-
-m1, m2, m3, m4 = st.columns(4)
-m1.metric("Total Tasks", total_count)
-m2.metric("Open Tasks", open_count)
-m3.metric("Completed Tasks", completed_count)
-m4.metric("Overdue Tasks", overdue_count)
-
-# ---- Today's focus card ----
-st.info(
-    f"🗓️ Today's focus: {due_today_count} task(s) due today and {overdue_count} overdue."
-)
-
-st.markdown("---")
+@st.fragment
+def metrics_section():
+    counts = task_index().counts
+
+    m1, m2, m3, m4 = st.columns(4)
+    m1.metric("Total Tasks", counts["total"])
+    m2.metric("Open Tasks", counts["open"])
+    m3.metric("Completed Tasks", counts["completed"])
+    m4.metric("Overdue Tasks", counts["overdue"])
+
+    # ---- Today's focus card ----
+    st.info(
+        f"🗓️ Today's focus: {counts['due_today']} task(s) due today and {counts['overdue']} overdue."
+    )
 
-# ==================== Layout: Left = New Task, Right = List ====================
-col_left, col_right = st.columns([1, 2])
 
 # ---------- LEFT: Create Task ----------
-with col_left:
+@st.fragment
+def create_section():
     st.subheader("➕ New Task")
 
     with st.form("create_task_form", clear_on_submit=True):
@@ -278,9 +720,48 @@ with col_left:
             due_value = due if isinstance(due, date) else None
             create_task(title.strip(), description.strip(), priority, due_value)
 
+
 # ---------- RIGHT: Task List + Row Actions ----------
-with col_right:
+def auto_refresh():
+    """On a timed list rerun: refetch, and rerun the whole page only if something changed."""
+    if time.monotonic() - st.session_state.get("fetched_at", 0) < AUTO_REFRESH_SECONDS:
+        return
+    tasks, etag, _ = task_cache.fetch(st.session_state.tasks_etag)
+    st.session_state.fetched_at = time.monotonic()
+    if tasks is not None and tasks != st.session_state.tasks:
+        set_tasks(tasks, etag)
+        st.rerun()
+
+
+def list_run_every():
+    if st.session_state.revalidation is not None:
+        return REVALIDATE_POLL_SECONDS
+    if st.session_state.auto_refresh:
+        return AUTO_REFRESH_SECONDS
+    return None
+
+
+@st.fragment(run_every=list_run_every())
+def list_section():
+    with perf_hud.section("task list"):
+        render_task_list()
+
+
+def render_task_list():
+    # A finished background refetch: rerun the page (metrics, and run_every)
+    if apply_revalidation():
+        st.rerun()
+    if st.session_state.auto_refresh:
+        auto_refresh()
+
     st.subheader("🗂 Your Tasks")
+    if st.session_state.get("bulk_failed"):
+        st.warning(st.session_state.pop("bulk_failed"))
+    if st.session_state.get("cached_at"):
+        st.caption(
+            f"Showing tasks saved {task_cache.age_text(st.session_state.cached_at)}; "
+            "checking the API for changes…"
+        )
 
     top_row1, top_row2 = st.columns([2, 2])
     with top_row1:
@@ -295,215 +776,93 @@ with col_right:
         )
 
     # Refresh button (no auto-fetch on filter change)
-    if st.button("🔄 Refresh"):
-        with st.spinner("Refreshing tasks from API..."):
-            fetch_tasks()
-        tasks_all = st.session_state.tasks
-
-    # Apply filter + search locally on tasks_all
-    tasks_filtered = tasks_all
-    status_val = status_filter.lower()
-    if status_val == "open":
-        tasks_filtered = [t for t in tasks_filtered if not t.get("completed")]
-    elif status_val == "completed":
-        tasks_filtered = [t for t in tasks_filtered if t.get("completed")]
-
-    if search_query.strip():
-        q = search_query.strip().lower()
-        tasks_filtered = [
-            t for t in tasks_filtered
-            if q in (t.get("title") or "").lower()
-            or q in (t.get("description") or "").lower()
-        ]
+    rf_col, mode_col = st.columns([1, 3])
+    with rf_col:
+        if st.button("🔄 Refresh"):
+            with st.spinner("Refreshing tasks from API..."):
+                fetch_tasks()
+            st.rerun()
+    with mode_col:
+        list_mode = st.radio(
+            "List view", ["Compact", "Cards"], horizontal=True, key="list_mode",
+            label_visibility="collapsed",
+        )
+
+    # Apply filter + search locally, via the precomputed index
+    index = task_index()
+    positions = index.select(status_filter.lower(), search_query)
+    tasks_filtered = [index.tasks[i] for i in positions]
 
     if not tasks_filtered:
         st.info("No tasks match your current filter/search. Try changing filters or create a new task.")
-    else:
+    elif list_mode == "Compact":
         # 🔴 RED BOX AREA – API-driven UI
-        st.markdown("#### 📄 Task List")
-
-        for t in tasks_filtered:
-            task_id = t["id"]
-            title = t.get("title", "")
-            desc = t.get("description") or ""
-            priority_raw = t.get("priority") or "Medium"
-            completed = bool(t.get("completed"))
-            due_date_str = t.get("due_date")
-
-            with st.container(border=True):
-                row1, row2 = st.columns([3, 2])
-
-                # Row 1: title + description
-                with row1:
-                    st.markdown(f"**#{task_id} – {title}**")
-                    if desc:
-                        st.caption(desc)
-
-                # Row 2: priority / due / status + overdue/today badge
-                with row2:
-                    st.markdown(f"**Priority:** {format_priority(priority_raw)}")
-                    if due_date_str:
-                        st.markdown(f"**Due:** {due_date_str[:10]}")
-                    st.markdown(f"**Status:** {format_status(completed)}")
-                    flag = due_flag(due_date_str, completed)
-                    if flag == "overdue":
-                        st.markdown("🔥 **Overdue**")
-                    elif flag == "today":
-                        st.markdown("📅 **Due today**")
-
-                # Row 3: action buttons in one row
-                a1, a2, a3, a4 = st.columns(4)
-                with a1:
-                    if st.button("👁 View", key=f"view_{task_id}"):
-                        st.session_state.selected_task_id = task_id
-                        st.session_state.view_task_data = t
-                        st.session_state.show_view_dialog = True
-                        st.session_state.show_edit_dialog = False
-                        st.rerun()
-
-                with a2:
-                    if st.button("✏️ Edit", key=f"edit_{task_id}"):
-                        st.session_state.selected_task_id = task_id
-                        st.session_state.edit_task_data = t
-                        st.session_state.show_edit_dialog = True
-                        st.session_state.show_view_dialog = False
-                        st.rerun()
-
-                with a3:
-                    if st.button("✅ Complete", key=f"complete_{task_id}") and not completed:
-                        resp = update_task(task_id, completed=True)
-                        if resp is not None and resp.status_code == 200:
-                            st.success("Task marked as completed 🎉")
-                            fetch_tasks()
-                            st.rerun()
-                        elif resp is not None:
-                            st.error(
-                                f"Failed to mark task completed ({resp.status_code}): {resp.text}"
-                            )
-
-                with a4:
-                    if st.button("🗑 Delete", key=f"delete_{task_id}"):
-                        resp = delete_task(task_id)
-                        if resp is not None and resp.status_code in (200, 204):
-                            st.success("Task deleted 🗑")
-                            st.session_state.show_view_dialog = False
-                            st.session_state.show_edit_dialog = False
-                            st.session_state.selected_task_id = None
-                            fetch_tasks()
-                            st.rerun()
-                        elif resp is not None:
-                            st.error(
-                                f"Failed to delete task ({resp.status_code}): {resp.text}"
-                            )
-
-# ==================== VIEW POPUP (MODAL) ====================
-if st.session_state.show_view_dialog and st.session_state.view_task_data:
-
-    @st.dialog("👁 Task details")
-    def show_task_dialog():
-        t = st.session_state.view_task_data
-        st.markdown(f"### #{t['id']} – {t.get('title','')}")
-        st.markdown(f"**Priority:** {format_priority(t.get('priority'))}")
-        if t.get("due_date"):
-            st.markdown(f"**Due:** {t['due_date'][:10]}")
-        st.markdown(f"**Status:** {format_status(bool(t.get('completed')))}")
-        flag = due_flag(t.get("due_date"), bool(t.get("completed")))
-        if flag == "overdue":
-            st.markdown("🔥 **Overdue**")
-        elif flag == "today":
-            st.markdown("📅 **Due today**")
-
-        if t.get("description"):
-            st.markdown("---")
-            st.markdown("**Description**")
-            st.write(t.get("description"))
-
-        st.markdown("---")
-        col_v1, col_v2 = st.columns(2)
-        with col_v1:
-            if st.button("✏️ Edit this task", use_container_width=True, key="view_to_edit"):
-                st.session_state.edit_task_data = t
-                st.session_state.show_edit_dialog = True
-                st.session_state.show_view_dialog = False
-                st.rerun()
-        with col_v2:
-            if st.button("Close", use_container_width=True, key="close_view_dialog"):
-                st.session_state.show_view_dialog = False
-                st.rerun()
-
-    show_task_dialog()
-
-# ==================== EDIT POPUP (MODAL) ====================
-if st.session_state.show_edit_dialog and st.session_state.edit_task_data:
-
-    @st.dialog("✏️ Edit task")
-    def edit_task_dialog():
-        t = st.session_state.edit_task_data
-
-        edit_title = st.text_input(
-            "Title",
-            value=t.get("title", ""),
-            key="dlg_edit_title",
-        )
-        edit_description = st.text_area(
-            "Description",
-            value=t.get("description") or "",
-            key="dlg_edit_desc",
+        # One dataframe (the browser virtualizes its rows) + one action bar,
+        # so the widget count no longer grows with the number of tasks.
+        rows = [index.rows[i] for i in positions]
+        # New key when the filter changes, so a selected row position never
+        # silently points at a different task
+        table_key = f"task_table_{status_filter}_{search_query.strip()}_{st.session_state.table_nonce}"
+        event = st.dataframe(
+            rows,
+            hide_index=True,
+            use_container_width=True,
+            height=COMPACT_TABLE_HEIGHT,
+            on_select="rerun",
+            selection_mode="multi-row",
+            key=table_key,
         )
+        selected = [tasks_filtered[i] for i in event["selection"]["rows"] if i < len(tasks_filtered)]
+        st.session_state.selected_task_id = selected[0]["id"] if len(selected) == 1 else None
+
+        # ---- Selected-task action bar (one task) / bulk bar (several) ----
+        if not selected:
+            st.caption(
+                "Select a row to view, edit, complete or delete that task; "
+                "select several to complete, delete or re-prioritise them at once."
+            )
+        elif len(selected) == 1:
+            st.markdown(f"**Selected:** #{selected[0]['id']} – {selected[0].get('title', '')}")
+            render_task_actions(selected[0], key_prefix="bar")
+        else:
+            render_bulk_actions(selected)
+    else:
+        page_count = max(1, -(-len(tasks_filtered) // st.session_state.page_size))
+        if st.session_state.get("task_page", 1) > page_count:
+            st.session_state.task_page = page_count
+        pg1, pg2, pg3 = st.columns([1, 1, 2])
+        with pg1:
+            st.selectbox("Per page", PAGE_SIZES, key="page_size")
+        with pg2:
+            page = st.number_input("Page", min_value=1, max_value=page_count, step=1, key="task_page")
+        with pg3:
+            st.caption(f"{len(tasks_filtered)} task(s), page {page} of {page_count}")
 
-        current_priority = (t.get("priority") or "Medium").title()
-        edit_priority = st.selectbox(
-            "Priority",
-            ["Low", "Medium", "High"],
-            index=["Low", "Medium", "High"].index(current_priority),
-            key="dlg_edit_priority",
-        )
+        # 🔴 RED BOX AREA – API-driven UI
+        st.markdown("#### 📄 Task List")
+        st.caption("Tip: the Compact view lets you select several tasks and change them at once.")
+        start = (page - 1) * st.session_state.page_size
+        for t in tasks_filtered[start:start + st.session_state.page_size]:
+            render_task_card(t)
 
-        existing_due = None
-        if t.get("due_date"):
-            try:
-                existing_due = datetime.fromisoformat(t["due_date"]).date()
-            except Exception:
-                existing_due = None
-        edit_due = st.date_input(
-            "Due date",
-            value=existing_due,
-            format="YYYY-MM-DD",
-            key="dlg_edit_due",
-        )
 
-        edit_completed = st.checkbox(
-            "Completed",
-            value=bool(t.get("completed")),
-            key="dlg_edit_completed",
-        )
+metrics_section()
+st.markdown("---")
 
-        col_e1, col_e2 = st.columns(2)
-        with col_e1:
-            if st.button("💾 Save changes", use_container_width=True, key="dlg_save"):
-                resp = update_task(
-                    t["id"],
-                    title=edit_title.strip(),
-                    description=edit_description.strip(),
-                    priority=edit_priority,
-                    completed=edit_completed,
-                    due_date=edit_due,
-                )
-                if resp is not None and resp.status_code == 200:
-                    st.success("Task updated successfully ✅")
-                    st.session_state.show_edit_dialog = False
-                    fetch_tasks()
-                    st.rerun()
-                elif resp is not None:
-                    st.error(
-                        f"Failed to update task ({resp.status_code}): {resp.text}"
-                    )
-
-        with col_e2:
-            if st.button("Cancel", use_container_width=True, key="dlg_cancel"):
-                st.session_state.show_edit_dialog = False
-                st.rerun()
+# ==================== Layout: Left = New Task, Right = List ====================
+col_left, col_right = st.columns([1, 2])
+with col_left:
+    create_section()
+with col_right:
+    list_section()
+    # Outside the fragment: changing it reruns the page, which re-creates
+    # list_section with the new run_every
+    st.toggle(
+        f"Auto-refresh every {AUTO_REFRESH_SECONDS}s", key="auto_refresh",
+        help="Re-fetches the task list in the background; only the list reruns.",
+    )
 
+if st.session_state.pop("pending_dialog", None) == "edit":
     edit_task_dialog()
 
 # ==================== Footer (same as home) ====================
@@ -513,6 +872,11 @@ st.caption(
     f"(`GET/POST /api/tasks`, `PUT/DELETE /api/tasks/{{id}}`) at `{API_BASE_URL}`."
 )
 
+api_calls = api_client.recent_calls()
+if api_calls:
+    last = api_calls[-1]
+    st.caption(f"⏱ Last API call: {last['method']} {last['path']} took {last['ms']:.0f} ms.")
+
 st.markdown(
     """
     <style>
@@ -536,3 +900,6 @@ st.markdown(
     unsafe_allow_html=True,
 )
 
+perf_hud.end_run()
+perf_hud.render()
+
@@ -0,0 +1,149 @@
+# frontend/perf_hud.py
+"""
+Opt-in performance HUD for the dashboard: where did this rerun's time go?
+
+For each of the last PERF_RUNS reruns it keeps the total script time, every
+API call made during it (client round trip, status, body size and the
+backend's Server-Timing) and timed sections such as rendering the task list.
+A fragment rerun (e.g. the list's auto-refresh) is recorded as its own run.
+Times are server-side script time: the browser's own drawing isn't included.
+
+Turn it on with the sidebar toggle, or KARYAMATE_PERF_HUD=1 to start with it on.
+"""
+
+import json
+import os
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+
+import streamlit as st
+
+from api_client import API_BASE_URL
+
+PERF_RUNS = 20  # reruns kept per browser session
+DEFAULT_ON = os.getenv("KARYAMATE_PERF_HUD", "").lower() in {"1", "true", "yes", "on"}
+
+
+def enabled() -> bool:
+    return st.session_state.get("perf_hud", DEFAULT_ON)
+
+
+def _new_run(kind: str) -> dict:
+    run = {
+        "kind": kind,
+        "at": datetime.now().isoformat(timespec="seconds"),
+        "started": time.perf_counter(),
+        "total_ms": None,
+        "sections": {},
+        "calls": [],
+    }
+    st.session_state.perf_run = run  # api_client appends calls here
+    return run
+
+
+def _finish(run: dict, interrupted: bool = False):
+    run["total_ms"] = round((time.perf_counter() - run.pop("started")) * 1000, 1)
+    if interrupted:
+        run["kind"] += " (interrupted by st.rerun)"
+    st.session_state.setdefault("perf_runs", deque(maxlen=PERF_RUNS)).append(run)
+
+
+def start_run():
+    """Call at the top of the page script."""
+    previous = st.session_state.pop("perf_run", None)
+    if previous is not None and previous["total_ms"] is None:
+        _finish(previous, interrupted=True)  # st.rerun() skipped end_run()
+    if enabled():
+        _new_run("page")
+
+
+def end_run():
+    """Call at the end of the page script (before render())."""
+    run = st.session_state.get("perf_run")
+    if run is not None and run["total_ms"] is None:
+        _finish(run)
+
+
+@contextmanager
+def section(name: str):
+    """
+    Time a block. Outside a page run (a fragment rerunning on its own) the
+    block is recorded as a run of its own.
+    """
+    if not enabled():
+        yield
+        return
+    run = st.session_state.get("perf_run")
+    own_run = run is None or run["total_ms"] is not None
+    if own_run:
+        run = _new_run(f"fragment: {name}")
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = (time.perf_counter() - start) * 1000
+        run["sections"][name] = round(run["sections"].get(name, 0) + elapsed, 1)
+        if own_run:
+            _finish(run)
+
+
+def runs() -> list[dict]:
+    return list(st.session_state.get("perf_runs", ()))
+
+
+def _run_row(run: dict) -> dict:
+    api_ms = sum(c["ms"] for c in run["calls"])
+    row = {
+        "At": run["at"],
+        "Run": run["kind"],
+        "Total ms": run["total_ms"],
+        "API calls": len(run["calls"]),
+        "API ms": round(api_ms, 1),
+    }
+    for name, ms in run["sections"].items():
+        row[f"{name} ms"] = ms
+    return row
+
+
+def _call_row(call: dict) -> dict:
+    server = call.get("server") or {}
+    app_ms = server.get("app")
+    return {
+        "Call": f"{call['method']} {call['path']}",
+        "Status": call["status"],
+        "Bytes": call.get("bytes"),
+        "Client ms": call["ms"],
+        "Server ms": app_ms,
+        "DB ms": server.get("db"),
+        # What the server didn't account for: network, TLS, queueing, proxies
+        "Network ms": round(call["ms"] - app_ms, 1) if app_ms is not None else None,
+        "Retry": call.get("attempt", 0),
+        "Hedged": call.get("hedged", False),
+    }
+
+
+def render():
+    """The HUD panel: per-rerun table, the latest run's API calls, JSON export."""
+    if not enabled():
+        return
+    history = runs()
+    with st.expander("⏱ Performance HUD", expanded=True):
+        if not history:
+            st.caption("No reruns recorded yet.")
+            return
+        st.dataframe([_run_row(r) for r in reversed(history)], hide_index=True, use_container_width=True)
+
+        latest = next((r for r in reversed(history) if r["calls"]), None)
+        if latest is not None:
+            st.markdown(f"**API calls in the latest run that made any** ({latest['at']}, {latest['kind']})")
+            st.dataframe([_call_row(c) for c in latest["calls"]], hide_index=True, use_container_width=True)
+
+        st.download_button(
+            "⬇️ Export as JSON",
+            data=json.dumps({"api_base_url": API_BASE_URL, "runs": history}, indent=2),
+            file_name=f"karyamate-perf-{datetime.now():%Y%m%d-%H%M%S}.json",
+            mime="application/json",
+            key="perf_export",
+        )
@@ -0,0 +1,134 @@
+# frontend/resilience.py
+"""
+Client-side protection for a slow or sleeping API.
+
+  CircuitBreaker  - per endpoint. After FAILURE_THRESHOLD consecutive
+                    failures (network errors, 502/503/504) calls fail fast
+                    for a cooldown; then one probe request is let through
+                    (half-open). Success closes the breaker, failure reopens
+                    it with a longer cooldown.
+  backoff_delay   - "full jitter" exponential backoff between retries, so
+                    many clients don't retry in lockstep.
+  hedge_delay     - p95 of recent latencies: how long a GET may run before
+                    a duplicate (hedged) request is worth sending.
+
+Breakers live for the whole Streamlit process: the API's health is the
+same for every user, so one user's timeouts spare the others the wait.
+"""
+
+import math
+import random
+import re
+import threading
+import time
+from collections import deque
+
+import requests
+
+FAILURE_THRESHOLD = 5     # consecutive failures that open a breaker
+COOLDOWN_SECONDS = 15     # first open period; doubles on each failed probe
+MAX_COOLDOWN_SECONDS = 120
+LATENCY_SAMPLES = 50      # successful-call latencies kept per endpoint
+HEDGE_MIN_SAMPLES = 20    # don't hedge until the p95 means something
+HEDGE_DELAY_RANGE = (0.05, 2.0)  # seconds
+
+BACKOFF_BASE = 0.25       # seconds
+BACKOFF_CAP = 4.0
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half-open"
+
+_ID_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """Raised instead of calling an endpoint whose breaker is open."""
+
+    def __init__(self, endpoint: str, retry_in: float):
+        super().__init__(f"the API is not responding ({endpoint}); trying again in {math.ceil(retry_in)}s")
+        self.endpoint = endpoint
+        self.retry_in = retry_in
+
+
+def endpoint_key(method: str, path: str) -> str:
+    """'PUT /api/tasks/{id}' for 'PUT /api/tasks/42?x=1'."""
+    path = path.split("?", 1)[0]
+    return f"{method.upper()} {_ID_SEGMENT.sub('/{id}', path)}"
+
+
+class CircuitBreaker:
+    def __init__(self, endpoint: str):
+        self.endpoint = endpoint
+        self.state = CLOSED
+        self.failures = 0
+        self.cooldown = COOLDOWN_SECONDS
+        self.opened_at = 0.0
+        self.probing = False
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)
+        self._lock = threading.Lock()
+
+    def retry_in(self) -> float:
+        if self.state != OPEN:
+            return 0.0
+        return max(0.0, self.opened_at + self.cooldown - time.monotonic())
+
+    def before_call(self):
+        """Raise CircuitOpenError unless a request may go out now."""
+        with self._lock:
+            if self.state == CLOSED:
+                return
+            if self.state == OPEN and self.retry_in() == 0:
+                self.state = HALF_OPEN
+                self.probing = False
+            if self.state == HALF_OPEN and not self.probing:
+                self.probing = True  # this caller is the probe
+                return
+            raise CircuitOpenError(self.endpoint, self.retry_in() or self.cooldown)
+
+    def record_success(self, elapsed: float):
+        with self._lock:
+            self.latencies.append(elapsed)
+            self.state = CLOSED
+            self.failures = 0
+            self.cooldown = COOLDOWN_SECONDS
+            self.probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN:
+                self.cooldown = min(self.cooldown * 2, MAX_COOLDOWN_SECONDS)
+                self._open()
+            elif self.state == CLOSED and self.failures >= FAILURE_THRESHOLD:
+                self._open()
+
+    def release(self):
+        """The call ended without telling us anything about the server."""
+        with self._lock:
+            self.probing = False
+
+    def _open(self):
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        self.probing = False
+
+    def hedge_delay(self) -> float | None:
+        """p95 of recent successful latencies (clamped), or None without enough data."""
+        samples = sorted(self.latencies)
+        if len(samples) < HEDGE_MIN_SAMPLES:
+            return None
+        p95 = samples[math.ceil(len(samples) * 0.95) - 1]
+        low, high = HEDGE_DELAY_RANGE
+        return min(max(p95, low), high)
+
+    def snapshot(self) -> dict:
+        return {
+            "endpoint": self.endpoint,
+            "state": self.state,
+            "failures": self.failures,
+            "retry_in": round(self.retry_in(), 1),
+        }
+
+
+def backoff_delay(attempt: int) -> float:
+    """Seconds to wait before retry number `attempt` (0-based): uniform in [0, min(cap, base * 2^attempt)]."""
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
@@ -0,0 +1,131 @@
+# frontend/task_cache.py
+"""
+Persistent per-user cache of the task list (stale-while-revalidate).
+
+Pages render the last known tasks straight from a local SQLite file, then
+revalidate with a conditional GET (If-None-Match); an unchanged list costs a
+304 with no body. Entries are keyed by API base URL + the user id in the JWT.
+The token comes from our own login call (pages never accept one from the
+browser), so reading its `sub` claim without verifying it is fine here.
+"""
+
+import base64
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import NamedTuple
+
+import streamlit as st
+
+import api_client
+from api_client import API_BASE_URL
+from task_codec import TASKS_ACCEPT, TASKS_PARAMS, decode_tasks
+
+CACHE_PATH = Path(os.getenv("KARYAMATE_CACHE_DIR", Path.home() / ".karyamate")) / "task_cache.sqlite3"
+
+
+class CachedTasks(NamedTuple):
+    tasks: list[dict]
+    etag: str | None
+    saved_at: float
+
+
+@contextmanager
+def _db():
+    CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(CACHE_PATH, timeout=5)
+    try:
+        with conn:  # commit on success
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS task_cache ("
+                " user_key TEXT PRIMARY KEY, etag TEXT, body TEXT NOT NULL, saved_at REAL NOT NULL)"
+            )
+            yield conn
+    finally:
+        conn.close()
+
+
+def user_key() -> str | None:
+    """Cache key for the logged-in user, or None if there is no usable token."""
+    token = st.session_state.get("access_token")
+    if not token:
+        return None
+    try:
+        payload = token.split(".")[1]
+        claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+        subject = claims["sub"]
+    except Exception:
+        return None
+    return hashlib.sha256(f"{API_BASE_URL}|{subject}".encode()).hexdigest()
+
+
+def load() -> CachedTasks | None:
+    key = user_key()
+    if key is None:
+        return None
+    try:
+        with _db() as conn:
+            row = conn.execute(
+                "SELECT body, etag, saved_at FROM task_cache WHERE user_key = ?", (key,)
+            ).fetchone()
+    except sqlite3.Error:
+        return None
+    if row is None:
+        return None
+    return CachedTasks(json.loads(row[0]), row[1], row[2])
+
+
+def save(tasks: list[dict], etag: str | None):
+    """Store the list; etag=None when it was patched locally (next GET is unconditional)."""
+    key = user_key()
+    if key is None:
+        return
+    try:
+        with _db() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO task_cache (user_key, etag, body, saved_at) VALUES (?, ?, ?, ?)",
+                (key, etag, json.dumps(tasks, separators=(",", ":")), time.time()),
+            )
+    except sqlite3.Error:
+        pass  # the cache is only an optimisation
+
+
+def fetch(etag: str | None = None):
+    """
+    GET /api/tasks, conditional on `etag`. Returns (tasks, etag, error):
+    tasks is None with no error when the server says 304 Not Modified.
+    Doesn't touch the cache (callers save() what they keep).
+    """
+    headers = {"Accept": TASKS_ACCEPT}
+    if etag:
+        headers["If-None-Match"] = etag
+    try:
+        resp = api_client.get("/api/tasks", headers=headers, params=TASKS_PARAMS)
+    except Exception as e:
+        return None, etag, f"❌ Failed to fetch tasks: {e}"
+
+    if resp.status_code == 304:
+        return None, etag, None
+    if resp.status_code == 200:
+        try:
+            tasks = decode_tasks(resp.content, resp.headers.get("Content-Type"))
+        except Exception as e:
+            return None, etag, f"❌ Could not parse tasks response: {e}"
+        return tasks, resp.headers.get("ETag"), None
+    if resp.status_code == 401:
+        return None, etag, "Unauthorized (401). Your session may have expired. Please log in again."
+    return None, etag, f"❌ Could not load tasks ({resp.status_code}): {api_client.error_message(resp)}"
+
+
+def age_text(saved_at: float) -> str:
+    minutes = int((time.time() - saved_at) // 60)
+    if minutes < 1:
+        return "just now"
+    if minutes < 60:
+        return f"{minutes} min ago"
+    return f"{minutes // 60} h ago"
@@ -0,0 +1,76 @@
+# frontend/task_codec.py
+"""
+Decode GET /api/tasks responses into the list-of-dicts shape the pages use.
+
+The API can answer in JSON or MessagePack, and in the default row layout or
+the compact columnar layout (?layout=columnar). Whatever comes back, callers
+get plain task dicts with ISO date strings and priority names.
+"""
+
+import json
+from datetime import datetime, timedelta
+
+try:
+    import msgpack
+except ImportError:  # msgpack is optional; we just won't ask for it
+    msgpack = None
+
+MSGPACK_MIMETYPE = "application/msgpack"
+TIMESTAMP_FIELDS = ("due_date", "created_at", "updated_at")
+EPOCH = datetime(1970, 1, 1)  # API timestamps are naive UTC
+
+# Query params + headers to request the most compact format we can decode.
+# The dashboard shows every task, including completed ones the archive job
+# has moved to tasks_archive.
+TASKS_PARAMS = {"layout": "columnar", "include_archived": "true"}
+if msgpack is not None:
+    TASKS_ACCEPT = f"{MSGPACK_MIMETYPE}, application/json;q=0.9"
+else:
+    TASKS_ACCEPT = "application/json"
+
+
+def _iso_from_epoch(value):
+    if value is None:
+        return None
+    return (EPOCH + timedelta(seconds=value)).isoformat()
+
+
+def columnar_to_rows(payload: dict) -> list[dict]:
+    """Turn a columnar payload back into one dict per task."""
+    columns = payload.get("columns") or {}
+    levels = payload.get("priority_levels") or ["Low", "Medium", "High"]
+    count = payload.get("count", len(columns.get("id", [])))
+
+    decoded = dict(columns)
+    for field in TIMESTAMP_FIELDS:
+        if field in decoded:
+            decoded[field] = [_iso_from_epoch(v) for v in decoded[field]]
+    if "priority" in decoded:
+        decoded["priority"] = [
+            levels[p] if isinstance(p, int) and 0 <= p < len(levels) else "Medium"
+            for p in decoded["priority"]
+        ]
+
+    names = list(decoded)
+    values = [decoded[n] for n in names]
+    return [
+        {name: col[i] for name, col in zip(names, values)}
+        for i in range(count)
+    ]
+
+
+def decode_payload(body: bytes, content_type: str | None):
+    """Decode a raw response body based on its Content-Type."""
+    if (content_type or "").startswith(MSGPACK_MIMETYPE):
+        if msgpack is None:
+            raise ValueError("received MessagePack but msgpack is not installed")
+        return msgpack.unpackb(body, raw=False)
+    return json.loads(body)
+
+
+def decode_tasks(body: bytes, content_type: str | None) -> list[dict]:
+    """Decode a task list response (any format/layout) into task dicts."""
+    payload = decode_payload(body, content_type)
+    if isinstance(payload, dict) and payload.get("layout") == "columnar":
+        return columnar_to_rows(payload)
+    return payload
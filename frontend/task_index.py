@@ -0,0 +1,101 @@
+# frontend/task_index.py
+"""
+Derived fields for the dashboard, computed once per version of the task list.
+
+Parsing due dates, working out overdue/today flags and lowercasing text for
+search is done in one pass when the list changes (or the day rolls over);
+reruns then filter and count with list/dict lookups only.
+"""
+
+from datetime import date, datetime
+
+STATUSES = ("open", "completed")
+PRIORITIES = ("Low", "Medium", "High")
+
+
+def parse_due(value: str | None) -> date | None:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value).date()
+    except ValueError:
+        return None
+
+
+def flag_for(due: date | None, completed: bool, today: date) -> str | None:
+    """'overdue', 'today' or None. Only NOT completed tasks get a flag."""
+    if due is None or completed:
+        return None
+    if due < today:
+        return "overdue"
+    if due == today:
+        return "today"
+    return None
+
+
+class TaskIndex:
+    """
+    Positions in `tasks` bucketed by status and priority, plus per-task due
+    dates, flags, search text and (optionally) a display row from `row(task, flag)`.
+    """
+
+    def __init__(self, tasks: list[dict], today: date | None = None, row=None):
+        self.tasks = tasks
+        self.today = today or date.today()
+        self.position = {}
+        self.due = []
+        self.flags = []
+        self.search_text = []
+        self.rows = []
+        self.by_status = {s: [] for s in STATUSES}
+        self.by_priority = {p: [] for p in PRIORITIES}
+        self.by_flag = {"overdue": [], "today": []}
+
+        for i, t in enumerate(tasks):
+            completed = bool(t.get("completed"))
+            due = parse_due(t.get("due_date"))
+            flag = flag_for(due, completed, self.today)
+
+            self.position[t["id"]] = i
+            self.due.append(due)
+            self.flags.append(flag)
+            self.search_text.append(
+                f"{t.get('title') or ''}\n{t.get('description') or ''}".lower()
+            )
+            self.by_status["completed" if completed else "open"].append(i)
+            self.by_priority.get(t.get("priority") or "Medium", self.by_priority["Medium"]).append(i)
+            if flag:
+                self.by_flag[flag].append(i)
+            if row is not None:
+                self.rows.append(row(t, flag))
+
+        self.counts = {
+            "total": len(tasks),
+            "open": len(self.by_status["open"]),
+            "completed": len(self.by_status["completed"]),
+            "overdue": len(self.by_flag["overdue"]),
+            "due_today": len(self.by_flag["today"]),
+        }
+        self._last_query = None
+
+    def flag(self, task: dict) -> str | None:
+        i = self.position.get(task["id"])
+        if i is not None and self.tasks[i] is task:
+            return self.flags[i]
+        # A task from elsewhere (e.g. a dialog's copy): compute it directly
+        return flag_for(parse_due(task.get("due_date")), bool(task.get("completed")), self.today)
+
+    def select(self, status: str = "all", query: str = "") -> list[int]:
+        """Positions matching a status ('all', 'open', 'completed') and a search string."""
+        q = query.strip().lower()
+        key = (status, q)
+        if self._last_query and self._last_query[0] == key:
+            return self._last_query[1]
+
+        positions = range(len(self.tasks)) if status == "all" else self.by_status[status]
+        if q:
+            text = self.search_text
+            positions = [i for i in positions if q in text[i]]
+        positions = list(positions)
+        self._last_query = (key, positions)
+        return positions